@@ -0,0 +1,343 @@
+"""
+Admission control: per-client rate limits and bounded council run queues.
+
+Clients are identified by the X-API-Key header (or a bearer token), or by
+their address when they send none. Each client with a key has two token
+buckets, one for council turns and one for model calls, and a cap on runs
+in flight; callers without a key (possible only while no keys are
+configured) are not told apart reliably, since everyone behind one proxy
+shares an address, so they are only held to the global queue limit. Turns
+beyond a client's budget are rejected up front with 429; model calls
+beyond it wait, which slows a client's runs down instead of failing them
+halfway. Runs that would overflow the global job queue are rejected with
+503.
+
+Batch questions are a separate class: they are bounded by their batch's
+concurrency rather than the per-client limits, and hold off while
+interactive runs are waiting for a worker.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from . import jobs, metrics
+from .config import (
+    ADMISSION_API_KEYS,
+    ADMISSION_TURN_RATE,
+    ADMISSION_TURN_BURST,
+    ADMISSION_MODEL_CALL_RATE,
+    ADMISSION_MODEL_CALL_BURST,
+    ADMISSION_MAX_RUNS_PER_CLIENT,
+    JOB_QUEUE_LIMIT,
+)
+
+# Buckets idle (and full) for this long are dropped
+BUCKET_IDLE_SECONDS = 3600
+
+# Prefix of the ids of clients identified by an API key
+KEY_CLIENT_PREFIX = "key:"
+
+
+class AdmissionError(Exception):
+    """A request was refused; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers for the error (Retry-After in whole seconds)."""
+        if self.retry_after is None:
+            return {}
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, and up to `burst` at once."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens if available.
+
+        Returns:
+            0 if taken, otherwise the seconds until enough tokens accrue
+            (nothing is taken then)
+        """
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def available(self) -> float:
+        """Tokens available right now."""
+        self._refill(time.monotonic())
+        return self.tokens
+
+
+_BUCKET_LIMITS = {
+    "turn": (ADMISSION_TURN_RATE, ADMISSION_TURN_BURST),
+    "model_call": (ADMISSION_MODEL_CALL_RATE, ADMISSION_MODEL_CALL_BURST),
+}
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}  # (kind, client) -> bucket
+
+_rejected: Dict[str, int] = {}  # reason -> count
+
+# Batch questions in flight, per client
+_batch_questions: Dict[str, int] = {}
+
+# How often a batch question waiting for interactive runs to drain checks again
+BATCH_POLL_SECONDS = 1.0
+
+# Client the current task's model calls are charged to; set by council runs
+_current_client: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("admission_client", default=None)
+# Whether the current task runs batch questions, whose model calls are not throttled
+_current_is_batch: contextvars.ContextVar[bool] = contextvars.ContextVar("admission_batch", default=False)
+
+
+def _bucket(kind: str, client: str) -> Optional[TokenBucket]:
+    rate, burst = _BUCKET_LIMITS[kind]
+    if not rate:
+        return None
+    bucket = _buckets.get((kind, client))
+    if bucket is None:
+        _prune_buckets()
+        bucket = _buckets[(kind, client)] = TokenBucket(rate, burst)
+    return bucket
+
+
+def _prune_buckets():
+    """Drop buckets of clients gone quiet long enough to have refilled."""
+    cutoff = time.monotonic() - BUCKET_IDLE_SECONDS
+    for key in [k for k, b in _buckets.items() if b.updated < cutoff]:
+        del _buckets[key]
+
+
+def _reject(reason: str, status_code: int, message: str, retry_after: Optional[float] = None):
+    _rejected[reason] = _rejected.get(reason, 0) + 1
+    metrics.ADMISSION_REJECTIONS.inc(reason=reason)
+    raise AdmissionError(status_code, message, retry_after)
+
+
+def _valid_keys() -> set:
+    from .settings import get_settings
+
+    keys = set(ADMISSION_API_KEYS)
+    if get_settings().get("user_api_key"):
+        keys.add(get_settings()["user_api_key"])
+    return keys
+
+
+def identify_client(api_key: Optional[str], address: Optional[str]) -> str:
+    """
+    Work out which client a request comes from.
+
+    Once `user_api_key` (or ADMISSION_API_KEYS) is configured, a valid key
+    is required; otherwise a key is optional and only groups requests.
+
+    Args:
+        api_key: The X-API-Key header or bearer token, if any
+        address: The client's address
+
+    Returns:
+        A client id safe to show in the admin endpoint (keys are hashed)
+
+    Raises:
+        AdmissionError: 401 for a missing or unknown key when keys are configured
+    """
+    keys = _valid_keys()
+    if keys and api_key not in keys:
+        _reject("unauthorized", 401, "Missing or invalid API key")
+    if api_key:
+        return key_client_id(api_key)
+    return f"addr:{address or 'unknown'}"
+
+
+def key_client_id(api_key: str) -> str:
+    """Client id of an API key (hashed, so ids can be shown and stored)."""
+    return KEY_CLIENT_PREFIX + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def _is_metered(client: Optional[str]) -> bool:
+    """Whether per-client limits apply: only to clients identified by an API key."""
+    return bool(client) and client.startswith(KEY_CLIENT_PREFIX)
+
+
+def require_admin(api_key: Optional[str]) -> str:
+    """
+    Check that a request may use the admin endpoints (stats, maintenance, import).
+
+    These always need a configured key, so with no keys configured they
+    are closed.
+
+    Returns:
+        The client id of the key
+
+    Raises:
+        AdmissionError: 403 if no keys are configured, 401 for a missing or
+            unknown key
+    """
+    keys = _valid_keys()
+    if not keys:
+        _reject("admin_disabled", 403, "Admin endpoints need user_api_key or ADMISSION_API_KEYS to be set")
+    if api_key not in keys:
+        _reject("unauthorized", 401, "Missing or invalid API key")
+    return key_client_id(api_key)
+
+
+def require_settings_access(api_key: Optional[str]):
+    """
+    Check that a request may change the settings.
+
+    Until a key is configured anyone may, so the first key can be set;
+    after that only admin requests can (see require_admin).
+
+    Raises:
+        AdmissionError: 401 for a missing or unknown key when keys are configured
+    """
+    if _valid_keys():
+        require_admin(api_key)
+
+
+def _refuse_run(client: str) -> Optional[Tuple[str, int, str, Optional[float]]]:
+    """
+    Check whether a client may start a council run, charging its turn budget if so.
+
+    Returns:
+        None if admitted, otherwise (reason, status code, message, retry after)
+    """
+    metered = _is_metered(client)
+    in_flight = jobs.count_client_jobs(client) if metered else 0
+    if ADMISSION_MAX_RUNS_PER_CLIENT and in_flight >= ADMISSION_MAX_RUNS_PER_CLIENT:
+        return (
+            "client_runs", 429,
+            f"Too many council runs in progress for this client ({in_flight})",
+            jobs.estimate_wait(1)
+        )
+
+    queued = jobs.queued_count()
+    if JOB_QUEUE_LIMIT is not None and queued >= JOB_QUEUE_LIMIT:
+        return "queue_full", 503, "The council run queue is full", jobs.estimate_wait(queued - JOB_QUEUE_LIMIT + 1)
+
+    bucket = _bucket("turn", client) if metered else None
+    wait = bucket.take() if bucket else 0.0
+    if wait:
+        return "turn_rate", 429, "Council turn rate limit exceeded", wait
+    return None
+
+
+def admit_run(client: str):
+    """
+    Check that a client may start a council run, charging its turn budget.
+
+    Raises:
+        AdmissionError: 429 if the client has too many runs in flight or is
+            out of turns, 503 if the job queue is full
+    """
+    refusal = _refuse_run(client)
+    if refusal is not None:
+        _reject(*refusal)
+
+
+@asynccontextmanager
+async def batch_question_admitted(client: Optional[str]) -> AsyncIterator[None]:
+    """
+    Hold the admission of one batch question.
+
+    Batch questions do not count towards their client's runs in flight or
+    turn budget; their batch's concurrency bounds them instead. They wait
+    while interactive runs are queued for a worker, so a batch only takes
+    capacity interactive users are not waiting for.
+    """
+    while jobs.queued_count():
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+    if client:
+        _batch_questions[client] = _batch_questions.get(client, 0) + 1
+    try:
+        yield
+    finally:
+        if client:
+            _batch_questions[client] -= 1
+            if not _batch_questions[client]:
+                del _batch_questions[client]
+
+
+def set_client(client: Optional[str], batch: bool = False):
+    """
+    Charge subsequent model calls in this task to `client` (None: unmetered).
+
+    Model calls of batch questions are not throttled; the scheduler already
+    runs them at background priority.
+    """
+    _current_client.set(client)
+    _current_is_batch.set(batch)
+
+
+def current_client() -> Optional[str]:
+    """Client the current task's model calls are charged to."""
+    return _current_client.get()
+
+
+async def throttle_model_call() -> float:
+    """
+    Wait until the current task's client may make another model call.
+
+    Returns:
+        Seconds waited
+    """
+    client = _current_client.get()
+    metered = _is_metered(client) and not _current_is_batch.get()
+    bucket = _bucket("model_call", client) if metered else None
+    if bucket is None:
+        return 0.0
+    waited = 0.0
+    while True:
+        wait = bucket.take()
+        if not wait:
+            return waited
+        await asyncio.sleep(wait)
+        waited += wait
+
+
+def get_stats() -> Dict[str, Any]:
+    """Run queue state, rejections, and every tracked client's budgets."""
+    clients: Dict[str, Dict[str, Any]] = {}
+    for (kind, client), bucket in _buckets.items():
+        entry = clients.setdefault(client, {"client": client})
+        entry[f"{kind}_tokens"] = round(bucket.available(), 2)
+    for client in _batch_questions:
+        clients.setdefault(client, {"client": client})
+    for client, entry in clients.items():
+        entry["runs_in_flight"] = jobs.count_client_jobs(client)
+        entry["batch_questions_in_flight"] = _batch_questions.get(client, 0)
+
+    return {
+        "runs": {
+            **jobs.get_queue_stats(),
+            "queue_limit": JOB_QUEUE_LIMIT,
+            "max_per_client": ADMISSION_MAX_RUNS_PER_CLIENT,
+        },
+        "limits": {
+            kind: {"rate": rate, "burst": burst} for kind, (rate, burst) in _BUCKET_LIMITS.items()
+        },
+        "rejected": dict(_rejected),
+        "clients": sorted(clients.values(), key=lambda c: c["client"]),
+    }
@@ -0,0 +1,182 @@
+"""Streaming NDJSON export and import of conversations."""
+
+import asyncio
+import json
+import re
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import storage
+from .config import IMPORT_BATCH_SIZE
+
+# What import does with a conversation whose ID is already stored
+CONFLICT_POLICIES = ("skip", "overwrite", "new_id")
+
+# Conversation IDs become file names, so only allow safe characters
+_ID_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+# Import results list at most this many per-line error messages
+MAX_REPORTED_ERRORS = 20
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO date or datetime filter value.
+
+    Raises:
+        ValueError: If the value is not ISO formatted
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def matches_filters(
+    conversation: Dict[str, Any],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    conversation_type: Optional[str] = None,
+    pinned_only: bool = False
+) -> bool:
+    """
+    Check a conversation against export filters.
+
+    Args:
+        conversation: Conversation dict
+        since: Keep conversations created at or after this time
+        until: Keep conversations created before this time
+        conversation_type: Keep only this type ("standard" or "agentic")
+        pinned_only: Keep only conversations with at least one pinned message
+    """
+    if conversation_type and conversation.get("conversation_type", "standard") != conversation_type:
+        return False
+    if since or until:
+        try:
+            created_at = datetime.fromisoformat(conversation["created_at"])
+        except (KeyError, ValueError):
+            return False
+        if since and created_at < since:
+            return False
+        if until and created_at >= until:
+            return False
+    if pinned_only and not any(m.get("pinned") for m in conversation.get("messages", [])):
+        return False
+    return True
+
+
+def export_lines(**filters) -> Iterator[str]:
+    """
+    Yield matching conversations as NDJSON lines, one conversation per line.
+
+    Conversations are read one at a time, so memory stays flat however
+    large the archive. Accepts the keyword filters of matches_filters.
+    """
+    for conversation in storage.iter_conversations():
+        if matches_filters(conversation, **filters):
+            yield json.dumps(conversation, separators=(',', ':')) + "\n"
+
+
+def new_import_result() -> Dict[str, Any]:
+    """Empty import counters, filled in by import_batch."""
+    return {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+
+
+def _parse_line(line: str) -> Dict[str, Any]:
+    conversation = json.loads(line)
+    if not isinstance(conversation, dict):
+        raise ValueError("expected a JSON object")
+    if not isinstance(conversation.get("id"), str) or not _ID_RE.match(conversation["id"]):
+        raise ValueError("missing or invalid 'id'")
+    if not isinstance(conversation.get("messages"), list):
+        raise ValueError("missing 'messages' list")
+    conversation.setdefault("created_at", datetime.utcnow().isoformat())
+    conversation.setdefault("title", "New Conversation")
+    conversation.setdefault("conversation_type", "standard")
+    return conversation
+
+
+def import_batch(lines: List[Tuple[int, str]], on_conflict: str, result: Dict[str, Any]):
+    """
+    Parse a batch of NDJSON lines and write the conversations in one storage batch.
+
+    Args:
+        lines: (line number, text) pairs; blank lines are ignored
+        on_conflict: One of CONFLICT_POLICIES
+        result: Counters from new_import_result, updated in place
+    """
+    to_save = []
+    seen = set()
+    for line_number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            conversation = _parse_line(line)
+        except ValueError as e:  # JSONDecodeError is a ValueError
+            result["failed"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append(f"line {line_number}: {e}")
+            continue
+
+        if conversation["id"] in seen or storage.conversation_exists(conversation["id"]):
+            if on_conflict == "skip":
+                result["skipped"] += 1
+                continue
+            if on_conflict == "new_id":
+                conversation["id"] = str(uuid.uuid4())
+        seen.add(conversation["id"])
+        to_save.append(conversation)
+
+    if to_save:
+        storage.save_conversations(to_save)
+        result["imported"] += len(to_save)
+
+
+def import_lines(lines: Iterable[str], on_conflict: str = "skip") -> Dict[str, Any]:
+    """
+    Import NDJSON conversations from an iterable of lines (e.g. an open file).
+
+    Returns:
+        Counts of imported, skipped and failed conversations, with the
+        first few error messages
+    """
+    result = new_import_result()
+    batch: List[Tuple[int, str]] = []
+    for line_number, line in enumerate(lines, start=1):
+        batch.append((line_number, line))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            import_batch(batch, on_conflict, result)
+            batch = []
+    if batch:
+        import_batch(batch, on_conflict, result)
+    return result
+
+
+async def import_stream(chunks: AsyncIterator[bytes], on_conflict: str = "skip") -> Dict[str, Any]:
+    """
+    Import NDJSON conversations from a streamed request body.
+
+    Lines are split out of the chunks as they arrive and each batch is
+    written from a worker thread, so neither memory nor event-loop time
+    grows with the size of the upload.
+    """
+    result = new_import_result()
+    batch: List[Tuple[int, str]] = []
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for line in complete:
+            line_number += 1
+            batch.append((line_number, line.decode("utf-8", errors="replace")))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await asyncio.to_thread(import_batch, batch, on_conflict, result)
+                batch = []
+
+    if buffer.strip():
+        batch.append((line_number + 1, buffer.decode("utf-8", errors="replace")))
+    if batch:
+        await asyncio.to_thread(import_batch, batch, on_conflict, result)
+    return result
@@ -0,0 +1,371 @@
+"""Headless batch evaluation: run the council over a JSONL file of questions."""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from . import admission, llm_client, selection, timeline
+from .config import BATCHES_DIR, BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_GLOBAL_CONCURRENCY
+from .council import is_error_response, run_full_council
+
+
+def get_batch_dir(batch_id: str) -> str:
+    """Get the directory holding a batch's questions, results and status."""
+    return os.path.join(BATCHES_DIR, batch_id)
+
+
+def _status_path(batch_id: str) -> str:
+    return os.path.join(get_batch_dir(batch_id), "batch.json")
+
+
+def _questions_path(batch_id: str) -> str:
+    return os.path.join(get_batch_dir(batch_id), "questions.jsonl")
+
+
+def get_results_path(batch_id: str) -> str:
+    """Get the results JSONL path for a batch."""
+    return os.path.join(get_batch_dir(batch_id), "results.jsonl")
+
+
+def parse_questions(lines: List[str]) -> List[Dict[str, str]]:
+    """
+    Parse JSONL question lines.
+
+    Each line is either a JSON string or an object with a "question" (or
+    "prompt") field and an optional "id". Questions without an id are
+    numbered by line so that resuming matches them up again.
+
+    Returns:
+        List of {"id", "question"} dicts
+    """
+    questions = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"question": item}
+        text = item.get("question") or item.get("prompt")
+        if not text:
+            raise ValueError(f"Line {line_number}: missing 'question'")
+        questions.append({"id": str(item.get("id", f"q{line_number}")), "question": text})
+
+    ids = [q["id"] for q in questions]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Question ids must be unique")
+    return questions
+
+
+def _write_status(batch: Dict[str, Any]):
+    """Atomically replace the batch status file."""
+    path = _status_path(batch["id"])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(batch, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def create_batch(
+    questions: List[Dict[str, str]],
+    council_config: Dict[str, Any],
+    concurrency: Optional[int] = None,
+    client: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create a batch and persist its questions.
+
+    Args:
+        questions: Output of parse_questions
+        council_config: Dict with "members" and "chairman" (see personas.resolve_council_config)
+        concurrency: Questions in flight at once (defaults to
+            BATCH_CONCURRENCY, capped at BATCH_MAX_CONCURRENCY)
+        client: Admission control client the batch's runs are charged to
+            (None for batches started from the CLI)
+
+    Returns:
+        The batch status dict
+
+    Raises:
+        ValueError: If concurrency is less than 1
+    """
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    batch_id = str(uuid.uuid4())
+    os.makedirs(get_batch_dir(batch_id), exist_ok=True)
+
+    with open(_questions_path(batch_id), "w") as f:
+        for question in questions:
+            f.write(json.dumps(question) + "\n")
+
+    batch = {
+        "id": batch_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "status": "pending",
+        "council_config": council_config,
+        "concurrency": min(concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY),
+        "client": client,
+        "total": len(questions),
+        "completed": 0,
+        "failed": 0,
+        "summary": None,
+    }
+    _write_status(batch)
+    return batch
+
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a batch's status.
+
+    A batch recorded as running without a live task in this process was
+    interrupted (e.g. by a restart) and can be resumed.
+    """
+    path = _status_path(batch_id)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        batch = json.load(f)
+    if batch["status"] == "running" and batch_id not in _running:
+        batch["status"] = "interrupted"
+    return batch
+
+
+def list_batches() -> List[Dict[str, Any]]:
+    """List all batches (without their council configs), newest first."""
+    if not os.path.isdir(BATCHES_DIR):
+        return []
+    batches = []
+    for batch_id in os.listdir(BATCHES_DIR):
+        batch = get_batch(batch_id)
+        if batch is not None:
+            batch.pop("council_config", None)
+            batches.append(batch)
+    batches.sort(key=lambda b: b["created_at"], reverse=True)
+    return batches
+
+
+def iter_results(batch_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read a batch's results.
+
+    A partially written last line (from a crash mid-write) is skipped; its
+    question is simply run again on resume.
+    """
+    path = get_results_path(batch_id)
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def summarize_results(batch_id: str) -> Dict[str, Any]:
+    """
+    Aggregate rankings across every completed question in a batch.
+
+    Returns:
+        Dict with per-member average rank (mean of per-question average
+        ranks), first-place count and number of questions ranked, sorted
+        best to worst
+    """
+    ranks = defaultdict(list)
+    wins = defaultdict(int)
+    questions = 0
+
+    for result in iter_results(batch_id):
+        rankings = result.get("aggregate_rankings")
+        if result.get("error") or not rankings:
+            continue
+        questions += 1
+        wins[rankings[0]["model"]] += 1
+        for entry in rankings:
+            ranks[entry["model"]].append(entry["average_rank"])
+
+    members = [
+        {
+            "model": model,
+            "average_rank": round(sum(values) / len(values), 3),
+            "first_place": wins[model],
+            "questions_ranked": len(values),
+        }
+        for model, values in ranks.items()
+    ]
+    members.sort(key=lambda m: m["average_rank"])
+    return {"questions": questions, "members": members}
+
+
+async def _run_question(question: Dict[str, str], council_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one question through the council and build its result record."""
+    start = time.perf_counter()
+    result = {"id": question["id"], "question": question["question"]}
+    members, member_selection = selection.choose_members(council_config["members"], council_config.get("member_budget"))
+    try:
+        with timeline.span("turn") as turn_span:
+            stage1, stage2, stage3, metadata = await run_full_council(
+                question["question"],
+                members,
+                council_config["chairman"]
+            )
+        selection.record_turn(stage1, metadata, timeline.to_compact(turn_span))
+        # Failed members answer with error placeholders, so stage1 is rarely empty
+        if all(is_error_response(r) for r in stage1):
+            result["error"] = "All models failed to respond"
+            result["stage1"] = stage1
+        else:
+            if member_selection:
+                result["selection"] = member_selection
+            result.update({
+                "stage1": stage1,
+                "stage2": stage2,
+                "stage3": stage3,
+                "aggregate_rankings": metadata.get("aggregate_rankings", []),
+                "label_to_model": metadata.get("label_to_model", {}),
+            })
+    except Exception as e:
+        result["error"] = str(e)
+    result["duration_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+_running: Dict[str, asyncio.Task] = {}
+
+# Questions in flight across every batch in this process; created on first use
+_global_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_global_slots() -> asyncio.Semaphore:
+    global _global_slots
+    if _global_slots is None:
+        _global_slots = asyncio.Semaphore(BATCH_GLOBAL_CONCURRENCY)
+    return _global_slots
+
+
+async def run_batch(
+    batch_id: str,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run (or resume) a batch until every question has a result.
+
+    Questions already in the results file are skipped, so an interrupted
+    batch picks up where it stopped. Model calls run at background
+    priority under the batch's own fair-share key, so batches soak up idle
+    host capacity without delaying interactive users. Questions are admitted
+    as batch questions (see backend.admission), so they wait while
+    interactive runs are queued but not on the client's per-run limits.
+
+    Args:
+        batch_id: The batch to run
+        on_result: Optional callback(result, batch) after each question
+
+    Returns:
+        The final batch status dict
+    """
+    batch = get_batch(batch_id)
+    if batch is None:
+        raise ValueError(f"Batch {batch_id} not found")
+
+    with open(_questions_path(batch_id)) as f:
+        questions = parse_questions(f.readlines())
+
+    done_ids = set()
+    batch["completed"] = batch["failed"] = 0
+    for result in iter_results(batch_id):
+        done_ids.add(result["id"])
+        batch["failed" if result.get("error") else "completed"] += 1
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for question in questions:
+        if question["id"] not in done_ids:
+            pending.put_nowait(question)
+
+    llm_client.set_schedule_context(f"batch:{batch_id}")
+    llm_client.set_priority_floor(llm_client.PRIORITY_BACKGROUND)
+    admission.set_client(batch.get("client"), batch=True)
+
+    batch["status"] = "running"
+    batch.pop("finished_at", None)
+    _write_status(batch)
+
+    async def worker(results_file):
+        while True:
+            try:
+                question = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            async with _get_global_slots(), admission.batch_question_admitted(batch.get("client")):
+                result = await _run_question(question, batch["council_config"])
+            # The results file is the checkpoint: one flushed line per question
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            batch["failed" if result.get("error") else "completed"] += 1
+            _write_status(batch)
+            if on_result is not None:
+                on_result(result, batch)
+
+    try:
+        with open(get_results_path(batch_id), "a+") as results_file:
+            # Terminate a line left half-written by a crash so new results start clean
+            if results_file.tell() > 0:
+                results_file.seek(results_file.tell() - 1)
+                if results_file.read(1) != "\n":
+                    results_file.write("\n")
+            concurrency = max(1, min(batch["concurrency"], BATCH_MAX_CONCURRENCY))
+            workers = [asyncio.create_task(worker(results_file)) for _ in range(concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+        batch["status"] = "completed"
+    except asyncio.CancelledError:
+        batch["status"] = "cancelled"
+        raise
+    except Exception as e:
+        print(f"Batch {batch_id} failed: {e}")
+        batch["status"] = "failed"
+        batch["error"] = str(e)
+    finally:
+        batch["summary"] = summarize_results(batch_id)
+        batch["finished_at"] = datetime.utcnow().isoformat()
+        _write_status(batch)
+
+    return batch
+
+
+def start_batch(batch_id: str) -> bool:
+    """
+    Run a batch in the background of the current event loop.
+
+    Returns:
+        False if the batch is already running in this process
+    """
+    if batch_id in _running:
+        return False
+    task = asyncio.create_task(run_batch(batch_id))
+    _running[batch_id] = task
+    task.add_done_callback(lambda _: _running.pop(batch_id, None))
+    return True
+
+
+def cancel_batch(batch_id: str) -> bool:
+    """
+    Cancel a running batch; completed results are kept and it can be resumed.
+
+    Returns:
+        False if the batch is not running in this process
+    """
+    task = _running.get(batch_id)
+    if task is None:
+        return False
+    task.cancel()
+    return True
@@ -0,0 +1,163 @@
+"""Background tiering and retention for stored conversations."""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from . import storage
+from .config import (
+    DATA_DIR,
+    STORAGE_COLD_AFTER_DAYS,
+    STORAGE_STAGE2_RATIONALE_DAYS,
+    STORAGE_TIMELINE_DAYS,
+    STORAGE_COMPACTION_INTERVAL_SECONDS,
+)
+
+DAY_SECONDS = 86400
+
+# (path, mtime) of files already checked against the retention policies, so
+# unchanged cold files are not decompressed again on every pass
+_checked: Set[Tuple[str, float]] = set()
+
+_loop_task: Optional[asyncio.Task] = None
+
+
+def _older_than(age_seconds: float, days: Optional[float]) -> bool:
+    return days is not None and age_seconds >= days * DAY_SECONDS
+
+
+def apply_retention(conversation: Dict[str, Any], age_seconds: float) -> bool:
+    """
+    Drop detail that retention policies no longer keep.
+
+    Pinned messages are left intact. Stage 2 evaluation text is removed
+    but each judge's parsed ranking and the aggregate rankings stay, so
+    "street cred" and selection stats survive.
+
+    Args:
+        conversation: Conversation dict, modified in place
+        age_seconds: Time since the conversation was last written
+
+    Returns:
+        True if anything was dropped
+    """
+    drop_rationale = _older_than(age_seconds, STORAGE_STAGE2_RATIONALE_DAYS)
+    drop_timeline = _older_than(age_seconds, STORAGE_TIMELINE_DAYS)
+    modified = False
+
+    for message in conversation.get("messages", []):
+        if message.get("role") != "assistant" or message.get("pinned"):
+            continue
+        if drop_rationale:
+            # Superseded revisions' rankings go too
+            revised = [revision.get("stage2") for revision in message.get("revisions", [])]
+            for stage2 in [message.get("stage2")] + revised:
+                for ranking in stage2 or []:
+                    if not ranking.get("rationale_dropped"):
+                        ranking["ranking"] = ""
+                        ranking["rationale_dropped"] = True
+                        modified = True
+        if drop_timeline and "timeline" in message:
+            del message["timeline"]
+            modified = True
+
+    return modified
+
+
+def compact_conversation(path: str, now: Optional[float] = None) -> Optional[str]:
+    """
+    Apply tiering and retention to one conversation file.
+
+    Returns:
+        "cold" if the conversation was compressed, "retained" if retention
+        rewrote it in place, None if nothing changed
+    """
+    now = now or time.time()
+    filename = os.path.basename(path)
+    suffix = storage.COLD_SUFFIX if storage.is_cold_path(path) else storage.HOT_SUFFIX
+    with storage.conversation_lock(filename[:-len(suffix)]):
+        if not os.path.exists(path):
+            return None
+        mtime = os.path.getmtime(path)
+        age = now - mtime
+        cold = storage.is_cold_path(path)
+        make_cold = not cold and _older_than(age, STORAGE_COLD_AFTER_DAYS)
+
+        if not make_cold and (path, mtime) in _checked:
+            return None
+
+        conversation = storage.read_conversation_file(path)
+        retained = apply_retention(conversation, age)
+        if make_cold or retained:
+            # Keep the original mtime: compaction is not activity
+            storage.write_conversation_file(conversation, cold=cold or make_cold, mtime=mtime)
+
+        new_path = storage.get_cold_conversation_path(conversation["id"]) if cold or make_cold else path
+        _checked.discard((path, mtime))
+        _checked.add((new_path, mtime))
+
+    if make_cold:
+        return "cold"
+    return "retained" if retained else None
+
+
+def compact_storage() -> Dict[str, int]:
+    """
+    Run one compaction pass over every stored conversation.
+
+    Conversations with a council run in progress are skipped.
+
+    Returns:
+        Counts of conversations compressed, rewritten by retention, and
+        failed
+    """
+    from . import jobs
+
+    counts = {"scanned": 0, "cold": 0, "retained": 0, "errors": 0}
+    if not os.path.isdir(DATA_DIR):
+        return counts
+
+    now = time.time()
+    for filename in os.listdir(DATA_DIR):
+        if filename.endswith(storage.HOT_SUFFIX):
+            conversation_id = filename[:-len(storage.HOT_SUFFIX)]
+        elif filename.endswith(storage.COLD_SUFFIX):
+            conversation_id = filename[:-len(storage.COLD_SUFFIX)]
+        else:
+            continue
+        if jobs.get_active_job_id(conversation_id) is not None:
+            continue
+
+        counts["scanned"] += 1
+        try:
+            outcome = compact_conversation(os.path.join(DATA_DIR, filename), now)
+        except Exception as e:
+            print(f"Error compacting conversation {conversation_id}: {e}")
+            counts["errors"] += 1
+            continue
+        if outcome:
+            counts[outcome] += 1
+
+    return counts
+
+
+async def run_compaction_loop():
+    """Compact storage every STORAGE_COMPACTION_INTERVAL_SECONDS, off the event loop."""
+    while True:
+        try:
+            counts = await asyncio.to_thread(compact_storage)
+            if counts["cold"] or counts["retained"] or counts["errors"]:
+                print(f"Storage compaction: {counts}")
+        except Exception as e:
+            print(f"Error during storage compaction: {e}")
+        await asyncio.sleep(STORAGE_COMPACTION_INTERVAL_SECONDS)
+
+
+def start_compaction_loop():
+    """Start the background compaction task (no-op if disabled or already running)."""
+    global _loop_task
+    if not STORAGE_COMPACTION_INTERVAL_SECONDS:
+        return
+    if _loop_task is None or _loop_task.done():
+        _loop_task = asyncio.create_task(run_compaction_loop())
@@ -18,14 +18,180 @@ COUNCIL_MODELS = [
 CHAIRMAN_MODEL = "ollama/gpt-oss:20b"
 
 # OpenRouter API endpoint
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+OPENROUTER_MODELS_URL = OPENROUTER_API_URL.replace("/chat/completions", "/models")
+
+# Model catalog served by /api/models: refreshed in the background this often
+# (and right after the Ollama URL changes), with this timeout per provider
+# request. With MODEL_CATALOG_OPENROUTER the full OpenRouter model list is
+# fetched too; otherwise a short built-in list is offered.
+MODEL_CATALOG_REFRESH_SECONDS = 30
+MODEL_CATALOG_TIMEOUT = 2.0
+MODEL_CATALOG_OPENROUTER = False
 
 # Data directory for conversation storage
 DATA_DIR = "data/conversations"
 
+# Council turns are checkpointed into the conversation as each Stage 1
+# answer and each stage completes; PENDING_TURNS_DIR marks conversations
+# with an unfinished turn. On startup, turns that were still running are
+# resumed if they started less than TURN_RESUME_MAX_AGE_SECONDS ago (None:
+# any age; 0 disables resuming on startup); older or cancelled ones wait
+# for an explicit resume.
+PENDING_TURNS_DIR = "data/pending_turns"
+TURN_RESUME_MAX_AGE_SECONDS = 3600
+
+# Regenerating part of a stored answer keeps the stages it replaced in the
+# message's revision history, up to this many revisions (oldest dropped)
+MESSAGE_REVISIONS_KEEP = 10
+
+# Tiered storage: conversations untouched for STORAGE_COLD_AFTER_DAYS are
+# gzipped (read back transparently; writing one makes it hot again).
+# Retention drops bulky detail from conversations idle for longer, pinned
+# messages excepted: Stage 2 evaluation text (parsed rankings are kept) and
+# turn timelines. None disables a policy; an interval of None disables the
+# background compaction task.
+STORAGE_COLD_AFTER_DAYS = 14
+STORAGE_STAGE2_RATIONALE_DAYS = 90
+STORAGE_TIMELINE_DAYS = None
+STORAGE_COMPACTION_INTERVAL_SECONDS = 3600
+
+# Full-text search index (SQLite FTS5), updated as messages are stored and
+# rebuilt from storage if missing. Titles, user messages and Stage 3 answers
+# are always indexed; Stage 1 answers are optional as they multiply its size.
+SEARCH_INDEX_FILE = "data/search.db"
+SEARCH_INDEX_STAGE1 = True
+
+# NDJSON imports are written to storage this many conversations at a time
+IMPORT_BATCH_SIZE = 100
+
+# JSON responses at least this large are gzipped for clients that accept it
+GZIP_MIN_SIZE = 1024
+
+# Background council jobs: number of concurrent runs, where their event logs
+# are persisted, how long finished jobs stay in memory for live viewers and
+# how long their logs are kept on disk for replay
+JOBS_DIR = "data/jobs"
+JOB_WORKERS = 4
+JOB_RETENTION_SECONDS = 600
+JOB_LOG_RETENTION_SECONDS = 24 * 3600
+# A run is cancelled this long after its last viewer disconnects, unless
+# someone reattaches first (None keeps orphaned runs going)
+JOB_ORPHAN_GRACE_SECONDS = 30
+# Runs waiting for a worker beyond this many are refused with 503 (None
+# queues without bound)
+JOB_QUEUE_LIMIT = 16
+
+# Admission control per client (X-API-Key header, or address without one).
+# Setting user_api_key, or listing keys here, makes a key mandatory for
+# starting council runs. Turns and model calls are token buckets: RATE per
+# second sustained, BURST at once (a RATE of 0 disables the limit). Model
+# calls over budget wait rather than fail. The per-client limits apply to
+# clients with a key only; callers without one share the global queue.
+ADMISSION_API_KEYS = [k for k in os.getenv("ADMISSION_API_KEYS", "").split(",") if k]
+ADMISSION_TURN_RATE = 0.2
+ADMISSION_TURN_BURST = 5
+ADMISSION_MODEL_CALL_RATE = 5
+ADMISSION_MODEL_CALL_BURST = 60
+ADMISSION_MAX_RUNS_PER_CLIENT = 2
+
+# Council run event streams: protocol 1 is the original one-JSON-object-per-
+# event format; protocol 2 (opt in with ?protocol=2) is compact, sends
+# references instead of repeated stage payloads, emits heartbeats while idle
+# and is gzipped per frame for clients that accept it
+SSE_DEFAULT_PROTOCOL = 1
+SSE_HEARTBEAT_SECONDS = 15
+SSE_GZIP = True
+
+# Consensus short-circuit: when every pair of Stage 1 answers is at least
+# CONSENSUS_THRESHOLD similar (MinHash estimate of word-shingle Jaccard),
+# peer review is skipped ("skip") or done by one judge ("single_judge").
+# "off" always runs the full review.
+CONSENSUS_MODE = "skip"
+CONSENSUS_THRESHOLD = 0.8
+# Optional Ollama embedding model (e.g. "nomic-embed-text"); when set, answers
+# are compared by embedding cosine similarity against its own threshold
+CONSENSUS_EMBEDDING_MODEL = None
+CONSENSUS_EMBEDDING_THRESHOLD = 0.95
+
+# Near-duplicate Stage 1 answers (MinHash similarity at or above this) are
+# shown to the judges and the chairman once, and the cluster's rank is
+# credited to every member in it. None disables deduplication.
+DEDUP_THRESHOLD = 0.85
+
+# Adaptive member selection for councils with a per-turn member budget:
+# per-member quality/latency stats, the UCB exploration factor, and how much
+# reward the slowest candidate gives up for its latency
+SELECTION_STATS_FILE = "data/member_stats.json"
+SELECTION_EXPLORATION = 0.5
+SELECTION_LATENCY_WEIGHT = 0.2
+
+# Batch evaluation runs: where questions, checkpointed results and status are
+# kept, and how many questions a batch runs at once by default. A batch may
+# ask for up to BATCH_MAX_CONCURRENCY; all batches in a process together
+# run at most BATCH_GLOBAL_CONCURRENCY questions at once, and hold off while
+# interactive runs are queued for a worker.
+BATCHES_DIR = "data/batches"
+BATCH_CONCURRENCY = 8
+BATCH_MAX_CONCURRENCY = 32
+BATCH_GLOBAL_CONCURRENCY = 16
+
+# Usage accounting: each model call's tokens, compute time (Ollama's load
+# and evaluation time, i.e. GPU time) and cost (reported by OpenRouter, or
+# estimated from catalog pricing) are totalled per stage in the message
+# metadata, per conversation, and per client and team in USAGE_FILE.
+# USAGE_TEAMS assigns API keys to teams ("key1:team-a,key2:team-b").
+USAGE_FILE = "data/usage.json"
+USAGE_TEAMS = dict(pair.split(":", 1) for pair in os.getenv("USAGE_TEAMS", "").split(",") if ":" in pair)
+
+# Conversation budgets (None: unlimited), overridable per conversation with
+# token_budget / cost_budget when it is created. Once a conversation has
+# used its budget, new turns and further agentic rounds either "stop" or
+# "downgrade" every member and the chairman to USAGE_DOWNGRADE_MODEL
+# (personas keep their prompts); "downgrade" without a model stops.
+USAGE_TOKEN_BUDGET = None
+USAGE_COST_BUDGET = None
+USAGE_BUDGET_ACTION = "downgrade"
+USAGE_DOWNGRADE_MODEL = None
+
+# Conversation memory: the most recent turns are sent verbatim, everything
+# older is folded into a rolling summary written by the chairman.
+MEMORY_RECENT_TURNS = 3
+MEMORY_TURN_MAX_CHARS = 4000
+MEMORY_SUMMARY_MAX_CHARS = 3000
+
 # Ollama Configuration
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/api/chat")
 
+# Concurrent model calls allowed per host; further calls are queued by the
+# fair-share scheduler in llm_client
+OLLAMA_CONCURRENCY = 2
+OPENROUTER_CONCURRENCY = 16
+
+# Ollama context window (num_ctx) for calls whose inference profile does not
+# set one: the estimated prompt plus OLLAMA_NUM_CTX_REPLY_TOKENS (or the
+# profile's num_predict), rounded up to one of these buckets and capped at
+# the model's own context length. Ollama reloads a model whenever num_ctx
+# changes, so a model keeps the largest window it was given until it has
+# been idle for OLLAMA_NUM_CTX_STICKY_SECONDS (Ollama's default keep_alive).
+# None leaves num_ctx to Ollama.
+OLLAMA_NUM_CTX_BUCKETS = [4096, 8192, 16384, 32768, 65536, 131072]
+OLLAMA_NUM_CTX_REPLY_TOKENS = 2048
+OLLAMA_NUM_CTX_STICKY_SECONDS = 300
+
+# Share of contended model slots an agentic conversation gets relative to a
+# standard one, so long multi-round runs cannot starve interactive users
+SCHEDULER_AGENTIC_WEIGHT = 0.5
+
+# Coordination between API processes sharing DATA_DIR (uvicorn --workers N):
+# "local" for a single process, or "sqlite" to share the per-host model
+# concurrency limits above, conversation write locks and council run
+# ownership through COORDINATION_DB. Leases of a process that dies expire
+# after COORDINATION_LEASE_SECONDS.
+COORDINATION_BACKEND = os.getenv("COORDINATION_BACKEND", "local")
+COORDINATION_DB = "data/coordination.db"
+COORDINATION_LEASE_SECONDS = 30
+
 # Example of how to specify models:
 # "openai/gpt-4" -> OpenRouter
 # "ollama/llama3" -> Ollama
@@ -0,0 +1,336 @@
+"""
+Coordination between API processes sharing one data directory.
+
+With a single process (the default "local" backend) every operation is a
+no-op: the in-process scheduler, storage lock and job table already do
+the job. The "sqlite" backend lets several uvicorn workers on one host
+share model-host concurrency slots, per-conversation storage write locks
+and council job ownership. Other backends (e.g. Redis for multi-node
+deployments) can be added to BACKENDS.
+"""
+
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .config import COORDINATION_BACKEND, COORDINATION_DB, COORDINATION_LEASE_SECONDS
+
+# Conversation write locks are striped over this many lock files
+STORAGE_LOCK_STRIPES = 64
+
+# Bounds of the back-off while polling for a free model-host slot
+SLOT_POLL_MIN_SECONDS = 0.02
+SLOT_POLL_MAX_SECONDS = 0.5
+
+
+class LocalCoordinator:
+    """Single-process coordination: nothing to share, so nothing to do."""
+
+    name = "local"
+
+    async def acquire_slot(self, host: str, limit: int) -> Optional[str]:
+        """
+        Take one of `limit` concurrency slots on a model host, waiting if needed.
+
+        Returns:
+            A lease to pass to release_slot (None when not shared)
+        """
+        return None
+
+    def release_slot(self, lease: Optional[str]):
+        """Give back a slot taken with acquire_slot."""
+
+    @contextmanager
+    def storage_lock(self, key: str) -> Iterator[None]:
+        """Exclusive lock on a conversation across processes (reentrant)."""
+        yield
+
+    def claim_job(self, conversation_id: str, job_id: str) -> Optional[str]:
+        """
+        Record this process as the owner of a conversation's council run.
+
+        Returns:
+            None if claimed, else the job id of the run another process owns
+        """
+        return None
+
+    def release_job(self, conversation_id: str, job_id: str):
+        """Drop ownership of a finished run."""
+
+    def get_active_job_id(self, conversation_id: str) -> Optional[str]:
+        """Job id of the conversation's run in any process, if one is active."""
+        return None
+
+    def is_job_active(self, job_id: str) -> bool:
+        """Whether a job is still owned by a live process."""
+        return False
+
+    def touch_job(self, job_id: str):
+        """Note that a viewer in this process is following another process's job."""
+
+    def job_viewed_at(self, job_id: str) -> Optional[float]:
+        """When a viewer in another process last followed a job (see touch_job)."""
+        return None
+
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        Ask whichever process owns a job to cancel it.
+
+        Returns:
+            True if the job is active somewhere
+        """
+        return False
+
+    def on_cancel_requested(self, handler: Callable[[str], None]):
+        """Register the callback run (with a job id) when another process asks to cancel one of ours."""
+
+
+class SQLiteCoordinator(LocalCoordinator):
+    """
+    Coordination through a SQLite database and lock files next to the data.
+
+    Slots and job ownership are leases that this process renews in the
+    background; a process that dies stops renewing and its leases expire
+    after COORDINATION_LEASE_SECONDS. Storage locks are flock()s, which
+    the OS releases when a process dies.
+    """
+
+    name = "sqlite"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS slots (
+        lease TEXT PRIMARY KEY,
+        host TEXT NOT NULL,
+        holder TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS slots_by_host ON slots (host);
+    CREATE TABLE IF NOT EXISTS jobs (
+        conversation_id TEXT PRIMARY KEY,
+        job_id TEXT NOT NULL,
+        holder TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        viewed_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_by_id ON jobs (job_id);
+    """
+
+    def __init__(self, path: str = COORDINATION_DB, lease_seconds: float = COORDINATION_LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self._SCHEMA)
+
+        self._lock_dir = os.path.join(os.path.dirname(path) or ".", "locks")
+        os.makedirs(self._lock_dir, exist_ok=True)
+        # One in-process lock per stripe, so only conversations sharing a
+        # stripe wait for each other
+        self._stripe_locks = [threading.RLock() for _ in range(STORAGE_LOCK_STRIPES)]
+        self._held: Dict[int, List[int]] = {}  # stripe -> [fd, depth]
+
+        self._cancel_handler: Optional[Callable[[str], None]] = None
+        self._renewer: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def _transaction(self):
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _ensure_renewer(self):
+        loop = asyncio.get_running_loop()
+        if self._renewer is None or self._renewer.done() or self._renewer.get_loop() is not loop:
+            self._renewer = loop.create_task(self._renew_loop())
+
+    async def _renew_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                cancelled = self.renew()
+            except sqlite3.Error as e:
+                print(f"Error renewing coordination leases: {e}")
+                continue
+            for job_id in cancelled:
+                if self._cancel_handler is not None:
+                    self._cancel_handler(job_id)
+
+    def renew(self) -> List[str]:
+        """
+        Extend every lease this process holds.
+
+        Returns:
+            Ids of our jobs that another process asked to cancel
+        """
+        expires_at = time.time() + self.lease_seconds
+        with self._transaction() as db:
+            db.execute("UPDATE slots SET expires_at = ? WHERE holder = ?", (expires_at, self.holder))
+            db.execute("UPDATE jobs SET expires_at = ? WHERE holder = ?", (expires_at, self.holder))
+            rows = db.execute(
+                "SELECT job_id FROM jobs WHERE holder = ? AND cancel_requested = 1", (self.holder,)
+            ).fetchall()
+            db.execute("UPDATE jobs SET cancel_requested = 0 WHERE holder = ?", (self.holder,))
+        return [row[0] for row in rows]
+
+    def _try_acquire_slot(self, host: str, limit: int) -> Optional[str]:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("DELETE FROM slots WHERE host = ? AND expires_at < ?", (host, now))
+            in_use = db.execute("SELECT COUNT(*) FROM slots WHERE host = ?", (host,)).fetchone()[0]
+            if in_use >= limit:
+                return None
+            lease = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO slots (lease, host, holder, expires_at) VALUES (?, ?, ?, ?)",
+                (lease, host, self.holder, now + self.lease_seconds)
+            )
+            return lease
+
+    async def acquire_slot(self, host: str, limit: int) -> Optional[str]:
+        self._ensure_renewer()
+        delay = SLOT_POLL_MIN_SECONDS
+        while True:
+            lease = self._try_acquire_slot(host, limit)
+            if lease is not None:
+                return lease
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SLOT_POLL_MAX_SECONDS)
+
+    def release_slot(self, lease: Optional[str]):
+        if lease is None:
+            return
+        with self._transaction() as db:
+            db.execute("DELETE FROM slots WHERE lease = ?", (lease,))
+
+    def _flock(self, stripe: int) -> int:
+        """Open and lock a stripe's lock file, returning its descriptor."""
+        fd = os.open(os.path.join(self._lock_dir, f"storage-{stripe}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process holds it (for one short storage write);
+                # only now does this thread block
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    @contextmanager
+    def storage_lock(self, key: str) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        stripe = zlib.crc32(key.encode()) % STORAGE_LOCK_STRIPES
+        with self._stripe_locks[stripe]:
+            # flock() is per open file, so re-entering from this process
+            # must reuse the descriptor rather than lock a second one
+            held = self._held.get(stripe)
+            if held is None:
+                held = self._held[stripe] = [self._flock(stripe), 0]
+            held[1] += 1
+            try:
+                yield
+            finally:
+                held[1] -= 1
+                if held[1] == 0:
+                    del self._held[stripe]
+                    fcntl.flock(held[0], fcntl.LOCK_UN)
+                    os.close(held[0])
+
+    def claim_job(self, conversation_id: str, job_id: str) -> Optional[str]:
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT job_id FROM jobs WHERE conversation_id = ? AND expires_at >= ?", (conversation_id, now)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (conversation_id, job_id, holder, expires_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, job_id, self.holder, now + self.lease_seconds)
+            )
+        try:
+            self._ensure_renewer()
+        except RuntimeError:
+            # No running loop; the caller is synchronous and short-lived
+            pass
+        return None
+
+    def release_job(self, conversation_id: str, job_id: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM jobs WHERE conversation_id = ? AND job_id = ?", (conversation_id, job_id))
+
+    def get_active_job_id(self, conversation_id: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT job_id FROM jobs WHERE conversation_id = ? AND expires_at >= ?",
+                (conversation_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_job_active(self, job_id: str) -> bool:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND expires_at >= ?", (job_id, time.time())
+            ).fetchone()
+        return row is not None
+
+    def touch_job(self, job_id: str):
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET viewed_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def job_viewed_at(self, job_id: str) -> Optional[float]:
+        with self._db_lock:
+            row = self._db.execute("SELECT viewed_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def request_cancel(self, job_id: str) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND expires_at >= ?", (job_id, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def on_cancel_requested(self, handler: Callable[[str], None]):
+        self._cancel_handler = handler
+
+
+BACKENDS = {
+    "local": LocalCoordinator,
+    "sqlite": SQLiteCoordinator,
+}
+
+_coordinator: Optional[LocalCoordinator] = None
+
+
+def get_coordinator() -> LocalCoordinator:
+    """The process-wide coordinator for COORDINATION_BACKEND, created on first use."""
+    global _coordinator
+    if _coordinator is None:
+        if COORDINATION_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown coordination backend {COORDINATION_BACKEND!r}")
+        _coordinator = BACKENDS[COORDINATION_BACKEND]()
+    return _coordinator
@@ -1,13 +1,75 @@
 """3-stage Quorum orchestration."""
 
-from typing import List, Dict, Any, Tuple
-from .llm_client import query_models_parallel, query_model
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
+import asyncio
+import re
+from typing import List, Dict, Any, Tuple, Optional, Callable, Awaitable
+from .llm_client import query_models_parallel, query_model, embed_texts, PRIORITY_CHAIRMAN, PRIORITY_BACKGROUND
+from .memory import format_context
+from .metrics import STAGE_DURATION, timed
+from . import personas, timeline, similarity, usage
+from .config import (
+    COUNCIL_MODELS, CHAIRMAN_MODEL,
+    CONSENSUS_MODE, CONSENSUS_THRESHOLD, CONSENSUS_EMBEDDING_MODEL, CONSENSUS_EMBEDDING_THRESHOLD,
+    DEDUP_THRESHOLD,
+)
+
+
+# Judges are asked to close their ranking with this line, and it doubles as
+# a provider stop sequence
+RANKING_END_MARKER = "END OF RANKING"
+
+_RANKING_ENTRY_RE = re.compile(r'\d+\.\s*(Response [A-Z])')
+
+# Agentic councils store their follow-up questions as user messages with this prefix
+FOLLOWUP_PREFIX = "Chairman's Follow-up: "
+
+
+async def _query_member(member: Dict[str, Any], messages: List[Dict[str, str]], **kwargs):
+    """Query one council member, recording it as a span in the turn timeline."""
+    with timeline.span("member", member=member.get('name', member['model_id'])):
+        return await query_model(
+            member['model_id'], messages,
+            system_prompt=member.get('system_prompt'),
+            inference=personas.inference_profile(member),
+            **kwargs
+        )
+
+
+class RankingStreamParser:
+    """
+    Incremental FINAL RANKING detector for streamed Stage 2 output.
 
+    Called with the text generated so far, it returns True as soon as the
+    ranking section lists every label, so the judge's request can be closed
+    instead of decoding trailing commentary.
+    """
 
+    def __init__(self, labels: List[str]):
+        self.labels = set(labels)
+        self._section_start: Optional[int] = None
+        self._searched = 0
+
+    def __call__(self, text: str) -> bool:
+        if self._section_start is None:
+            # Only scan text that arrived since the last call (plus enough
+            # overlap to catch a header split across chunks)
+            index = text.find("FINAL RANKING:", max(0, self._searched - len("FINAL RANKING:")))
+            self._searched = len(text)
+            if index == -1:
+                return False
+            self._section_start = index + len("FINAL RANKING:")
+        ranked = set(_RANKING_ENTRY_RE.findall(text, self._section_start))
+        return self.labels <= ranked
+
+
+@timed(STAGE_DURATION, stage="stage1")
+@timeline.traced("stage1")
 async def stage1_collect_responses(
     user_query: str,
-    council_members: List[Dict[str, Any]]
+    council_members: List[Dict[str, Any]],
+    context: Optional[List[Dict[str, str]]] = None,
+    completed: Optional[List[Optional[Dict[str, Any]]]] = None,
+    on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
 ) -> List[Dict[str, Any]]:
     """
     Stage 1: Collect individual responses from all council models.
@@ -15,61 +77,108 @@ async def stage1_collect_responses(
     Args:
         user_query: The user's question
         council_members: List of dicts with 'model_id', 'name', 'system_prompt'
+        context: Optional prior conversation messages (see memory.build_context)
+        completed: Results already collected by an interrupted run, aligned
+            with council_members (None for members still to query); those
+            members are not queried again
+        on_result: Awaited with (member index, result) as each member's
+            answer arrives, e.g. to checkpoint it; not called for failures
 
     Returns:
         List of dicts with 'model', 'response', 'persona_name' keys
     """
-    messages = [{"role": "user", "content": user_query}]
-    
-    models = [m['model_id'] for m in council_members]
-    system_prompts = [m.get('system_prompt') for m in council_members]
-
-    # Query all models in parallel
-    # Note: query_models_parallel returns a dict keyed by model_id.
-    # If we have multiple personas using the same model, this simple dict approach fails.
-    # We should query individually or update query_models_parallel to return a list.
-    # For now, let's use query_models_parallel but be careful about duplicates.
-    # Actually, let's just use query_model in a loop here to be safe and support duplicates.
-    
-    import asyncio
-    tasks = [
-        query_model(m['model_id'], messages, system_prompt=m.get('system_prompt'))
-        for m in council_members
-    ]
-    
-    responses = await asyncio.gather(*tasks, return_exceptions=True)
+    messages = (context or []) + [{"role": "user", "content": user_query}]
 
-    # Format results
-    stage1_results = []
-    for member, response in zip(council_members, responses):
-        if isinstance(response, Exception):
-             # Handle failure
-            stage1_results.append({
-                "model": member['model_id'],
-                "persona_name": member.get('name', member['model_id']),
-                "response": f"Error: {str(response)}"
-            })
-        elif response is not None:  # Only include successful responses
-            stage1_results.append({
-                "model": member['model_id'],
-                "persona_name": member.get('name', member['model_id']),
-                "response": response.get('content', '')
-            })
-        else:
-            # Handle failure (None returns)
-            stage1_results.append({
-                "model": member['model_id'],
-                "persona_name": member.get('name', member['model_id']),
-                "response": "Error: Failed to generate response."
-            })
+    # Members are queried individually (not with query_models_parallel) so
+    # several personas can share one model
+    async def collect(index: int, member: Dict[str, Any]) -> Dict[str, Any]:
+        if completed and completed[index] is not None:
+            return completed[index]
+        try:
+            response = await _query_member(member, messages)
+        except Exception as e:
+            return _stage1_result(member, f"Error: {str(e)}")
+        if response is None:
+            return _stage1_result(member, "Error: Failed to generate response.")
+        result = _stage1_result(member, response.get('content', ''))
+        if on_result is not None:
+            await on_result(index, result)
+        return result
+
+    return list(await asyncio.gather(*(collect(i, m) for i, m in enumerate(council_members))))
 
-    return stage1_results
 
+def _stage1_result(member: Dict[str, Any], response: str) -> Dict[str, Any]:
+    return {
+        "model": member['model_id'],
+        "persona_name": member.get('name', member['model_id']),
+        "response": response
+    }
+
+
+def is_error_response(result: Dict[str, Any]) -> bool:
+    """Whether a Stage 1 result is a failed member's error placeholder."""
+    return result['response'].startswith("Error:")
+
+
+def label_responses(stage1_results: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Map anonymized labels (Response A, B, ...) to the persona names behind them."""
+    return {
+        f"Response {chr(65 + i)}": result['persona_name']
+        for i, result in enumerate(stage1_results)
+    }
 
+
+@timeline.traced("consensus")
+async def detect_consensus(stage1_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Check whether the Stage 1 answers already agree.
+
+    Answers are compared pairwise and the lowest similarity decides, so a
+    single dissenting member keeps the full review. Uses embedding cosine
+    similarity when CONSENSUS_EMBEDDING_MODEL is set (falling back to
+    MinHash if the embedding call fails), MinHash Jaccard otherwise.
+
+    Returns:
+        Dict with method, similarity, threshold and agreed, or None when the
+        check is disabled or fewer than two members gave a non-empty answer
+    """
+    if CONSENSUS_MODE == "off":
+        return None
+
+    # Empty answers are all alike, but agree on nothing
+    answers = [r['response'] for r in stage1_results if not is_error_response(r) and similarity.shingles(r['response'])]
+    if len(answers) < 2:
+        return None
+
+    if CONSENSUS_EMBEDDING_MODEL:
+        vectors = await embed_texts(CONSENSUS_EMBEDDING_MODEL, answers)
+        if vectors:
+            score = similarity.pairwise_min_cosine(vectors)
+            return {
+                "method": "embedding",
+                "similarity": round(score, 4),
+                "threshold": CONSENSUS_EMBEDDING_THRESHOLD,
+                "agreed": score >= CONSENSUS_EMBEDDING_THRESHOLD,
+            }
+
+    score = similarity.pairwise_min_similarity(answers)
+    timeline.annotate(similarity=round(score, 4))
+    return {
+        "method": "minhash",
+        "similarity": round(score, 4),
+        "threshold": CONSENSUS_THRESHOLD,
+        "agreed": score >= CONSENSUS_THRESHOLD,
+    }
+
+
+@timed(STAGE_DURATION, stage="stage2")
+@timeline.traced("stage2")
 async def stage2_collect_rankings(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
-    council_members: List[Dict[str, Any]]
+    council_members: List[Dict[str, Any]],
+    context: Optional[List[Dict[str, str]]] = None
 ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
     Stage 2: Each model ranks the anonymized responses.
@@ -78,6 +187,7 @@ async def stage2_collect_rankings(
         user_query: The original user query
         stage1_results: Results from Stage 1
         council_members: List of council members (personas/models)
+        context: Optional prior conversation messages (see memory.build_context)
 
     Returns:
         Tuple of (rankings list, label_to_model mapping)
@@ -86,10 +196,7 @@ async def stage2_collect_rankings(
     labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
 
     # Create mapping from label to model name (or persona name)
-    label_to_model = {
-        f"Response {label}": result['persona_name']
-        for label, result in zip(labels, stage1_results)
-    }
+    label_to_model = label_responses(stage1_results)
 
     # Build the ranking prompt
     responses_text = "\n\n".join([
@@ -97,9 +204,12 @@ async def stage2_collect_rankings(
         for label, result in zip(labels, stage1_results)
     ])
 
+    context_text = format_context(context)
+    context_section = f"Earlier conversation (for reference):\n{context_text}\n\n" if context_text else ""
+
     ranking_prompt = f"""You are evaluating different responses to the following question:
 
-Question: {user_query}
+{context_section}Question: {user_query}
 
 Here are the responses from different models (anonymized):
 
@@ -114,6 +224,7 @@ IMPORTANT: Your final ranking MUST be formatted EXACTLY as follows:
 - Then list the responses from best to worst as a numbered list
 - Each line should be: number, period, space, then ONLY the response label (e.g., "1. Response A")
 - Do not add any other text or explanations in the ranking section
+- End with the line "{RANKING_END_MARKER}" and write nothing after it
 
 Example of the correct format for your ENTIRE response:
 
@@ -125,15 +236,18 @@ FINAL RANKING:
 1. Response C
 2. Response A
 3. Response B
+{RANKING_END_MARKER}
 
 Now provide your evaluation and ranking:"""
 
     messages = [{"role": "user", "content": ranking_prompt}]
 
-    # Get rankings from all council models in parallel
+    # Get rankings from all council models in parallel, streaming each so the
+    # request is closed as soon as its ranking is complete
     import asyncio
+    response_labels = [f"Response {label}" for label in labels]
     tasks = [
-        query_model(m['model_id'], messages, system_prompt=m.get('system_prompt'))
+        _query_member(m, messages, stop=[RANKING_END_MARKER], should_stop=RankingStreamParser(response_labels))
         for m in council_members
     ]
     
@@ -142,7 +256,7 @@ Now provide your evaluation and ranking:"""
     # Format results
     stage2_results = []
     for member, response in zip(council_members, responses):
-        if isinstance(response, Exception):
+        if isinstance(response, BaseException):
             stage2_results.append({
                 "model": member['model_id'],
                 "persona_name": member.get('name', member['model_id']),
@@ -170,11 +284,105 @@ Now provide your evaluation and ranking:"""
     return stage2_results, label_to_model
 
 
+def cluster_responses(stage1_results: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group near-duplicate Stage 1 answers (see DEDUP_THRESHOLD).
+
+    Error placeholders are never merged. The first result in each cluster
+    is its representative.
+
+    Returns:
+        Clusters of Stage 1 results, in Stage 1 order
+    """
+    answered = [r for r in stage1_results if not is_error_response(r)]
+    clusters = [
+        [answered[i] for i in cluster]
+        for cluster in similarity.cluster_texts([r['response'] for r in answered], DEDUP_THRESHOLD)
+    ]
+    clusters += [[r] for r in stage1_results if is_error_response(r)]
+    clusters.sort(key=lambda cluster: stage1_results.index(cluster[0]))
+    return clusters
+
+
+async def review_responses(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    council_members: List[Dict[str, Any]],
+    context: Optional[List[Dict[str, str]]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Stage 2 with the consensus short-circuit.
+
+    When the Stage 1 answers already agree, peer review is skipped entirely
+    (CONSENSUS_MODE "skip") or done by a single judge ("single_judge").
+    Otherwise near-duplicate answers are merged so the judges see each
+    distinct answer once; its rank is credited to every member who gave it.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Results from Stage 1
+        council_members: List of council members (personas/models)
+        context: Optional prior conversation messages (see memory.build_context)
+
+    Returns:
+        Tuple of (stage2_results, metadata); metadata holds label_to_model,
+        aggregate_rankings, label_to_members when answers were merged and,
+        when the check ran, the consensus decision
+    """
+    consensus = await detect_consensus(stage1_results)
+    judges = council_members
+
+    if consensus is not None:
+        consensus["action"] = CONSENSUS_MODE if consensus["agreed"] else "none"
+        if consensus["action"] == "skip":
+            metadata = {
+                "label_to_model": label_responses(stage1_results),
+                "aggregate_rankings": [],
+                "consensus": consensus
+            }
+            return [], metadata
+        if consensus["action"] == "single_judge":
+            # Judge with the first member that actually answered
+            answered = {r['persona_name'] for r in stage1_results if not is_error_response(r)}
+            judges = [next(m for m in council_members if m.get('name', m['model_id']) in answered)]
+
+    reviewed = stage1_results
+    label_to_members = None
+    if DEDUP_THRESHOLD is not None:
+        clusters = cluster_responses(stage1_results)
+        if len(clusters) < len(stage1_results):
+            reviewed = [cluster[0] for cluster in clusters]
+            label_to_members = {
+                f"Response {chr(65 + i)}": [r['persona_name'] for r in cluster]
+                for i, cluster in enumerate(clusters)
+            }
+
+    if len(reviewed) < 2:
+        # Everyone gave the same answer: there is nothing to rank
+        stage2_results, label_to_model = [], label_responses(reviewed)
+    else:
+        stage2_results, label_to_model = await stage2_collect_rankings(user_query, reviewed, judges, context)
+
+    metadata = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": calculate_aggregate_rankings(stage2_results, label_to_model, label_to_members)
+    }
+    if label_to_members is not None:
+        metadata["label_to_members"] = label_to_members
+    if consensus is not None:
+        metadata["consensus"] = consensus
+    return stage2_results, metadata
+
+
+@timed(STAGE_DURATION, stage="stage3")
+@timeline.traced("stage3")
 async def stage3_synthesize_final(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
     stage2_results: List[Dict[str, Any]],
-    chairman_member: Dict[str, Any]
+    chairman_member: Dict[str, Any],
+    context: Optional[List[Dict[str, str]]] = None,
+    label_to_members: Optional[Dict[str, List[str]]] = None
 ) -> Dict[str, Any]:
     """
     Stage 3: Chairman synthesizes final response.
@@ -184,14 +392,26 @@ async def stage3_synthesize_final(
         stage1_results: Individual model responses from Stage 1
         stage2_results: Rankings from Stage 2
         chairman_member: The chairman persona/model configuration
+        context: Optional prior conversation messages (see memory.build_context)
+        label_to_members: Clusters of near-duplicate answers from Stage 2
+            metadata; each cluster's answer is shown once
 
     Returns:
         Dict with 'model' and 'response' keys
     """
-    # Build comprehensive context for chairman
+    # Build comprehensive context for chairman, listing duplicate answers once
+    same_answer = {members[0]: members[1:] for members in (label_to_members or {}).values()}
+    merged = {name for others in same_answer.values() for name in others}
+
+    def model_line(name: str) -> str:
+        if same_answer.get(name):
+            return f"Model: {name} (same answer given by: {', '.join(same_answer[name])})"
+        return f"Model: {name}"
+
     stage1_text = "\n\n".join([
-        f"Model: {result['persona_name']}\nResponse: {result['response']}"
+        f"{model_line(result['persona_name'])}\nResponse: {result['response']}"
         for result in stage1_results
+        if result['persona_name'] not in merged
     ])
 
     stage2_text = "\n\n".join([
@@ -199,9 +419,23 @@ async def stage3_synthesize_final(
         for result in stage2_results
     ])
 
-    chairman_prompt = f"""You are the Chairman of Quorum. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+    context_text = format_context(context)
+    context_section = f"Earlier conversation (for reference):\n{context_text}\n\n" if context_text else ""
+
+    if not stage2_results:
+        # Peer review was skipped because the answers already agreed
+        chairman_prompt = f"""You are the Chairman of Quorum. Multiple AI models have independently answered a user's question, and their answers substantially agree, so no peer review was needed.
+
+{context_section}Original Question: {user_query}
+
+Individual Responses:
+{stage1_text}
 
-Original Question: {user_query}
+Your task as Chairman is to write a single, clear final answer to the user's original question based on this consensus. Combine the best explanations and details from the responses, and mention any minor points where they differ:"""
+    else:
+        chairman_prompt = f"""You are the Chairman of Quorum. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+
+{context_section}Original Question: {user_query}
 
 STAGE 1 - Individual Responses:
 {stage1_text}
@@ -222,7 +456,9 @@ Provide a clear, well-reasoned final answer that represents the council's collec
     response = await query_model(
         chairman_member['model_id'], 
         messages, 
-        system_prompt=chairman_member.get('system_prompt')
+        system_prompt=chairman_member.get('system_prompt'),
+        priority=PRIORITY_CHAIRMAN,
+        inference=personas.inference_profile(chairman_member)
     )
 
     if response is None:
@@ -276,7 +512,8 @@ def parse_ranking_from_text(ranking_text: str) -> List[str]:
 
 def calculate_aggregate_rankings(
     stage2_results: List[Dict[str, Any]],
-    label_to_model: Dict[str, str]
+    label_to_model: Dict[str, str],
+    label_to_members: Optional[Dict[str, List[str]]] = None
 ) -> List[Dict[str, Any]]:
     """
     Calculate aggregate rankings across all models.
@@ -284,6 +521,8 @@ def calculate_aggregate_rankings(
     Args:
         stage2_results: Rankings from each model
         label_to_model: Mapping from anonymous labels to model names
+        label_to_members: Optional mapping from labels to every member whose
+            (near-duplicate) answer the label stands for; each gets the rank
 
     Returns:
         List of dicts with model name and average rank, sorted best to worst
@@ -294,13 +533,17 @@ def calculate_aggregate_rankings(
     model_positions = defaultdict(list)
 
     for ranking in stage2_results:
-        ranking_text = ranking['ranking']
-
-        # Parse the ranking from the structured format
-        parsed_ranking = parse_ranking_from_text(ranking_text)
+        # Reuse the ranking parsed when it was collected (its text may have
+        # been dropped by retention), parsing older results without one
+        parsed_ranking = ranking.get('parsed_ranking')
+        if parsed_ranking is None:
+            parsed_ranking = parse_ranking_from_text(ranking['ranking'])
 
         for position, label in enumerate(parsed_ranking, start=1):
-            if label in label_to_model:
+            if label_to_members and label in label_to_members:
+                for model_name in label_to_members[label]:
+                    model_positions[model_name].append(position)
+            elif label in label_to_model:
                 model_name = label_to_model[label]
                 model_positions[model_name].append(position)
 
@@ -321,6 +564,8 @@ def calculate_aggregate_rankings(
     return aggregate
 
 
+@timed(STAGE_DURATION, stage="title")
+@timeline.traced("title")
 async def generate_conversation_title(user_query: str, model_id: str = None) -> str:
     """
     Generate a short title for a conversation based on the first user message.
@@ -345,7 +590,7 @@ Title:"""
     target_model = model_id if model_id else "ollama/amsaravi/medgemma-4b-it:q8"
     
     # query_model expects messages list
-    response = await query_model(target_model, messages, timeout=600.0)
+    response = await query_model(target_model, messages, timeout=600.0, priority=PRIORITY_BACKGROUND)
 
     if response is None:
         # Fallback to a generic title
@@ -363,10 +608,201 @@ Title:"""
     return title
 
 
+async def run_council_stages(
+    turn: Dict[str, Any],
+    context: Optional[List[Dict[str, str]]] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+    extra_metadata: Optional[Dict[str, Any]] = None
+):
+    """
+    Run Stages 1-3 for one question, checkpointing progress into `turn`.
+
+    `turn` is a pending turn (see storage.begin_turn): it names the query,
+    members and chairman, and holds the results of whatever an interrupted
+    run already finished. Those stages and Stage 1 answers are reused (and
+    their events replayed) instead of querying the models again. As each
+    Stage 1 answer and each stage completes it is recorded in `turn` and
+    on_checkpoint(turn) is awaited to persist it (one call at a time, e.g.
+    storage.checkpoint_turn).
+
+    Yields:
+        Stage start/complete event dicts. When done, `turn` holds 'stage1',
+        'stage2', 'metadata' and 'stage3', and the metadata holds each
+        stage's model usage (see backend.usage).
+    """
+    query, members, chairman = turn["query"], turn["members"], turn["chairman"]
+    stage_usage = turn.setdefault("usage", {})
+
+    def charge(stage: str, spent: Dict[str, Any]):
+        # A resumed stage adds to what the interrupted run already spent
+        usage.add_usage(stage_usage.setdefault(stage, usage.empty_usage()), spent)
+
+    # Stage 1 answers arrive concurrently; their checkpoints are written in order
+    checkpoint_lock = asyncio.Lock()
+
+    async def checkpoint():
+        if on_checkpoint is not None:
+            async with checkpoint_lock:
+                await on_checkpoint(turn)
+
+    yield {'type': 'stage1_start'}
+    if turn.get("completed_stage", 0) < 1:
+        async def checkpoint_answer(index: int, result: Dict[str, Any]):
+            turn["stage1"][index] = result
+            await checkpoint()
+
+        with usage.track() as spent:
+            turn["stage1"] = await stage1_collect_responses(
+                query, members, context, turn.get("stage1"), checkpoint_answer
+            )
+        charge("stage1", spent)
+        turn["completed_stage"] = 1
+        await checkpoint()
+    yield {'type': 'stage1_complete', 'data': turn["stage1"]}
+
+    yield {'type': 'stage2_start'}
+    if turn["completed_stage"] < 2:
+        with usage.track() as spent:
+            turn["stage2"], turn["metadata"] = await review_responses(query, turn["stage1"], members, context)
+        charge("stage2", spent)
+        turn["metadata"].update(extra_metadata or {})
+        turn["completed_stage"] = 2
+        await checkpoint()
+    yield {'type': 'stage2_complete', 'data': turn["stage2"], 'metadata': turn["metadata"]}
+
+    yield {'type': 'stage3_start'}
+    with usage.track() as spent:
+        turn["stage3"] = await stage3_synthesize_final(
+            query, turn["stage1"], turn["stage2"], chairman, context,
+            turn["metadata"].get("label_to_members")
+        )
+    charge("stage3", spent)
+    turn["metadata"]["usage"] = stage_usage
+    yield {'type': 'stage3_complete', 'data': turn["stage3"]}
+
+
+# Stage 2 metadata written by review_responses; other keys (e.g. member
+# selection) describe the turn and survive a regenerated review
+_REVIEW_METADATA_KEYS = ("label_to_model", "aggregate_rankings", "label_to_members", "consensus")
+
+
+def _find_result(results: List[Dict[str, Any]], persona_name: str) -> int:
+    for index, result in enumerate(results):
+        if result['persona_name'] == persona_name:
+            return index
+    raise ValueError(f"No result from council member {persona_name!r}")
+
+
+async def _rerank_one_judge(
+    query: str,
+    turn: Dict[str, Any],
+    judge_name: str,
+    context: Optional[List[Dict[str, str]]]
+):
+    """Query one judge again over the answers it reviewed, re-aggregating the rankings."""
+    index = _find_result(turn["stage2"], judge_name)
+    judge = next(m for m in turn["members"] if m.get('name', m['model_id']) == judge_name)
+
+    # The judges saw one answer per label (a cluster's representative)
+    label_to_model = turn["metadata"]["label_to_model"]
+    reviewed = [
+        turn["stage1"][_find_result(turn["stage1"], label_to_model[label])]
+        for label in sorted(label_to_model)
+    ]
+    rankings, _ = await stage2_collect_rankings(query, reviewed, [judge], context)
+
+    turn["stage2"] = list(turn["stage2"])
+    turn["stage2"][index] = rankings[0]
+    turn["metadata"] = {
+        **turn["metadata"],
+        "aggregate_rankings": calculate_aggregate_rankings(
+            turn["stage2"], label_to_model, turn["metadata"].get("label_to_members")
+        ),
+    }
+
+
+async def regenerate_stages(
+    turn: Dict[str, Any],
+    target: str,
+    member: Optional[str] = None,
+    context: Optional[List[Dict[str, str]]] = None
+):
+    """
+    Recompute part of a stored council answer, and only what depends on it.
+
+    `turn` has the shape run_council_stages leaves behind: 'query',
+    'members' (aligned with 'stage1'), 'chairman', 'stage1', 'stage2',
+    'metadata' and 'stage3'. Depending on `target`:
+
+    - "stage1": `member` is queried again; the other answers are reused,
+      then the answers are reviewed again and the Chairman re-synthesizes.
+    - "stage2": every judge ranks again, or only `member` when given, in
+      which case the other rankings are reused and only the aggregate is
+      recomputed; then the Chairman re-synthesizes.
+    - "stage3": only the Chairman is queried again.
+
+    Args:
+        turn: The stored answer, updated in place
+        target: "stage1", "stage2" or "stage3"
+        member: Persona name of the member (or judge) to regenerate
+        context: Prior conversation messages as of that answer
+
+    Yields:
+        Start/complete events for the stages that were recomputed; their
+        usage replaces the old stages' in the metadata
+
+    Raises:
+        ValueError: For an unknown target or member
+    """
+    if target not in ("stage1", "stage2", "stage3"):
+        raise ValueError(f"Unknown regeneration target {target!r}")
+    if target == "stage1" and member is None:
+        raise ValueError("Regenerating Stage 1 needs a member")
+    if target == "stage2" and member is not None and not turn["stage2"]:
+        raise ValueError("Peer review was skipped for this answer; regenerate all of Stage 2")
+
+    query, members = turn["query"], turn["members"]
+    turn["metadata"] = turn.get("metadata") or {}
+    stage_usage = dict(turn["metadata"].get("usage") or {})
+
+    if target == "stage1":
+        index = _find_result(turn["stage1"], member)
+        completed = list(turn["stage1"])
+        completed[index] = None
+        yield {'type': 'stage1_start'}
+        with usage.track() as spent:
+            turn["stage1"] = await stage1_collect_responses(query, members, context, completed)
+        stage_usage["stage1"] = spent
+        yield {'type': 'stage1_complete', 'data': turn["stage1"]}
+
+    if target in ("stage1", "stage2"):
+        yield {'type': 'stage2_start'}
+        with usage.track() as spent:
+            if member is not None and target == "stage2":
+                await _rerank_one_judge(query, turn, member, context)
+            else:
+                turn["stage2"], review_metadata = await review_responses(query, turn["stage1"], members, context)
+                kept = {k: v for k, v in turn["metadata"].items() if k not in _REVIEW_METADATA_KEYS}
+                turn["metadata"] = {**kept, **review_metadata}
+        stage_usage["stage2"] = spent
+        yield {'type': 'stage2_complete', 'data': turn["stage2"], 'metadata': turn["metadata"]}
+
+    yield {'type': 'stage3_start'}
+    with usage.track() as spent:
+        turn["stage3"] = await stage3_synthesize_final(
+            query, turn["stage1"], turn["stage2"], turn["chairman"], context,
+            turn["metadata"].get("label_to_members")
+        )
+    stage_usage["stage3"] = spent
+    turn["metadata"] = {**turn["metadata"], "usage": stage_usage}
+    yield {'type': 'stage3_complete', 'data': turn["stage3"]}
+
+
 async def run_full_council(
     user_query: str,
     council_members: List[Dict[str, Any]],
-    chairman_member: Dict[str, Any]
+    chairman_member: Dict[str, Any],
+    context: Optional[List[Dict[str, str]]] = None
 ) -> Tuple[List, List, Dict, Dict]:
     """
     Run the complete 3-stage council process.
@@ -375,12 +811,13 @@ async def run_full_council(
         user_query: The user's question
         council_members: List of council members (personas/models)
         chairman_member: The chairman persona/model
+        context: Optional prior conversation messages (see memory.build_context)
 
     Returns:
         Tuple of (stage1_results, stage2_results, stage3_result, metadata)
     """
     # Stage 1: Collect individual responses
-    stage1_results = await stage1_collect_responses(user_query, council_members)
+    stage1_results = await stage1_collect_responses(user_query, council_members, context)
 
     # If no models responded successfully, return error
     if not stage1_results:
@@ -389,29 +826,24 @@ async def run_full_council(
             "response": "All models failed to respond. Please try again."
         }, {}
 
-    # Stage 2: Collect rankings
-    stage2_results, label_to_model = await stage2_collect_rankings(user_query, stage1_results, council_members)
-
-    # Calculate aggregate rankings
-    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+    # Stage 2: Collect rankings (skipped or reduced when the answers agree)
+    stage2_results, metadata = await review_responses(user_query, stage1_results, council_members, context)
 
     # Stage 3: Synthesize final answer
     stage3_result = await stage3_synthesize_final(
         user_query,
         stage1_results,
         stage2_results,
-        chairman_member
+        chairman_member,
+        context,
+        metadata.get("label_to_members")
     )
 
-    # Prepare metadata
-    metadata = {
-        "label_to_model": label_to_model,
-        "aggregate_rankings": aggregate_rankings
-    }
-
     return stage1_results, stage2_results, stage3_result, metadata
 
 
+@timed(STAGE_DURATION, stage="followup")
+@timeline.traced("followup")
 async def generate_followup_question(
     previous_query: str,
     previous_answer: str,
@@ -432,7 +864,9 @@ Do not include any preamble, just the question."""
     response = await query_model(
         chairman_member['model_id'],
         messages,
-        system_prompt=chairman_member.get('system_prompt')
+        system_prompt=chairman_member.get('system_prompt'),
+        priority=PRIORITY_BACKGROUND,
+        inference=personas.inference_profile(chairman_member)
     )
     
     if response:
@@ -441,114 +875,131 @@ Do not include any preamble, just the question."""
 
 
 async def run_agentic_council(
-    user_query: str,
-    initial_council_members: List[Dict[str, Any]],
-    chairman_member: Dict[str, Any],
-    conversation_id: str
+    turn: Dict[str, Any],
+    conversation_id: str,
+    spent: Optional[Dict[str, Any]] = None
 ):
     """
     Run the Agentic Council process with multiple rounds and eviction.
-    Yields SSE events for each message.
+    Yields an event dict for each stage and message.
+
+    The conversation's budget is checked after every round: over budget,
+    the remaining rounds run on USAGE_DOWNGRADE_MODEL or are not run at all
+    (a 'budget_exceeded' event says which).
+
+    Args:
+        turn: The pending turn of the first round to run (see
+            storage.begin_turn); a resumed run continues from its 'round'
+            with its (already reduced) member list
+        conversation_id: Conversation the rounds are stored in
+        spent: Usage of this run so far, not yet added to the conversation
     """
-    from . import storage
-    import json
-    
-    current_members = list(initial_council_members)
-    current_query = user_query
-    round_num = 1
-    max_rounds = 10
+    from . import storage, memory, selection
 
-    current_members = list(initial_council_members)
-    current_query = user_query
-    round_num = 1
+    chairman_member = turn["chairman"]
+    current_members = list(turn["members"])
+    current_query = turn["query"]
+    round_num = turn.get("round", 1)
     max_rounds = 10
+    # Set once the council has been downgraded for going over budget
+    budget = turn.get("budget")
+
+    def checkpoint(pending: Dict[str, Any]):
+        return storage.checkpoint_turn(conversation_id, pending)
 
     while round_num <= max_rounds and len(current_members) > 0:
         try:
-            # 1. Run standard council round with granular updates
-            
-            # Stage 1: Collect responses
-            yield f"data: {json.dumps({'type': 'stage1_start'})}\n\n"
-            stage1_results = await stage1_collect_responses(current_query, current_members)
-            yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
-
-            # Stage 2: Collect rankings
-            yield f"data: {json.dumps({'type': 'stage2_start'})}\n\n"
-            stage2_results, label_to_model = await stage2_collect_rankings(current_query, stage1_results, current_members)
-            aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-            metadata = {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}
-            yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})}\n\n"
-
-            # Stage 3: Synthesize final answer
-            yield f"data: {json.dumps({'type': 'stage3_start'})}\n\n"
-            stage3_result = await stage3_synthesize_final(current_query, stage1_results, stage2_results, chairman_member)
-            yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
-
-            # Save message to storage
-            storage.add_assistant_message(
-                conversation_id,
-                stage1_results,
-                stage2_results,
-                stage3_result,
-                metadata
-            )
-
-            # Yield the message to the client
-            message_data = {
-                "role": "assistant",
-                "stage1": stage1_results,
-                "stage2": stage2_results,
-                "stage3": stage3_result,
-                "metadata": metadata,
-                "round": round_num
-            }
-            yield f"data: {json.dumps(message_data)}\n\n"
-
-            # Check termination conditions
-            if round_num >= max_rounds or len(current_members) <= 1:
-                break
-
-            # 2. Evict lowest ranked member
-            # Find member with worst average rank (highest number)
-            aggregate_rankings = metadata.get("aggregate_rankings", [])
-            if aggregate_rankings:
-                # Sort by average_rank descending (worst first)
-                sorted_rankings = sorted(aggregate_rankings, key=lambda x: x['average_rank'], reverse=True)
-                worst_member_id = sorted_rankings[0]['model']
+            with timeline.span("round", round=round_num) as round_span:
+                # 1. Run standard council round with granular updates
+                # Context is rebuilt every round so earlier rounds are remembered
+                context = memory.build_context(storage.get_conversation(conversation_id))
+
+                extra_metadata = {"budget": budget} if budget is not None else None
+                async for event in run_council_stages(turn, context, checkpoint, extra_metadata):
+                    yield event
+                stage1_results, stage2_results = turn["stage1"], turn["stage2"]
+                stage3_result, metadata = turn["stage3"], turn["metadata"]
+
+                # Save message to storage
+                round_timeline = timeline.to_compact(round_span)
+                await asyncio.to_thread(
+                    storage.add_assistant_message,
+                    conversation_id,
+                    stage1_results,
+                    stage2_results,
+                    stage3_result,
+                    metadata,
+                    timeline=round_timeline
+                )
+                selection.record_turn(stage1_results, metadata, round_timeline)
+                await memory.update_memory(conversation_id, chairman_member)
+
+                # Yield the message to the client
+                yield {
+                    "role": "assistant",
+                    "stage1": stage1_results,
+                    "stage2": stage2_results,
+                    "stage3": stage3_result,
+                    "metadata": metadata,
+                    "round": round_num
+                }
+
+                # Check termination conditions; a council that already agrees
+                # has nothing left to vote on
+                if round_num >= max_rounds or len(current_members) <= 1:
+                    break
+                if metadata.get("consensus", {}).get("action") == "skip":
+                    break
+
+                over = usage.check_budget(storage.get_conversation(conversation_id), spent)
+                if over is not None and (budget is None or over["action"] == "stop"):
+                    yield {'type': 'budget_exceeded', 'data': over}
+                    if over["action"] == "stop":
+                        break
+                    current_members = [usage.downgrade(m) for m in current_members]
+                    chairman_member = usage.downgrade(chairman_member)
+                    budget = over
+
+                # 2. Evict lowest ranked member
+                # Find member with worst average rank (highest number)
+                aggregate_rankings = metadata.get("aggregate_rankings", [])
+                if aggregate_rankings:
+                    # Sort by average_rank descending (worst first)
+                    sorted_rankings = sorted(aggregate_rankings, key=lambda x: x['average_rank'], reverse=True)
+                    worst_member_id = sorted_rankings[0]['model']
                 
-                # Remove from current members
-                current_members = [m for m in current_members if m['model_id'] != worst_member_id]
-
-            # 3. Generate follow-up question
-            followup_query = await generate_followup_question(
-                current_query,
-                stage3_result['response'],
-                chairman_member
-            )
+                    # Remove from current members; rankings name members the
+                    # way Stage 1 labelled them, which survives a downgrade
+                    current_members = [
+                        m for m in current_members
+                        if m.get('name', m['model_id']) != worst_member_id
+                    ]
+
+                # 3. Generate follow-up question
+                followup_query = await generate_followup_question(
+                    current_query,
+                    stage3_result['response'],
+                    chairman_member
+                )
             
-            current_query = followup_query
+                current_query = followup_query
             
-            # Add the follow-up question as a user message
-            storage.add_user_message(conversation_id, f"Chairman's Follow-up: {followup_query}")
+                # Add the follow-up question as a user message, starting the next round's turn
+                turn = await asyncio.to_thread(storage.begin_turn, conversation_id, f"{FOLLOWUP_PREFIX}{followup_query}", {
+                    "query": followup_query,
+                    "members": current_members,
+                    "chairman": chairman_member,
+                    "round": round_num + 1,
+                    **({"budget": budget} if budget is not None else {}),
+                })
             
-            # Yield the user message so UI updates
-            user_msg_data = {
-                "role": "user",
-                "content": f"Chairman's Follow-up: {followup_query}"
-            }
-            yield f"data: {json.dumps(user_msg_data)}\n\n"
+                # Yield the user message so UI updates
+                yield {
+                    "role": "user",
+                    "content": f"{FOLLOWUP_PREFIX}{followup_query}"
+                }
 
-            round_num += 1
+                round_num += 1
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield {'type': 'error', 'message': str(e)}
             break
-        storage.add_user_message(conversation_id, f"Chairman's Follow-up: {followup_query}")
-        
-        # Yield the user message so UI updates
-        user_msg_data = {
-            "role": "user",
-            "content": f"Chairman's Follow-up: {followup_query}"
-        }
-        yield f"data: {json.dumps(user_msg_data)}\n\n"
-
-        round_num += 1
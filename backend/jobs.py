@@ -0,0 +1,488 @@
+"""Background council jobs with persisted, replayable SSE event logs."""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from . import coordination, metrics
+from .sse import EventEncoder, format_sse
+from .config import JOBS_DIR, JOB_WORKERS, JOB_RETENTION_SECONDS, JOB_LOG_RETENTION_SECONDS, JOB_ORPHAN_GRACE_SECONDS
+
+# Event type written last to every job log; viewers stop tailing when they see it
+JOB_END_EVENT = "job_end"
+
+# How often an idle viewer checks whether its client has gone away
+DISCONNECT_POLL_SECONDS = 1.0
+
+# How often a viewer following a job owned by another process reads new
+# events from its log
+REMOTE_POLL_SECONDS = 0.25
+
+# Minimum interval between scans of JOBS_DIR for expired logs
+LOG_PRUNE_INTERVAL_SECONDS = 60
+
+
+class JobConflictError(Exception):
+    """A conversation already has a council run, possibly in another process."""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} is already running for this conversation")
+        self.job_id = job_id
+
+
+def get_job_log_path(job_id: str) -> str:
+    """Get the event log path for a job."""
+    return os.path.join(JOBS_DIR, f"{job_id}.jsonl")
+
+
+def _append_log(job_id: str, data: str):
+    with open(get_job_log_path(job_id), "a") as f:
+        f.write(data)
+
+
+class Job:
+    """
+    A single council run executing in the background.
+
+    Every event the run produces is appended to an in-memory list and to the
+    job's JSONL log, so any number of viewers can replay from an event id and
+    then follow the live tail. Log writes happen in a thread, batching the
+    events published while the previous write was in progress.
+    """
+
+    def __init__(
+        self,
+        conversation_id: str,
+        runner: Callable[[], AsyncIterator[Dict[str, Any]]],
+        client: Optional[str] = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.conversation_id = conversation_id
+        self.client = client
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.viewers = 0
+        self.cancel_reason: Optional[str] = None
+        self._runner = runner
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._orphan_timer: Optional[asyncio.TimerHandle] = None
+        self._log_buffer: List[str] = []
+        self._log_writer: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job summary for API responses."""
+        return {
+            "id": self.id,
+            "conversation_id": self.conversation_id,
+            "client": self.client,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "event_count": len(self.events),
+            "viewers": self.viewers,
+            "cancel_reason": self.cancel_reason,
+        }
+
+    def publish(self, event: Dict[str, Any]):
+        """Append an event, queue it for the log and wake up all viewers."""
+        self.events.append(event)
+        self._log_buffer.append(json.dumps({"id": len(self.events), "event": event}) + "\n")
+        if self._log_writer is None or self._log_writer.done():
+            self._log_writer = asyncio.get_running_loop().create_task(self._write_log())
+
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def _write_log(self):
+        while self._log_buffer:
+            lines, self._log_buffer = self._log_buffer, []
+            try:
+                await asyncio.to_thread(_append_log, self.id, "".join(lines))
+            except OSError as e:
+                print(f"Error writing event log of job {self.id}: {e}")
+
+    async def flush_log(self):
+        """Wait until every event published so far is in the log."""
+        if self._log_writer is not None:
+            await asyncio.wait([self._log_writer])
+
+    def _finish(self, status: str):
+        """Mark the job finished and publish the terminal event."""
+        if self.done:
+            return
+        if self._orphan_timer is not None:
+            self._orphan_timer.cancel()
+        self.status = status
+        self.finished_at = time.time()
+        self.publish({"type": JOB_END_EVENT, "job_id": self.id, "status": status})
+
+    async def run(self):
+        """Execute the runner, publishing every event it yields."""
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            async with aclosing(self._runner()) as events:
+                async for event in events:
+                    self.publish(event)
+            self._finish("succeeded")
+        except asyncio.CancelledError:
+            # Raised inside the runner at whatever model call it was awaiting;
+            # in-flight requests are aborted as the cancellation unwinds.
+            self.publish({"type": "cancelled", "message": self.cancel_reason or "Cancelled"})
+            self._finish("cancelled")
+        except Exception as e:
+            self.publish({"type": "error", "message": str(e)})
+            self._finish("failed")
+
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """
+        Cancel the job, aborting any in-flight model calls.
+
+        Returns:
+            False if the job had already finished
+        """
+        if self.done:
+            return False
+        self.cancel_reason = reason
+        if self._task is None:
+            # Still queued: the worker will skip it
+            self.publish({"type": "cancelled", "message": reason})
+            self._finish("cancelled")
+        else:
+            self._task.cancel()
+        return True
+
+    def _attach(self):
+        self.viewers += 1
+        if self._orphan_timer is not None:
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+
+    def _detach(self):
+        self.viewers -= 1
+        if self.viewers == 0 and not self.done and JOB_ORPHAN_GRACE_SECONDS is not None:
+            # Give a reloading page the chance to reattach before giving up
+            self._orphan_timer = asyncio.get_running_loop().call_later(
+                JOB_ORPHAN_GRACE_SECONDS, self._cancel_if_orphaned
+            )
+
+    def _cancel_if_orphaned(self):
+        self._orphan_timer = None
+        if self.done or self.viewers:
+            return
+        # Viewers may have reattached through another API process
+        viewed_at = coordination.get_coordinator().job_viewed_at(self.id)
+        remaining = (viewed_at or 0) + JOB_ORPHAN_GRACE_SECONDS - time.time()
+        if remaining > 0:
+            self._orphan_timer = asyncio.get_running_loop().call_later(remaining, self._cancel_if_orphaned)
+            return
+        self.cancel("All viewers disconnected")
+
+    async def subscribe(
+        self,
+        last_event_id: int = 0,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Replay events after `last_event_id`, then follow the live tail.
+
+        Args:
+            last_event_id: Id of the last event the viewer already has
+            is_disconnected: Optional check polled while idle; the
+                subscription ends as soon as it returns True
+
+        Yields:
+            Tuples of (event id, event), ending after the job_end event
+        """
+        self._attach()
+        try:
+            index = max(0, last_event_id)
+            while True:
+                while index < len(self.events):
+                    event = self.events[index]
+                    index += 1
+                    yield index, event
+                    if event.get("type") == JOB_END_EVENT:
+                        return
+                if self.done:
+                    return
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), DISCONNECT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        return
+        finally:
+            self._detach()
+
+
+_jobs: Dict[str, Job] = {}
+_active_jobs: Dict[str, str] = {}  # conversation_id -> job_id
+_queue: Optional[asyncio.Queue] = None
+_queue_loop: Optional[asyncio.AbstractEventLoop] = None
+_workers: List[asyncio.Task] = []
+_last_log_prune = 0.0
+
+# Moving average of how long a run holds a worker, for Retry-After estimates
+_run_seconds_avg = 60.0
+RUN_SECONDS_SMOOTHING = 0.2
+
+
+def _ensure_workers():
+    """Lazily start the bounded worker pool on the running event loop."""
+    global _queue, _queue_loop
+    loop = asyncio.get_running_loop()
+    if _queue is None or _queue_loop is not loop:
+        _queue = asyncio.Queue()
+        _queue_loop = loop
+        _workers.clear()
+    alive = [w for w in _workers if not w.done()]
+    _workers[:] = alive
+    for _ in range(JOB_WORKERS - len(alive)):
+        _workers.append(asyncio.create_task(_worker()))
+    coordination.get_coordinator().on_cancel_requested(_cancel_requested)
+
+
+def _cancel_requested(job_id: str):
+    """Cancel one of our jobs on behalf of another API process."""
+    job = _jobs.get(job_id)
+    if job is not None:
+        job.cancel()
+
+
+async def _worker():
+    while True:
+        job = await _queue.get()
+        try:
+            if not job.done:
+                job._task = asyncio.create_task(job.run())
+                await asyncio.wait([job._task])
+                # Cancelled before the task got to run its first step
+                job._finish("cancelled")
+                _record_run_seconds(job)
+            # Viewers in other processes read the log once the job is released
+            await job.flush_log()
+        finally:
+            if _active_jobs.get(job.conversation_id) == job.id:
+                del _active_jobs[job.conversation_id]
+            try:
+                coordination.get_coordinator().release_job(job.conversation_id, job.id)
+            except Exception as e:
+                # The lease expires on its own
+                print(f"Error releasing job {job.id}: {e}")
+            _queue.task_done()
+
+
+def _record_run_seconds(job: Job):
+    global _run_seconds_avg
+    if job.started_at is not None and job.status == "succeeded":
+        elapsed = job.finished_at - job.started_at
+        _run_seconds_avg += RUN_SECONDS_SMOOTHING * (elapsed - _run_seconds_avg)
+
+
+def _prune_finished_jobs():
+    """Drop finished jobs from memory, and their logs from disk once older than JOB_LOG_RETENTION_SECONDS."""
+    global _last_log_prune
+    now = time.time()
+    cutoff = now - JOB_RETENTION_SECONDS
+    for job_id in [j.id for j in _jobs.values() if j.done and j.finished_at < cutoff]:
+        del _jobs[job_id]
+
+    # The log directory is scanned at most once a minute
+    if now - _last_log_prune < LOG_PRUNE_INTERVAL_SECONDS:
+        return
+    _last_log_prune = now
+    log_cutoff = now - JOB_LOG_RETENTION_SECONDS
+    coordinator = coordination.get_coordinator()
+    try:
+        entries = list(os.scandir(JOBS_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if not entry.name.endswith(".jsonl"):
+            continue
+        job_id = entry.name[:-len(".jsonl")]
+        try:
+            if entry.stat().st_mtime >= log_cutoff:
+                continue
+            # A quiet log may still belong to a run here or in another process
+            job = _jobs.get(job_id)
+            if (job is not None and not job.done) or coordinator.is_job_active(job_id):
+                continue
+            os.remove(entry.path)
+        except OSError as e:
+            print(f"Error pruning job log {entry.name}: {e}")
+
+
+def submit_job(
+    conversation_id: str,
+    runner: Callable[[], AsyncIterator[Dict[str, Any]]],
+    client: Optional[str] = None
+) -> Job:
+    """
+    Queue a council run for a conversation.
+
+    Args:
+        conversation_id: Conversation the run belongs to
+        runner: Zero-argument callable returning an async iterator of event dicts
+        client: Client that started the run (see backend.admission)
+
+    Returns:
+        The new Job
+
+    Raises:
+        JobConflictError: If another API process is running this conversation
+    """
+    Path(JOBS_DIR).mkdir(parents=True, exist_ok=True)
+    _prune_finished_jobs()
+    _ensure_workers()
+
+    job = Job(conversation_id, runner, client)
+    owner_job_id = coordination.get_coordinator().claim_job(conversation_id, job.id)
+    if owner_job_id is not None:
+        raise JobConflictError(owner_job_id)
+    _jobs[job.id] = job
+    _active_jobs[conversation_id] = job.id
+    job.publish({"type": "job_queued", "job_id": job.id})
+    _queue.put_nowait(job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    """Get an in-memory job by id."""
+    return _jobs.get(job_id)
+
+
+def get_active_job(conversation_id: str) -> Optional[Job]:
+    """Get the queued or running job for a conversation, if any."""
+    job_id = _active_jobs.get(conversation_id)
+    return _jobs.get(job_id) if job_id else None
+
+
+def get_active_job_id(conversation_id: str) -> Optional[str]:
+    """Id of the conversation's queued or running job in this or any other API process."""
+    active = get_active_job(conversation_id)
+    if active is not None:
+        return active.id
+    return coordination.get_coordinator().get_active_job_id(conversation_id)
+
+
+def count_client_jobs(client: str) -> int:
+    """Number of a client's runs that are queued or running."""
+    return sum(1 for job in _jobs.values() if job.client == client and not job.done)
+
+
+def queued_count() -> int:
+    """Number of runs waiting for a worker."""
+    return sum(1 for job in _jobs.values() if job.status == "queued")
+
+
+def estimate_wait(position: int) -> float:
+    """Rough seconds until the run `position` places back in the queue gets a worker."""
+    return _run_seconds_avg * position / JOB_WORKERS
+
+
+def get_queue_stats() -> Dict[str, Any]:
+    """Running and queued run counts, and the average run time."""
+    return {
+        "workers": JOB_WORKERS,
+        "running": sum(1 for job in _jobs.values() if job.status == "running"),
+        "queued": queued_count(),
+        "avg_run_seconds": round(_run_seconds_avg, 1),
+    }
+
+
+def job_log_exists(job_id: str) -> bool:
+    """Check whether a persisted event log exists for a job."""
+    return os.path.exists(get_job_log_path(job_id))
+
+
+async def _follow_job_log(
+    job_id: str,
+    last_event_id: int = 0,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Replay a job's persisted log, then keep reading it while the process
+    that owns the job is alive, until the job_end event.
+    """
+    coordinator = coordination.get_coordinator()
+    offset = 0
+    last_check = 0.0
+    while True:
+        # Checked before reading: once the owner has let go, the log is complete
+        active = coordinator.is_job_active(job_id)
+        try:
+            with open(get_job_log_path(job_id), "rb") as f:
+                f.seek(offset)
+                lines = f.readlines()
+        except FileNotFoundError:
+            # The owner has not written its first events yet
+            lines = []
+        for line in lines:
+            if not line.endswith(b"\n"):
+                # Still being written; read it whole next time
+                break
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry["id"] <= last_event_id:
+                continue
+            last_event_id = entry["id"]
+            yield entry["id"], entry["event"]
+            if entry["event"].get("type") == JOB_END_EVENT:
+                return
+
+        if not active:
+            return
+        if time.monotonic() - last_check >= DISCONNECT_POLL_SECONDS:
+            last_check = time.monotonic()
+            if is_disconnected is not None and await is_disconnected():
+                return
+            # Keeps the owner from cancelling the job as orphaned
+            coordinator.touch_job(job_id)
+        await asyncio.sleep(REMOTE_POLL_SECONDS)
+
+
+async def stream_job(
+    job_id: str,
+    last_event_id: int = 0,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    protocol: int = 1
+) -> AsyncIterator[str]:
+    """
+    Stream a job as SSE frames, replaying from `last_event_id`.
+
+    Jobs still in memory are replayed and then tailed live; older jobs are
+    replayed from their persisted log, which is followed while another API
+    process still runs the job. `protocol` selects the frame format (see
+    backend.sse).
+    """
+    metrics.ACTIVE_SSE_STREAMS.inc()
+    encoder = EventEncoder(protocol)
+    try:
+        job = get_job(job_id)
+        if job is not None:
+            async with aclosing(job.subscribe(last_event_id, is_disconnected)) as events:
+                async for event_id, event in events:
+                    yield encoder.encode(event_id, event)
+            return
+
+        async with aclosing(_follow_job_log(job_id, last_event_id, is_disconnected)) as events:
+            async for event_id, event in events:
+                yield encoder.encode(event_id, event)
+    finally:
+        metrics.ACTIVE_SSE_STREAMS.dec()
@@ -1,15 +1,326 @@
 """Unified LLM client for making requests to OpenRouter and Ollama."""
 
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
 import httpx
 import json
-from typing import List, Dict, Any, Optional
-from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL, OLLAMA_BASE_URL
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from . import admission, coordination, metrics, model_catalog, timeline, usage as usage_accounting
+from .config import (
+    OPENROUTER_API_KEY, OPENROUTER_API_URL, OLLAMA_BASE_URL,
+    OLLAMA_CONCURRENCY, OPENROUTER_CONCURRENCY,
+    OLLAMA_NUM_CTX_BUCKETS, OLLAMA_NUM_CTX_REPLY_TOKENS, OLLAMA_NUM_CTX_STICKY_SECONDS,
+)
+
+# Priority classes for model calls; lower values are dispatched first
+PRIORITY_INTERACTIVE = 0  # Stage 1 answers and Stage 2 rankings
+PRIORITY_CHAIRMAN = 1     # Stage 3 synthesis
+PRIORITY_BACKGROUND = 2   # Titles, follow-up questions, memory summaries, batch runs
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_CHAIRMAN: "chairman",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# (fair-share key, weight) for calls made from the current task.
+# Council runs set this to their conversation id, see set_schedule_context.
+_schedule_context: contextvars.ContextVar[Tuple[str, float]] = contextvars.ContextVar(
+    "schedule_context", default=("default", 1.0)
+)
+
+
+def set_schedule_context(key: str, weight: float = 1.0):
+    """
+    Attribute subsequent model calls in this task to a fair-share key.
+
+    Args:
+        key: Usually the conversation id
+        weight: Relative share of a host's slots when it is contended
+    """
+    _schedule_context.set((key, weight))
+
+
+# Lowest priority class for calls made from the current task; batch runs
+# raise it so none of their calls compete with interactive users
+_priority_floor: contextvars.ContextVar[int] = contextvars.ContextVar("priority_floor", default=PRIORITY_INTERACTIVE)
+
+
+def set_priority_floor(priority: int):
+    """Demote subsequent model calls in this task to at least `priority`."""
+    _priority_floor.set(priority)
+
+
+class FairScheduler:
+    """
+    Slot pool for one model host.
+
+    Waiting calls are ordered by priority class first, then by start-time
+    fair queuing across fair-share keys: each key's virtual start tag
+    advances by 1/weight per call, so a conversation issuing many calls
+    queues behind conversations that have issued few.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self._waiters: List[Tuple[int, float, int, asyncio.Future]] = []
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._queued = {p: 0 for p in PRIORITY_NAMES}
+        self._waits = {p: deque(maxlen=500) for p in PRIORITY_NAMES}
+        self._wait_totals = {p: [0, 0.0, 0.0] for p in PRIORITY_NAMES}  # count, total, max
+
+    def _start_tag(self, key: str, weight: float) -> float:
+        if len(self._finish_tags) > 1000:
+            # Keys that are behind virtual time carry no credit; forget them
+            self._finish_tags = {k: t for k, t in self._finish_tags.items() if t > self._virtual_time}
+        start = max(self._virtual_time, self._finish_tags.get(key, 0.0))
+        self._finish_tags[key] = start + 1.0 / max(weight, 1e-6)
+        return start
+
+    def _record_wait(self, priority: int, waited: float):
+        self._waits[priority].append(waited)
+        totals = self._wait_totals[priority]
+        totals[0] += 1
+        totals[1] += waited
+        totals[2] = max(totals[2], waited)
+
+    async def acquire(self, priority: int, key: str, weight: float) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            Seconds spent queued
+        """
+        start = self._start_tag(key, weight)
+        if self.active < self.capacity and not self._waiters:
+            self.active += 1
+            self._virtual_time = max(self._virtual_time, start)
+            self._record_wait(priority, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, start, next(self._seq), future))
+        self._queued[priority] += 1
+        enqueued_at = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we were cancelled
+                self.release()
+            else:
+                self._queued[priority] -= 1
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        self._record_wait(priority, waited)
+        return waited
+
+    def release(self):
+        """Hand the slot to the next waiter, or return it to the pool."""
+        while self._waiters:
+            priority, start, _, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+            self._queued[priority] -= 1
+            self._virtual_time = max(self._virtual_time, start)
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time statistics per priority class."""
+        classes = {}
+        for priority, name in PRIORITY_NAMES.items():
+            recent = sorted(self._waits[priority])
+            count, total, maximum = self._wait_totals[priority]
+            classes[name] = {
+                "queued": self._queued[priority],
+                "dispatched": count,
+                "avg_wait": round(total / count, 4) if count else 0.0,
+                "max_wait": round(maximum, 4),
+                "p50_wait": round(recent[len(recent) // 2], 4) if recent else 0.0,
+                "p95_wait": round(recent[int(len(recent) * 0.95)], 4) if recent else 0.0,
+            }
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "queued": sum(self._queued.values()),
+            "classes": classes,
+        }
+
+
+_schedulers: Dict[str, FairScheduler] = {}
+_schedulers_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_scheduler(host: str) -> FairScheduler:
+    """Get (or lazily create) the scheduler for a model host."""
+    global _schedulers_loop
+    loop = asyncio.get_running_loop()
+    if _schedulers_loop is not loop:
+        # Futures are bound to a loop; start fresh on a new one
+        _schedulers.clear()
+        _schedulers_loop = loop
+    if host not in _schedulers:
+        capacity = OPENROUTER_CONCURRENCY if host == "openrouter" else OLLAMA_CONCURRENCY
+        _schedulers[host] = FairScheduler(capacity)
+    return _schedulers[host]
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Stats for every model host that has been used so far."""
+    return {host: scheduler.stats() for host, scheduler in _schedulers.items()}
+
+
+@asynccontextmanager
+async def scheduled(host: str, priority: int):
+    """Hold a slot on a model host for the duration of a call."""
+    # Clients over their model call budget wait before queueing for a slot
+    throttled = await admission.throttle_model_call()
+    if throttled:
+        timeline.annotate(throttle_ms=round(throttled * 1000, 1))
+    key, weight = _schedule_context.get()
+    scheduler = get_scheduler(host)
+    waited = await scheduler.acquire(priority, key, weight)
+    # With several API processes the host's limit is shared: after the
+    # local scheduler picks this call, it also needs a slot from the pool
+    # all processes draw from (immediate with the local backend)
+    try:
+        started = time.perf_counter()
+        lease = await coordination.get_coordinator().acquire_slot(host, scheduler.capacity)
+        waited += time.perf_counter() - started
+    except BaseException:
+        scheduler.release()
+        raise
+    metrics.MODEL_QUEUE_WAIT.observe(waited, host=host, priority=PRIORITY_NAMES[priority])
+    timeline.annotate(queue_ms=round(waited * 1000, 1))
+    try:
+        yield
+    finally:
+        try:
+            coordination.get_coordinator().release_slot(lease)
+        finally:
+            # The local slot comes back even if the shared one could not be released
+            scheduler.release()
+
+
+# Rough characters per token when sizing Ollama's context window; errs
+# towards overestimating the prompt, as an underestimate truncates it
+CHARS_PER_TOKEN = 3
+
+# (Ollama URL, model) -> (num_ctx it was last given, when)
+_num_ctx_in_use: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Upper-end token estimate for a chat prompt."""
+    return sum(len(m.get("content") or "") // CHARS_PER_TOKEN + 4 for m in messages)
+
+
+def choose_num_ctx(base_url: str, model: str, messages: List[Dict[str, str]], reply_tokens: int) -> Optional[int]:
+    """
+    Size an Ollama context window for a prompt (see OLLAMA_NUM_CTX_BUCKETS).
+
+    Args:
+        base_url: The Ollama server's chat URL
+        model: Ollama model name
+        messages: The full prompt
+        reply_tokens: Room to leave for the reply
+
+    Returns:
+        num_ctx to send, or None to leave it to Ollama
+    """
+    if not OLLAMA_NUM_CTX_BUCKETS:
+        return None
+    needed = estimate_tokens(messages) + reply_tokens
+    num_ctx = next((b for b in OLLAMA_NUM_CTX_BUCKETS if b >= needed), OLLAMA_NUM_CTX_BUCKETS[-1])
+    limit = model_catalog.get_context_length(f"ollama/{model}")
+    if limit:
+        num_ctx = min(num_ctx, limit)
+
+    # A smaller window than the loaded one would only cost a reload
+    now = time.monotonic()
+    in_use = _num_ctx_in_use.get((base_url, model))
+    if in_use and now - in_use[1] < OLLAMA_NUM_CTX_STICKY_SECONDS:
+        num_ctx = max(num_ctx, in_use[0])
+    _num_ctx_in_use[(base_url, model)] = (num_ctx, now)
+    return num_ctx
+
+
+def _ollama_payload(
+    base_url: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    stream: bool,
+    stop: Optional[List[str]],
+    inference: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Ollama chat request with the inference profile's options and a sized context window."""
+    inference = inference or {}
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": stream
+    }
+    options = {k: inference[k] for k in ("num_predict", "temperature", "num_thread") if inference.get(k) is not None}
+    num_ctx = inference.get("num_ctx") or choose_num_ctx(
+        base_url, model, messages, inference.get("num_predict") or OLLAMA_NUM_CTX_REPLY_TOKENS
+    )
+    if num_ctx:
+        options["num_ctx"] = num_ctx
+        timeline.annotate(num_ctx=num_ctx)
+    if stop:
+        options["stop"] = stop
+    if options:
+        payload["options"] = options
+    if inference.get("keep_alive") is not None:
+        payload["keep_alive"] = inference["keep_alive"]
+    return payload
+
+
+def _openrouter_payload(
+    model: str,
+    messages: List[Dict[str, str]],
+    stream: bool,
+    stop: Optional[List[str]],
+    inference: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """OpenRouter chat request with the inference profile's options."""
+    inference = inference or {}
+    payload = {
+        "model": model,
+        "messages": messages,
+    }
+    if stream:
+        payload["stream"] = True
+    if stop:
+        payload["stop"] = stop
+    # Ask for the call's cost in the usage report
+    payload["usage"] = {"include": True}
+    for key in ("max_tokens", "temperature"):
+        if inference.get(key) is not None:
+            payload[key] = inference[key]
+    return payload
+
 
 async def query_model(
     model: str,
     messages: List[Dict[str, str]],
     timeout: float = 300.0,
-    system_prompt: Optional[str] = None
+    system_prompt: Optional[str] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    stop: Optional[List[str]] = None,
+    should_stop: Optional[Callable[[str], bool]] = None,
+    inference: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Query a single model via OpenRouter or Ollama.
@@ -22,118 +333,375 @@ async def query_model(
         messages: List of message dicts with 'role' and 'content'
         timeout: Request timeout in seconds
         system_prompt: Optional system prompt to prepend to messages
+        priority: Scheduling class (PRIORITY_INTERACTIVE, PRIORITY_CHAIRMAN
+            or PRIORITY_BACKGROUND)
+        stop: Optional provider stop sequences
+        should_stop: Optional check called with the text generated so far;
+            when given, the response is streamed and the request is closed
+            as soon as the check returns True
+        inference: Optional inference profile (see personas.InferenceProfile)
 
     Returns:
-        Response dict with 'content' and optional 'reasoning_details', or None if failed
+        Response dict with 'content', optional 'reasoning_details' and
+        'usage' (see usage.normalize), or None if failed. Streamed
+        responses also carry 'stopped_early'.
     """
     # Inject system prompt if provided
     final_messages = messages
     if system_prompt:
         final_messages = [{"role": "system", "content": system_prompt}] + messages
 
+    priority = max(priority, _priority_floor.get())
+
     if model.startswith("ollama/"):
-        return await _query_ollama(model.replace("ollama/", ""), final_messages, timeout)
+        from .settings import get_settings
+        provider = "ollama"
+        host = f"ollama:{get_settings().get('ollama_base_url')}"
     else:
-        return await _query_openrouter(model, final_messages, timeout)
+        provider = host = "openrouter"
 
+    with timeline.span("call", model=model, priority=PRIORITY_NAMES[priority]):
+        async with scheduled(host, priority):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                if provider == "ollama" and should_stop:
+                    result = await _stream_ollama(model.replace("ollama/", ""), final_messages, timeout, stop, should_stop, inference)
+                elif provider == "ollama":
+                    result = await _query_ollama(model.replace("ollama/", ""), final_messages, timeout, stop, inference)
+                elif should_stop:
+                    result = await _stream_openrouter(model, final_messages, timeout, stop, should_stop, inference)
+                else:
+                    result = await _query_openrouter(model, final_messages, timeout, stop, inference)
+                if result is not None:
+                    outcome = "success"
+                    result['usage'] = usage_accounting.normalize(
+                        provider, model, result.get('usage'), time.perf_counter() - start
+                    )
+                    await usage_accounting.record(result['usage'])
+                return result
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                metrics.MODEL_REQUEST_DURATION.observe(duration, provider=provider, model=model, outcome=outcome)
+                timeline.annotate(outcome=outcome)
 
-async def _query_openrouter(
-    model: str,
-    messages: List[Dict[str, str]],
-    timeout: float
-) -> Optional[Dict[str, Any]]:
-    """Query OpenRouter API."""
+
+def _openrouter_headers() -> Dict[str, str]:
     from .settings import get_settings
-    
+
     settings = get_settings()
     api_key = settings.get("openrouter_api_key") or OPENROUTER_API_KEY
-    
-    headers = {
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
 
-    payload = {
-        "model": model,
-        "messages": messages,
-    }
+
+async def _query_openrouter(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    stop: Optional[List[str]] = None,
+    inference: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Query OpenRouter API."""
+    headers = _openrouter_headers()
+    payload = _openrouter_payload(model, messages, False, stop, inference)
 
     try:
+        start = time.perf_counter()
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers=headers,
-                json=payload
-            )
+            async with client.stream("POST", OPENROUTER_API_URL, headers=headers, json=payload) as response:
+                ttfb = time.perf_counter() - start
+                await response.aread()
             response.raise_for_status()
 
             data = response.json()
             message = data['choices'][0]['message']
 
+            # OpenRouter does not report generation time, so tokens per
+            # second are measured over the whole request
+            usage = data.get('usage') or {}
+            metrics.record_tokens(
+                "openrouter", model,
+                usage.get('prompt_tokens'), usage.get('completion_tokens'),
+                time.perf_counter() - start
+            )
+            timeline.annotate(
+                ttfb_ms=round(ttfb * 1000, 1),
+                prompt_tokens=usage.get('prompt_tokens'),
+                completion_tokens=usage.get('completion_tokens')
+            )
+
             return {
                 'content': message.get('content'),
-                'reasoning_details': message.get('reasoning_details')
+                'reasoning_details': message.get('reasoning_details'),
+                'usage': {
+                    'prompt_tokens': usage.get('prompt_tokens'),
+                    'completion_tokens': usage.get('completion_tokens'),
+                    'cost': usage.get('cost'),
+                }
             }
 
     except Exception as e:
+        metrics.MODEL_ERRORS.inc(provider="openrouter", model=model, error=type(e).__name__)
+        timeline.annotate(error=type(e).__name__)
         print(f"Error querying OpenRouter model {model}: {e}")
         return None
 
 
-import asyncio
+async def _stream_openrouter(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    stop: Optional[List[str]],
+    should_stop: Callable[[str], bool],
+    inference: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Stream from OpenRouter, closing the request once should_stop is satisfied."""
+    payload = _openrouter_payload(model, messages, True, stop, inference)
+
+    content = ""
+    usage = {}
+    stopped_early = False
+    ttfb = None
+    try:
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("POST", OPENROUTER_API_URL, headers=_openrouter_headers(), json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Skip blank lines and ": OPENROUTER PROCESSING" comments
+                    if not line.startswith("data: "):
+                        continue
+                    if line == "data: [DONE]":
+                        break
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - start
+                    data = json.loads(line[6:])
+                    usage = data.get('usage') or usage
+                    choices = data.get('choices') or [{}]
+                    content += choices[0].get('delta', {}).get('content') or ""
+                    if should_stop(content):
+                        # Leaving the block closes the connection and ends generation
+                        stopped_early = True
+                        break
+
+        metrics.record_tokens(
+            "openrouter", model,
+            usage.get('prompt_tokens'), usage.get('completion_tokens'),
+            time.perf_counter() - start
+        )
+        timeline.annotate(
+            ttfb_ms=round(ttfb * 1000, 1) if ttfb is not None else None,
+            prompt_tokens=usage.get('prompt_tokens'),
+            completion_tokens=usage.get('completion_tokens'),
+            stopped_early=stopped_early or None
+        )
 
-_ollama_semaphore = None
+        return {
+            'content': content,
+            'reasoning_details': None,
+            'usage': {
+                'prompt_tokens': usage.get('prompt_tokens'),
+                'completion_tokens': usage.get('completion_tokens'),
+                'cost': usage.get('cost'),
+            },
+            'stopped_early': stopped_early
+        }
+
+    except Exception as e:
+        metrics.MODEL_ERRORS.inc(provider="openrouter", model=model, error=type(e).__name__)
+        timeline.annotate(error=type(e).__name__)
+        print(f"Error querying OpenRouter model {model}: {e}")
+        return None
 
-def get_ollama_semaphore():
-    global _ollama_semaphore
-    if _ollama_semaphore is None:
-        _ollama_semaphore = asyncio.Semaphore(2)
-    return _ollama_semaphore
 
 async def _query_ollama(
     model: str,
     messages: List[Dict[str, str]],
-    timeout: float
+    timeout: float,
+    stop: Optional[List[str]] = None,
+    inference: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """Query local Ollama instance."""
     from .settings import get_settings
     
     settings = get_settings()
     base_url = settings.get("ollama_base_url")
-    
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False
-    }
+    payload = _ollama_payload(base_url, model, messages, False, stop, inference)
 
-    semaphore = get_ollama_semaphore()
+    try:
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("POST", base_url, json=payload) as response:
+                ttfb = time.perf_counter() - start
+                await response.aread()
+            response.raise_for_status()
 
+            data = response.json()
+            
+            # Ollama response format is different from OpenAI/OpenRouter
+            # It returns 'message': {'role': 'assistant', 'content': '...'}
+            message = data.get('message', {})
+
+            # Durations are reported in nanoseconds
+            eval_duration = data.get('eval_duration')
+            metrics.record_tokens(
+                "ollama", f"ollama/{model}",
+                data.get('prompt_eval_count'), data.get('eval_count'),
+                eval_duration / 1e9 if eval_duration else None
+            )
+            timeline.annotate(
+                ttfb_ms=round(ttfb * 1000, 1),
+                prompt_tokens=data.get('prompt_eval_count'),
+                completion_tokens=data.get('eval_count'),
+                load_ms=_ns_to_ms(data.get('load_duration')),
+                prompt_eval_ms=_ns_to_ms(data.get('prompt_eval_duration')),
+                eval_ms=_ns_to_ms(eval_duration)
+            )
+            
+            return {
+                'content': message.get('content'),
+                'reasoning_details': None, # Ollama doesn't typically provide this yet
+                'usage': {
+                    'prompt_tokens': data.get('prompt_eval_count'),
+                    'completion_tokens': data.get('eval_count'),
+                    'compute_ms': _ns_to_ms(data.get('total_duration')),
+                }
+            }
+
+    except Exception as e:
+        metrics.MODEL_ERRORS.inc(provider="ollama", model=f"ollama/{model}", error=type(e).__name__)
+        timeline.annotate(error=type(e).__name__)
+        print(f"Error querying Ollama model {model}: {e}")
+        return None
+
+
+async def _stream_ollama(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    stop: Optional[List[str]],
+    should_stop: Callable[[str], bool],
+    inference: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Stream from Ollama, closing the request once should_stop is satisfied."""
+    from .settings import get_settings
+
+    base_url = get_settings().get("ollama_base_url")
+    payload = _ollama_payload(base_url, model, messages, True, stop, inference)
+
+    content = ""
+    final = {}
+    chunks = 0
+    stopped_early = False
+    ttfb = None
     try:
-        async with semaphore:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    base_url,
-                    json=payload
-                )
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("POST", base_url, json=payload) as response:
                 response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - start
+                    data = json.loads(line)
+                    if data.get('done'):
+                        # The last line carries the token counts and timings
+                        final = data
+                        break
+                    chunks += 1
+                    content += data.get('message', {}).get('content') or ""
+                    if should_stop(content):
+                        # Ollama stops generating when the client disconnects
+                        stopped_early = True
+                        break
 
-                data = response.json()
-                
-                # Ollama response format is different from OpenAI/OpenRouter
-                # It returns 'message': {'role': 'assistant', 'content': '...'}
-                message = data.get('message', {})
-                
-                return {
-                    'content': message.get('content'),
-                    'reasoning_details': None # Ollama doesn't typically provide this yet
-                }
+        eval_duration = final.get('eval_duration')
+        if stopped_early:
+            # No final stats: each streamed chunk is one token
+            completion_tokens, generation_seconds = chunks, time.perf_counter() - start - ttfb
+        else:
+            completion_tokens, generation_seconds = final.get('eval_count'), (eval_duration / 1e9 if eval_duration else None)
+        metrics.record_tokens(
+            "ollama", f"ollama/{model}",
+            final.get('prompt_eval_count'), completion_tokens, generation_seconds
+        )
+        timeline.annotate(
+            ttfb_ms=round(ttfb * 1000, 1) if ttfb is not None else None,
+            prompt_tokens=final.get('prompt_eval_count'),
+            completion_tokens=completion_tokens,
+            load_ms=_ns_to_ms(final.get('load_duration')),
+            prompt_eval_ms=_ns_to_ms(final.get('prompt_eval_duration')),
+            eval_ms=_ns_to_ms(eval_duration),
+            stopped_early=stopped_early or None
+        )
+
+        return {
+            'content': content,
+            'reasoning_details': None,
+            'usage': {
+                'prompt_tokens': final.get('prompt_eval_count'),
+                'completion_tokens': completion_tokens,
+                # Without final stats the server was busy for the whole request
+                'compute_ms': _ns_to_ms(final.get('total_duration')) or round((time.perf_counter() - start) * 1000, 1),
+            },
+            'stopped_early': stopped_early
+        }
 
     except Exception as e:
+        metrics.MODEL_ERRORS.inc(provider="ollama", model=f"ollama/{model}", error=type(e).__name__)
+        timeline.annotate(error=type(e).__name__)
         print(f"Error querying Ollama model {model}: {e}")
         return None
 
 
+async def embed_texts(
+    model: str,
+    texts: List[str],
+    timeout: float = 60.0,
+    priority: int = PRIORITY_INTERACTIVE
+) -> Optional[List[List[float]]]:
+    """
+    Embed texts with a local Ollama embedding model.
+
+    Args:
+        model: Ollama model name, with or without the 'ollama/' prefix
+        texts: Texts to embed in one request
+        timeout: Request timeout in seconds
+        priority: Scheduling class
+
+    Returns:
+        One vector per text, or None if failed
+    """
+    from .settings import get_settings
+
+    model = model.replace("ollama/", "")
+    base_url = get_settings().get("ollama_base_url")
+    embed_url = base_url.replace("/api/chat", "/api/embed")
+
+    with timeline.span("embed", model=f"ollama/{model}", count=len(texts)):
+        async with scheduled(f"ollama:{base_url}", max(priority, _priority_floor.get())):
+            try:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    response = await client.post(embed_url, json={"model": model, "input": texts})
+                    response.raise_for_status()
+                    return response.json()["embeddings"]
+            except Exception as e:
+                metrics.MODEL_ERRORS.inc(provider="ollama", model=f"ollama/{model}", error=type(e).__name__)
+                print(f"Error embedding with Ollama model {model}: {e}")
+                return None
+
+
+def _ns_to_ms(value: Optional[int]) -> Optional[float]:
+    return round(value / 1e6, 1) if value else None
+
+
 async def query_models_parallel(
     models: List[str],
     messages: List[Dict[str, str]],
@@ -1,17 +1,20 @@
 """FastAPI backend for Quorum."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Tuple, Union
 import uuid
 import json
 import asyncio
+from datetime import datetime
+from contextlib import aclosing
 
-from . import storage, personas
-from .council import run_full_council, generate_conversation_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
+from . import storage, personas, memory, jobs, llm_client, metrics, timeline, batch, selection, compaction, archive, search, sse, model_catalog, coordination, admission, usage
+from .council import run_full_council, run_council_stages, regenerate_stages, generate_conversation_title, FOLLOWUP_PREFIX
+from .config import COUNCIL_MODELS, CHAIRMAN_MODEL, SCHEDULER_AGENTIC_WEIGHT, GZIP_MIN_SIZE, TURN_RESUME_MAX_AGE_SECONDS
 
 app = FastAPI(title="Quorum API")
 
@@ -22,14 +25,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Job-Id", "ETag", "Retry-After"],
 )
 
+# Event streams are excluded by the middleware; protocol 2 streams compress themselves
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match includes `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+@app.exception_handler(admission.AdmissionError)
+async def admission_error_handler(request: Request, exc: admission.AdmissionError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message}, headers=exc.headers())
+
+
+def _api_key(request: Request) -> Optional[str]:
+    """API key of a request, from X-API-Key or a bearer token."""
+    api_key = request.headers.get("x-api-key")
+    authorization = request.headers.get("authorization", "")
+    if not api_key and authorization.lower().startswith("bearer "):
+        api_key = authorization[7:].strip()
+    return api_key
+
+
+def _client_id(request: Request) -> str:
+    """Admission control client of a request."""
+    return admission.identify_client(_api_key(request), request.client.host if request.client else None)
+
+
+def _require_admin(request: Request):
+    """Refuse admin endpoints to requests without a configured API key."""
+    admission.require_admin(_api_key(request))
+
 
 class CreateConversationRequest(BaseModel):
     """Request to create a new conversation."""
     council_members: Optional[List[str]] = None  # List of model IDs or Persona IDs
     chairman_id: Optional[str] = None  # Model ID or Persona ID
     conversation_type: str = "standard"  # "standard" or "agentic"
+    member_budget: Optional[int] = None  # Members queried per turn, picked adaptively
+    token_budget: Optional[int] = None  # Overrides USAGE_TOKEN_BUDGET
+    cost_budget: Optional[float] = None  # Overrides USAGE_COST_BUDGET (USD)
 
 
 class CreatePersonaRequest(BaseModel):
@@ -37,6 +86,16 @@ class CreatePersonaRequest(BaseModel):
     model_id: str
     system_prompt: str
     avatar_color: str = "#3b82f6"
+    inference: Optional[personas.InferenceProfile] = None
+
+
+class UpdatePersonaRequest(BaseModel):
+    """Fields of a persona to change; omitted fields are kept."""
+    name: Optional[str] = None
+    model_id: Optional[str] = None
+    system_prompt: Optional[str] = None
+    avatar_color: Optional[str] = None
+    inference: Optional[personas.InferenceProfile] = None  # Replaces the whole profile
 
 
 class SendMessageRequest(BaseModel):
@@ -44,6 +103,12 @@ class SendMessageRequest(BaseModel):
     content: str
 
 
+class RegenerateRequest(BaseModel):
+    """Request to regenerate part of a stored answer."""
+    target: str  # "stage1", "stage2" or "stage3"
+    member: Optional[str] = None  # Persona name of the member (or judge) to regenerate
+
+
 class ConversationMetadata(BaseModel):
     """Conversation metadata for list view."""
     id: str
@@ -61,6 +126,30 @@ class Conversation(BaseModel):
     messages: List[Dict[str, Any]]
     council_config: Optional[Dict[str, Any]] = None  # Store the council configuration used
     conversation_type: str = "standard"
+    pending_turn: Optional[Dict[str, Any]] = None  # Checkpoint of an unfinished turn
+    usage: Optional[Dict[str, Any]] = None  # Model usage of all its turns (see backend.usage)
+
+
+# Set once the server is stopping, so turns cancelled by the shutdown stay
+# marked as running and are resumed on the next start
+_shutting_down = False
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start periodic storage compaction and model catalog refresh, and resume interrupted turns."""
+    compaction.start_compaction_loop()
+    model_catalog.start_refresh_loop()
+    selection.start_stats_build()
+    resumed = resume_pending_turns()
+    if resumed:
+        print(f"Resumed {resumed} interrupted council turn(s)")
+
+
+@app.on_event("shutdown")
+async def mark_shutting_down():
+    global _shutting_down
+    _shutting_down = True
 
 
 @app.get("/")
@@ -69,72 +158,82 @@ async def root():
     return {"status": "ok", "service": "Quorum API"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics."""
+    for host, stats in llm_client.get_scheduler_stats().items():
+        metrics.SCHEDULER_QUEUE_DEPTH.set(stats["queued"], host=host)
+        metrics.SCHEDULER_ACTIVE.set(stats["active"], host=host)
+
+    return PlainTextResponse(
+        metrics.render_latest(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
+async def list_conversations(request: Request, response: Response):
+    """
+    List all conversations (metadata only).
+
+    Supports If-None-Match: an unchanged list costs one stat and a 304.
+    """
+    etag = storage.get_list_etag()
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return storage.list_conversations()
 
 
 @app.get("/api/models")
-async def list_models():
-    """List available models."""
-    # Combine hardcoded OpenRouter models with local Ollama models
-    # For now, we'll just return the ones in config + maybe query ollama
-    # But to keep it simple, let's just return the ones in COUNCIL_MODELS for now
-    # In a real app, we'd query Ollama and OpenRouter
-    
-    # Let's try to fetch Ollama models dynamically
-    import httpx
-    from .config import OLLAMA_BASE_URL
-    
-    models = []
-    
-    # Add OpenRouter models with specific providers
-    openrouter_models = [
-        {"id": "openai/gpt-5.1", "name": "GPT-5.1", "provider": "OpenAI"},
-        {"id": "google/gemini-3-pro-preview", "name": "Gemini 3 Pro", "provider": "Google"},
-        {"id": "anthropic/claude-sonnet-4.5", "name": "Claude Sonnet 4.5", "provider": "Anthropic"},
-        {"id": "x-ai/grok-4", "name": "Grok 4", "provider": "X.AI"},
-    ]
-    for m in openrouter_models:
-        models.append(m)
-        
-    # Add Ollama models
-    try:
-        from .settings import get_settings
-        settings = get_settings()
-        base_url = settings.get("ollama_base_url")
-        tags_url = base_url.replace("/api/chat", "/api/tags")
-        
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            response = await client.get(tags_url)
-            if response.status_code == 200:
-                ollama_models = response.json().get('models', [])
-                for m in ollama_models:
-                    model_id = f"ollama/{m['name']}"
-                    models.append({"id": model_id, "name": m['name'], "provider": "Ollama"})
-    except Exception:
-        pass
-        
-    return models
+async def list_models(refresh: bool = False):
+    """
+    List available models from the cached catalog.
+
+    The catalog is refreshed in the background, so this never waits on an
+    unreachable provider; pass refresh=true to reload it first.
+    """
+    if refresh:
+        await model_catalog.refresh()
+    else:
+        await model_catalog.ensure_loaded()
+    return model_catalog.get_models()
+
+
+@app.get("/api/models/status")
+async def get_model_catalog_status():
+    """When each model source was last refreshed, and whether it was reachable."""
+    return model_catalog.get_status()
 
 
 class UpdateSettingsRequest(BaseModel):
     ollama_base_url: str
     openrouter_api_key: Optional[str] = ""
-    user_api_key: Optional[str] = ""
+    user_api_key: Optional[str] = None  # Omitted: keep the current key
+
+
+def _public_settings(current: Dict[str, Any]) -> Dict[str, Any]:
+    """Settings as returned to clients: the user API key is only said to be set."""
+    public = {k: v for k, v in current.items() if k != "user_api_key"}
+    public["user_api_key_set"] = bool(current.get("user_api_key"))
+    return public
 
 @app.get("/api/settings")
 async def get_settings():
-    """Get current settings."""
+    """Get current settings (without the user API key)."""
     from . import settings
-    return settings.get_settings()
+    return _public_settings(settings.get_settings())
 
 @app.post("/api/settings")
-async def update_settings(request: UpdateSettingsRequest):
-    """Update settings."""
+async def update_settings(body: UpdateSettingsRequest, request: Request):
+    """Update settings; admin only once an API key is configured."""
     from . import settings
-    return settings.update_settings(request.dict())
+    admission.require_settings_access(_api_key(request))
+    updated = settings.update_settings(body.dict(exclude_none=True))
+    # The Ollama URL may have changed
+    model_catalog.request_refresh()
+    return _public_settings(updated)
 
 
 @app.get("/api/personas")
@@ -150,10 +249,23 @@ async def create_persona(request: CreatePersonaRequest):
         request.name,
         request.model_id,
         request.system_prompt,
-        request.avatar_color
+        request.avatar_color,
+        request.inference.dict(exclude_none=True) if request.inference else None
     )
 
 
+@app.put("/api/personas/{persona_id}")
+async def update_persona(persona_id: str, request: UpdatePersonaRequest):
+    """Update a persona, e.g. its inference profile."""
+    changes = request.dict(exclude_unset=True, exclude={"inference"})
+    if request.inference is not None:
+        changes["inference"] = request.inference.dict(exclude_none=True)
+    persona = personas.update_persona(persona_id, changes)
+    if persona is None:
+        raise HTTPException(status_code=404, detail="Persona not found")
+    return persona
+
+
 @app.delete("/api/personas/{persona_id}")
 async def delete_persona(persona_id: str):
     """Delete a persona."""
@@ -166,7 +278,7 @@ async def delete_persona(persona_id: str):
 @app.delete("/api/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a conversation."""
-    success = storage.delete_conversation(conversation_id)
+    success = await asyncio.to_thread(storage.delete_conversation, conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "success"}
@@ -176,7 +288,7 @@ async def delete_conversation(conversation_id: str):
 async def toggle_message_pin(conversation_id: str, message_id: str):
     """Toggle the pinned status of a message."""
     try:
-        new_status = storage.toggle_message_pin(conversation_id, message_id)
+        new_status = await asyncio.to_thread(storage.toggle_message_pin, conversation_id, message_id)
         return {"status": "success", "pinned": new_status}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -186,254 +298,835 @@ async def toggle_message_pin(conversation_id: str, message_id: str):
 async def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
-    
-    # Resolve council members and chairman
-    # If not provided, use defaults from config
-    
-    final_council_members = []
-    final_chairman = None
-    
-    if request.council_members:
-        for member_id in request.council_members:
-            # Check if it's a persona
-            persona = personas.get_persona(member_id)
-            if persona:
-                final_council_members.append({
-                    "model_id": persona['model_id'],
-                    "name": persona['name'],
-                    "system_prompt": persona['system_prompt'],
-                    "type": "persona",
-                    "id": persona['id']
-                })
-            else:
-                # Assume it's a raw model ID
-                final_council_members.append({
-                    "model_id": member_id,
-                    "name": member_id,
-                    "system_prompt": None,
-                    "type": "model",
-                    "id": member_id
-                })
-    else:
-        # Use default config
-        for model_id in COUNCIL_MODELS:
-            final_council_members.append({
-                "model_id": model_id,
-                "name": model_id,
-                "system_prompt": None,
-                "type": "model",
-                "id": model_id
-            })
-            
-    if request.chairman_id:
-        # Check if it's a persona
-        persona = personas.get_persona(request.chairman_id)
-        if persona:
-            final_chairman = {
-                "model_id": persona['model_id'],
-                "name": persona['name'],
-                "system_prompt": persona['system_prompt'],
-                "type": "persona",
-                "id": persona['id']
-            }
-        else:
-            final_chairman = {
-                "model_id": request.chairman_id,
-                "name": request.chairman_id,
-                "system_prompt": None,
-                "type": "model",
-                "id": request.chairman_id
-            }
-    else:
-        # Use default config
-        final_chairman = {
-            "model_id": CHAIRMAN_MODEL,
-            "name": CHAIRMAN_MODEL,
-            "system_prompt": None,
-            "type": "model",
-            "id": CHAIRMAN_MODEL
-        }
-        
-    council_config = {
-        "members": final_council_members,
-        "chairman": final_chairman
-    }
-    
-    conversation = storage.create_conversation(conversation_id, request.conversation_type)
+
+    # Resolve council members and chairman (defaults from config if not provided)
+    council_config = personas.resolve_council_config(request.council_members, request.chairman_id)
+    if request.member_budget:
+        council_config["member_budget"] = request.member_budget
+    if request.token_budget is not None:
+        council_config["token_budget"] = request.token_budget
+    if request.cost_budget is not None:
+        council_config["cost_budget"] = request.cost_budget
+
+    conversation = await asyncio.to_thread(storage.create_conversation, conversation_id, request.conversation_type)
     
     # Store config in conversation (need to update storage.py or just inject it here if storage supports extra fields)
     # storage.create_conversation just creates a dict. We can add to it.
     conversation["council_config"] = council_config
-    storage.save_conversation(conversation) # Helper to save back
+    await asyncio.to_thread(storage.save_conversation, conversation) # Helper to save back
     
     return conversation
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
-    """Get a specific conversation with all its messages."""
+async def get_conversation(conversation_id: str, request: Request, response: Response):
+    """
+    Get a specific conversation with all its messages.
+
+    Supports If-None-Match: an unchanged conversation costs one stat and a 304.
+    """
+    # Taken before reading, so a concurrent write can only make the ETag stale
+    etag = storage.get_conversation_etag(conversation_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
     conversation = storage.get_conversation(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return conversation
 
 
-@app.post("/api/conversations/{conversation_id}/message")
-async def send_message(conversation_id: str, request: SendMessageRequest):
+def _resolve_council(conversation: Dict[str, Any]):
+    """Get (council_members, chairman) for a conversation."""
+    council_config = conversation.get("council_config")
+
+    # Fallback for old conversations
+    if not council_config:
+        council_members = [{"model_id": m, "name": m} for m in COUNCIL_MODELS]
+        chairman = {"model_id": CHAIRMAN_MODEL, "name": CHAIRMAN_MODEL}
+    else:
+        council_members = council_config["members"]
+        chairman = council_config["chairman"]
+    return council_members, chairman
+
+
+async def council_turn_events(
+    conversation: Dict[str, Any],
+    content: Optional[str],
+    client: Optional[str] = None,
+    resume: bool = False
+):
     """
-    Send a message and run the 3-stage council process.
-    Returns the complete response with all stages.
+    Run one council turn for a conversation, yielding an event dict per step.
+
+    This is the body of a background job; see jobs.submit_job. Model calls
+    are charged to `client`'s budget (see backend.admission). Progress is
+    checkpointed as a pending turn; with `resume`, the conversation's
+    pending turn is continued from its last checkpoint instead of starting
+    a new turn with `content`. The turn's model usage is added to the
+    conversation's totals; a conversation over budget gets a new turn on
+    USAGE_DOWNGRADE_MODEL, or none.
+    """
+    conversation_id = conversation["id"]
+    is_agentic = conversation.get("conversation_type") == "agentic"
+    admission.set_client(client)
+
+    # Model calls from this turn share one fair-share slot budget
+    llm_client.set_schedule_context(
+        conversation_id,
+        SCHEDULER_AGENTIC_WEIGHT if is_agentic else 1.0
+    )
+
+    if resume:
+        turn = conversation["pending_turn"]
+        turn["status"] = "running"
+        await storage.checkpoint_turn(conversation_id, turn)
+        # A title is still owed if the interrupted turn was the first one
+        needs_title = turn.get("is_first_message") and conversation.get("title") == "New Conversation"
+    else:
+        # Check if this is the first message
+        is_first_message = len(conversation["messages"]) == 0
+        needs_title = is_first_message
+
+        council_members, chairman = _resolve_council(conversation)
+        # With a member budget, only the most promising members are queried
+        council_members, member_selection = selection.choose_members(
+            council_members, (conversation.get("council_config") or {}).get("member_budget")
+        )
+
+        over_budget = usage.check_budget(conversation)
+        if over_budget is not None:
+            yield {'type': 'budget_exceeded', 'data': over_budget}
+            if over_budget["action"] == "stop":
+                return
+            council_members = [usage.downgrade(m) for m in council_members]
+            chairman = usage.downgrade(chairman)
+
+        # Add user message, checkpointing the turn it starts
+        turn = await asyncio.to_thread(storage.begin_turn, conversation_id, content, {
+            "members": council_members,
+            "chairman": chairman,
+            "member_selection": member_selection,
+            "is_first_message": is_first_message,
+            "client": client,
+            **({"round": 1} if is_agentic else {}),
+            **({"budget": over_budget} if over_budget is not None else {}),
+        })
+
+    content = turn["query"]
+    chairman = turn["chairman"]
+    title_task = None
+    with usage.track() as spent:
+        try:
+            with timeline.span("turn", conversation_id=conversation_id) as turn_span:
+                # Start title generation in parallel (don't await yet)
+                if needs_title:
+                    title_task = asyncio.create_task(generate_conversation_title(content, model_id=chairman['model_id']))
+
+                # Run the council process
+                if is_agentic:
+                    from .council import run_agentic_council
+                    async for event in run_agentic_council(turn, conversation_id, spent):
+                        yield event
+                    # A round that failed is left pending
+                    await asyncio.to_thread(_mark_turn_interrupted, conversation_id, "failed")
+                else:
+                    # The previous turn may still be folding itself into the summary
+                    if await memory.wait_for_update(conversation_id):
+                        conversation = storage.get_conversation(conversation_id) or conversation
+                    context = memory.build_context(conversation)
+
+                    extra_metadata = {}
+                    if turn.get("member_selection"):
+                        extra_metadata["selection"] = turn["member_selection"]
+                    if turn.get("budget"):
+                        extra_metadata["budget"] = turn["budget"]
+
+                    # Stages 1-3, skipping whatever an interrupted run already finished
+                    async for event in run_council_stages(
+                        turn, context,
+                        on_checkpoint=lambda t: storage.checkpoint_turn(conversation_id, t),
+                        extra_metadata=extra_metadata or None
+                    ):
+                        yield event
+
+                    # Add assistant message with all stages
+                    turn_timeline = timeline.to_compact(turn_span)
+                    await asyncio.to_thread(
+                        storage.add_assistant_message,
+                        conversation_id,
+                        turn["stage1"],
+                        turn["stage2"],
+                        turn["stage3"],
+                        turn["metadata"],
+                        timeline=turn_timeline
+                    )
+                    selection.record_turn(turn["stage1"], turn["metadata"], turn_timeline)
+
+                    # Fold turns that left the verbatim window into the summary,
+                    # without holding the run (and the conversation) for it
+                    memory.schedule_update(conversation_id, chairman)
+
+                    # Send completion event
+                    yield {'type': 'complete'}
+
+                # Wait for title generation if it was started
+                if title_task:
+                    title = await title_task
+                    await asyncio.to_thread(storage.update_conversation_title, conversation_id, title)
+                    yield {'type': 'title_complete', 'data': {'title': title}}
+        except asyncio.CancelledError:
+            # The checkpoint stays for an explicit resume; only turns still
+            # "running" (cut off by a restart or crash) resume on startup
+            if not _shutting_down:
+                await asyncio.to_thread(_mark_turn_interrupted, conversation_id, "cancelled")
+            raise
+        except Exception:
+            await asyncio.to_thread(_mark_turn_interrupted, conversation_id, "failed")
+            raise
+        finally:
+            # On cancellation the title call must not outlive the turn
+            if title_task and not title_task.done():
+                title_task.cancel()
+            # Calls a cut-off turn already made still count
+            if spent["calls"]:
+                await asyncio.to_thread(storage.add_conversation_usage, conversation_id, spent)
+
+
+def _mark_turn_interrupted(conversation_id: str, status: str):
+    """Record why a conversation's pending turn stopped, if it still has one."""
+    conversation = storage.get_conversation(conversation_id)
+    turn = (conversation or {}).get("pending_turn")
+    if turn is not None:
+        turn["status"] = status
+        storage.update_pending_turn(conversation_id, turn)
+
+
+def resume_pending_turns() -> int:
+    """
+    Resubmit council turns that were still running when the server stopped.
+
+    Turns that were cancelled or failed, or that started more than
+    TURN_RESUME_MAX_AGE_SECONDS ago, are left for an explicit resume.
+
+    Returns:
+        Number of turns resumed
+    """
+    if TURN_RESUME_MAX_AGE_SECONDS == 0:
+        return 0
+    resumed = 0
+    for conversation_id in storage.list_pending_turns():
+        try:
+            conversation = storage.get_conversation(conversation_id)
+            turn = (conversation or {}).get("pending_turn")
+            if turn is None:
+                storage.discard_pending_turn(conversation_id)
+                continue
+            age = (datetime.utcnow() - datetime.fromisoformat(turn["started_at"])).total_seconds()
+            if turn.get("status") != "running" or (
+                TURN_RESUME_MAX_AGE_SECONDS is not None and age > TURN_RESUME_MAX_AGE_SECONDS
+            ):
+                continue
+            if jobs.get_active_job_id(conversation_id) is not None:
+                continue
+            client = turn.get("client")
+            jobs.submit_job(
+                conversation_id,
+                lambda conversation=conversation, client=client: council_turn_events(conversation, None, client, resume=True),
+                client
+            )
+            resumed += 1
+        except jobs.JobConflictError:
+            # Another API process picked it up
+            continue
+        except Exception as e:
+            print(f"Error resuming turn of conversation {conversation_id}: {e}")
+    return resumed
+
+
+def _start_council_job(conversation_id: str, content: Optional[str], client: str, resume: bool = False) -> jobs.Job:
+    """
+    Submit a council turn as a background job, rejecting concurrent runs and clients over budget.
+
+    With `resume`, the conversation's pending turn is continued instead.
     """
-    # Check if conversation exists
     conversation = storage.get_conversation(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    if resume and not conversation.get("pending_turn"):
+        raise HTTPException(status_code=404, detail="No interrupted turn to resume")
+    if not resume:
+        _check_conversation_budget(conversation)
 
-    # Check if this is the first message
-    is_first_message = len(conversation["messages"]) == 0
+    return _submit_run(conversation_id, lambda: council_turn_events(conversation, content, client, resume), client)
 
-    # Add user message
-    storage.add_user_message(conversation_id, request.content)
 
-    # If this is the first message, generate a title
-    if is_first_message:
-        # We need to resolve chairman first to use it for titling
-        council_config = conversation.get("council_config")
-        chairman_id = None
-        if council_config:
-            chairman_id = council_config["chairman"]["model_id"]
-        else:
-             chairman_id = CHAIRMAN_MODEL
+def _check_conversation_budget(conversation: Dict[str, Any]):
+    """Reject new work (402) for a conversation whose budget is spent and cannot be downgraded."""
+    over = usage.check_budget(conversation)
+    if over is not None and over["action"] == "stop":
+        raise HTTPException(
+            status_code=402,
+            detail={"message": f"Conversation {over['exceeded']} budget exhausted", **over}
+        )
 
-        title = await generate_conversation_title(request.content, model_id=chairman_id)
-        storage.update_conversation_title(conversation_id, title)
 
-    # Get council config from conversation
-    council_config = conversation.get("council_config")
-    
-    # Fallback for old conversations
-    if not council_config:
-        council_members = [{"model_id": m, "name": m} for m in COUNCIL_MODELS]
-        chairman = {"model_id": CHAIRMAN_MODEL, "name": CHAIRMAN_MODEL}
-    else:
-        council_members = council_config["members"]
-        chairman = council_config["chairman"]
+def _submit_run(conversation_id: str, runner, client: str) -> jobs.Job:
+    """Submit a conversation's run as a job, unless one is active (409) or the client is over budget."""
+    active_job_id = jobs.get_active_job_id(conversation_id)
+    if active_job_id is None:
+        admission.admit_run(client)
+        try:
+            return jobs.submit_job(conversation_id, runner, client)
+        except jobs.JobConflictError as e:
+            # Another API process started one in the meantime
+            active_job_id = e.job_id
+    raise HTTPException(
+        status_code=409,
+        detail={"message": "A council run is already in progress", "job_id": active_job_id}
+    )
+
+
+def _regeneration_turn(conversation: Dict[str, Any], message_id: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Rebuild the turn behind a stored assistant message (see council.regenerate_stages).
 
-    # Run the 3-stage council process
-    stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-        request.content,
-        council_members,
-        chairman
+    Returns:
+        Tuple of (turn, index of the user message that asked it)
+    """
+    messages = conversation["messages"]
+    index = next(
+        (i for i, m in enumerate(messages) if m.get("id") == message_id and m.get("role") == "assistant"),
+        None
+    )
+    if index is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    question_index = next((i for i in range(index - 1, -1, -1) if messages[i].get("role") == "user"), None)
+    if question_index is None:
+        raise HTTPException(status_code=400, detail="Message has no question to answer")
+    message = messages[index]
+    if not message.get("stage1"):
+        raise HTTPException(status_code=400, detail="Message has no council answers to regenerate")
+
+    # Members as they answered (a member budget or eviction may have left
+    # some out), with their current persona settings
+    council_members, chairman = _resolve_council(conversation)
+    by_name = {m.get("name", m["model_id"]): m for m in council_members}
+    members = [
+        by_name.get(result["persona_name"], {"model_id": result["model"], "name": result["persona_name"]})
+        for result in message["stage1"]
+    ]
+
+    turn = {
+        "query": messages[question_index].get("content", "").removeprefix(FOLLOWUP_PREFIX),
+        "members": members,
+        "chairman": chairman,
+        "stage1": message["stage1"],
+        "stage2": message.get("stage2") or [],
+        "stage3": message.get("stage3"),
+        "metadata": message.get("metadata") or {},
+    }
+    return turn, question_index
+
+
+async def regenerate_events(
+    conversation: Dict[str, Any],
+    message_id: str,
+    target: str,
+    member: Optional[str],
+    client: Optional[str] = None
+):
+    """
+    Regenerate part of a stored answer, yielding an event dict per step.
+
+    The body of a background job, like council_turn_events. Only the
+    target and the stages depending on it are recomputed; the message is
+    then updated in place, keeping the replaced stages as a revision. The
+    calls are added to the conversation's usage.
+    """
+    conversation_id = conversation["id"]
+    is_agentic = conversation.get("conversation_type") == "agentic"
+    admission.set_client(client)
+    llm_client.set_schedule_context(conversation_id, SCHEDULER_AGENTIC_WEIGHT if is_agentic else 1.0)
+
+    # The run may have queued behind others; work from the stored message as it is now
+    conversation = storage.get_conversation(conversation_id) or conversation
+    turn, question_index = _regeneration_turn(conversation, message_id)
+    original = dict(turn)
+    context = memory.build_context(conversation, before=question_index)
+
+    with usage.track() as spent:
+        try:
+            with timeline.span("regenerate", conversation_id=conversation_id, target=target):
+                async for event in regenerate_stages(turn, target, member, context):
+                    yield event
+        finally:
+            if spent["calls"]:
+                await asyncio.to_thread(storage.add_conversation_usage, conversation_id, spent)
+
+    changes = {
+        field: turn[field]
+        for field in ("stage1", "stage2", "stage3", "metadata")
+        if turn[field] is not original[field]
+    }
+    message = await asyncio.to_thread(
+        storage.revise_assistant_message,
+        conversation_id, message_id, changes, {"target": target, "member": member}
     )
+    yield {'type': 'complete', 'message_id': message_id, 'revision': message["revision"]}
+
 
-    # Add assistant message with all stages
-    storage.add_assistant_message(
+def _start_regeneration_job(conversation_id: str, message_id: str, request: RegenerateRequest, client: str) -> jobs.Job:
+    """Validate a regeneration request and submit it as the conversation's run."""
+    conversation = storage.get_conversation(conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    turn, _ = _regeneration_turn(conversation, message_id)
+    if request.target not in ("stage1", "stage2", "stage3"):
+        raise HTTPException(status_code=400, detail=f"Unknown target {request.target!r}")
+    if request.member is not None and request.target != "stage3":
+        results = turn["stage1"] if request.target == "stage1" else turn["stage2"]
+        if request.member not in {r["persona_name"] for r in results}:
+            raise HTTPException(status_code=400, detail=f"No {request.target} result from {request.member!r}")
+    elif request.target == "stage1":
+        raise HTTPException(status_code=400, detail="Regenerating Stage 1 needs a member")
+    _check_conversation_budget(conversation)
+
+    return _submit_run(
         conversation_id,
-        stage1_results,
-        stage2_results,
-        stage3_result,
-        metadata
+        lambda: regenerate_events(conversation, message_id, request.target, request.member, client),
+        client
     )
 
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
+@app.post("/api/conversations/{conversation_id}/message")
+async def send_message(conversation_id: str, request: SendMessageRequest, http_request: Request):
+    """
+    Send a message and run the 3-stage council process.
+    Returns the complete response with all stages.
+    """
+    job = _start_council_job(conversation_id, request.content, _client_id(http_request))
+
+    result = {}
+    async with aclosing(job.subscribe(is_disconnected=http_request.is_disconnected)) as events:
+        async for _, event in events:
+            event_type = event.get('type')
+            if event_type == 'stage1_complete':
+                result["stage1"] = event['data']
+            elif event_type == 'stage2_complete':
+                result["stage2"] = event['data']
+                result["metadata"] = event['metadata']
+            elif event_type == 'stage3_complete':
+                result["stage3"] = event['data']
+            elif event_type == 'error':
+                raise HTTPException(status_code=500, detail=event['message'])
+            elif event_type == 'cancelled':
+                raise HTTPException(status_code=409, detail=event['message'])
+            elif event_type == 'budget_exceeded' and event['data']['action'] == 'stop':
+                raise HTTPException(status_code=402, detail=event['data'])
+
     # Return the complete response with metadata
-    return {
-        "stage1": stage1_results,
-        "stage2": stage2_results,
-        "stage3": stage3_result,
-        "metadata": metadata
-    }
+    return result
+
+
+def _job_event_stream(
+    job_id: str,
+    http_request: Request,
+    protocol: Optional[int],
+    last_event_id: int = 0
+) -> StreamingResponse:
+    """SSE response for a council run in the negotiated protocol (see backend.sse)."""
+    protocol, use_gzip = sse.negotiate(protocol, http_request.headers.get("accept-encoding"))
+    frames = jobs.stream_job(job_id, last_event_id, is_disconnected=http_request.is_disconnected, protocol=protocol)
+    body, headers = sse.wrap_stream(frames, protocol, use_gzip)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, **headers, "X-Job-Id": job_id}
+    )
 
 
 @app.post("/api/conversations/{conversation_id}/message/stream")
-async def send_message_stream(conversation_id: str, request: SendMessageRequest):
+async def send_message_stream(
+    conversation_id: str,
+    request: SendMessageRequest,
+    http_request: Request,
+    protocol: Optional[int] = None
+):
     """
     Send a message and stream the 3-stage council process.
     Returns Server-Sent Events as each stage completes.
+
+    The run itself is a background job: if this stream is lost, reattach
+    with GET /api/conversations/{conversation_id}/stream. Runs nobody is
+    watching are cancelled after JOB_ORPHAN_GRACE_SECONDS. `protocol=2`
+    selects the compact event protocol.
+    """
+    if protocol is not None and protocol not in sse.PROTOCOLS:
+        raise HTTPException(status_code=400, detail=f"Unsupported SSE protocol {protocol}")
+    job = _start_council_job(conversation_id, request.content, _client_id(http_request))
+    return _job_event_stream(job.id, http_request, protocol)
+
+
+@app.post("/api/conversations/{conversation_id}/resume/stream")
+async def resume_turn_stream(conversation_id: str, http_request: Request, protocol: Optional[int] = None):
+    """
+    Resume the conversation's interrupted turn from its last checkpoint.
+
+    Stages (and Stage 1 answers) that finished before the interruption
+    are replayed from the checkpoint rather than queried again. Streams
+    like message/stream.
+    """
+    if protocol is not None and protocol not in sse.PROTOCOLS:
+        raise HTTPException(status_code=400, detail=f"Unsupported SSE protocol {protocol}")
+    job = _start_council_job(conversation_id, None, _client_id(http_request), resume=True)
+    return _job_event_stream(job.id, http_request, protocol)
+
+
+@app.delete("/api/conversations/{conversation_id}/pending_turn")
+async def discard_pending_turn(conversation_id: str):
+    """Give up on an interrupted turn, removing its unanswered user message."""
+    if jobs.get_active_job_id(conversation_id) is not None:
+        raise HTTPException(status_code=409, detail="A council run is in progress")
+    if not await asyncio.to_thread(storage.discard_pending_turn, conversation_id):
+        raise HTTPException(status_code=404, detail="No interrupted turn")
+    return {"status": "success"}
+
+
+@app.post("/api/conversations/{conversation_id}/messages/{message_id}/regenerate")
+async def regenerate_message(
+    conversation_id: str,
+    message_id: str,
+    request: RegenerateRequest,
+    http_request: Request
+):
+    """
+    Regenerate one Stage 1 member, the Stage 2 rankings (all, or one judge's)
+    or Stage 3 of a stored answer, recomputing only what depends on it.
+    Returns the updated message; earlier versions are in its 'revisions'.
+    """
+    job = _start_regeneration_job(conversation_id, message_id, request, _client_id(http_request))
+
+    async with aclosing(job.subscribe(is_disconnected=http_request.is_disconnected)) as events:
+        async for _, event in events:
+            event_type = event.get('type')
+            if event_type == 'error':
+                raise HTTPException(status_code=500, detail=event['message'])
+            elif event_type == 'cancelled':
+                raise HTTPException(status_code=409, detail=event['message'])
+
+    conversation = storage.get_conversation(conversation_id)
+    return next(m for m in conversation["messages"] if m.get("id") == message_id)
+
+
+@app.post("/api/conversations/{conversation_id}/messages/{message_id}/regenerate/stream")
+async def regenerate_message_stream(
+    conversation_id: str,
+    message_id: str,
+    request: RegenerateRequest,
+    http_request: Request,
+    protocol: Optional[int] = None
+):
+    """
+    Regenerate part of a stored answer (see regenerate), streaming the
+    recomputed stages like message/stream.
+    """
+    if protocol is not None and protocol not in sse.PROTOCOLS:
+        raise HTTPException(status_code=400, detail=f"Unsupported SSE protocol {protocol}")
+    job = _start_regeneration_job(conversation_id, message_id, request, _client_id(http_request))
+    return _job_event_stream(job.id, http_request, protocol)
+
+
+@app.get("/api/conversations/{conversation_id}/stream")
+async def stream_conversation_job(
+    conversation_id: str,
+    http_request: Request,
+    job_id: Optional[str] = None,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    protocol: Optional[int] = None
+):
+    """
+    Reattach to a council run.
+
+    Replays events after Last-Event-ID (header or query parameter), then
+    follows the live tail. Without job_id, attaches to the conversation's
+    active run. `protocol=2` selects the compact event protocol.
+    """
+    if protocol is not None and protocol not in sse.PROTOCOLS:
+        raise HTTPException(status_code=400, detail=f"Unsupported SSE protocol {protocol}")
+    if job_id is None:
+        job_id = jobs.get_active_job_id(conversation_id)
+        if job_id is None:
+            raise HTTPException(status_code=404, detail="No active council run")
+    else:
+        job = jobs.get_job(job_id)
+        if job is not None and job.conversation_id != conversation_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job is None and not jobs.job_log_exists(job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    if last_event_id is None:
+        last_event_id = int(last_event_id_header) if last_event_id_header and last_event_id_header.isdigit() else 0
+
+    return _job_event_stream(job_id, http_request, protocol, last_event_id)
+
+
+@app.post("/api/conversations/{conversation_id}/cancel")
+async def cancel_council_run(conversation_id: str, job_id: Optional[str] = None):
+    """Cancel the conversation's active council run (or a specific job)."""
+    job = jobs.get_job(job_id) if job_id else jobs.get_active_job(conversation_id)
+    if job is None:
+        # The run may belong to another API process; ask it to cancel
+        remote_job_id = jobs.get_active_job_id(conversation_id)
+        if remote_job_id is not None and job_id in (None, remote_job_id):
+            if coordination.get_coordinator().request_cancel(remote_job_id):
+                return {"id": remote_job_id, "conversation_id": conversation_id, "status": "cancelling"}
+    if job is None or job.conversation_id != conversation_id:
+        raise HTTPException(status_code=404, detail="No active council run")
+
+    job.cancel()
+    return job.to_dict()
+
+
+@app.get("/api/conversations/{conversation_id}/messages/{message_id}/timeline")
+async def get_message_timeline(conversation_id: str, message_id: str, format: str = "raw"):
+    """
+    Get the execution timeline recorded for an assistant message.
+
+    format=chrome returns Chrome trace JSON that can be loaded into
+    chrome://tracing or ui.perfetto.dev.
     """
-    # Check if conversation exists
     conversation = storage.get_conversation(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    # Check if this is the first message
-    is_first_message = len(conversation["messages"]) == 0
+    message = next((m for m in conversation["messages"] if m.get("id") == message_id), None)
+    if message is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    if "timeline" not in message:
+        raise HTTPException(status_code=404, detail="No timeline recorded for this message")
 
-    async def event_generator():
-        try:
-            # Add user message
-            storage.add_user_message(conversation_id, request.content)
-
-            # Start title generation in parallel (don't await yet)
-            title_task = None
-            # We need council config to know the chairman model
-            council_config = conversation.get("council_config")
-            
-            # Fallback for old conversations
-            if not council_config:
-                council_members = [{"model_id": m, "name": m} for m in COUNCIL_MODELS]
-                chairman = {"model_id": CHAIRMAN_MODEL, "name": CHAIRMAN_MODEL}
-            else:
-                council_members = council_config["members"]
-                chairman = council_config["chairman"]
-
-            if is_first_message:
-                title_task = asyncio.create_task(generate_conversation_title(request.content, model_id=chairman['model_id']))
-
-            # Run the council process
-            if conversation.get("conversation_type") == "agentic":
-                from .council import run_agentic_council
-                async for event in run_agentic_council(request.content, council_members, chairman, conversation_id):
-                    yield event
-            else:
-                # Stage 1: Collect responses
-                yield f"data: {json.dumps({'type': 'stage1_start'})}\n\n"
-                stage1_results = await stage1_collect_responses(request.content, council_members)
-                yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
-
-                # Stage 2: Collect rankings
-                yield f"data: {json.dumps({'type': 'stage2_start'})}\n\n"
-                stage2_results, label_to_model = await stage2_collect_rankings(request.content, stage1_results, council_members)
-                aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-                metadata = {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}
-                yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})}\n\n"
-
-                # Stage 3: Synthesize final answer
-                yield f"data: {json.dumps({'type': 'stage3_start'})}\n\n"
-                stage3_result = await stage3_synthesize_final(request.content, stage1_results, stage2_results, chairman)
-                yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
-
-                # Add assistant message with all stages
-                storage.add_assistant_message(
-                    conversation_id,
-                    stage1_results,
-                    stage2_results,
-                    stage3_result,
-                    metadata
-                )
-
-                # Send completion event
-                yield f"data: {json.dumps({'type': 'complete'})}\n\n"
-
-            # Wait for title generation if it was started
-            if title_task:
-                title = await title_task
-                storage.update_conversation_title(conversation_id, title)
-                yield f"data: {json.dumps({'type': 'title_complete', 'data': {'title': title}})}\n\n"
+    if format == "chrome":
+        return timeline.to_chrome_trace(message["timeline"])
+    return message["timeline"]
 
-        except Exception as e:
-            # Send error event
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
+@app.get("/api/scheduler")
+async def get_scheduler_stats(http_request: Request):
+    """Queue depth and wait times per model host and priority class."""
+    _require_admin(http_request)
+    return llm_client.get_scheduler_stats()
+
+
+@app.get("/api/admission")
+async def get_admission_stats(http_request: Request):
+    """Council run queue, rejection counts and each client's remaining budgets."""
+    _require_admin(http_request)
+    return admission.get_stats()
+
+
+@app.get("/api/usage")
+async def get_usage(http_request: Request):
+    """Model usage totals per client and per team, with the default conversation budgets."""
+    _require_admin(http_request)
+    return usage.get_totals()
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, http_request: Request):
+    """Get the status of a council run started by the same client."""
+    job = jobs.get_job(job_id)
+    if job is None or job.client != _client_id(http_request):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/api/selection/stats")
+async def get_selection_stats(http_request: Request):
+    """Per-member quality, failure and latency stats used for adaptive selection."""
+    _require_admin(http_request)
+    return selection.get_stats()
+
+
+@app.post("/api/selection/rebuild")
+async def rebuild_selection_stats(http_request: Request):
+    """Recompute member stats from all stored conversations."""
+    _require_admin(http_request)
+    return await asyncio.to_thread(selection.rebuild_stats)
+
+
+@app.post("/api/storage/compact")
+async def compact_storage(http_request: Request):
+    """Run a storage compaction pass now (tiering and retention)."""
+    _require_admin(http_request)
+    return await asyncio.to_thread(compaction.compact_storage)
+
+
+@app.get("/api/search")
+async def search_conversations(q: str, kind: Optional[str] = None, limit: int = 20, offset: int = 0):
+    """
+    Full-text search over conversation titles, user messages and council answers.
+
+    `kind` is a comma-separated subset of title, user, stage3, stage1.
+    Results are ranked by BM25 with highlighted snippets, `limit` per page.
+    """
+    kinds = kind.split(",") if kind else None
+    if kinds and any(k not in search.KINDS for k in kinds):
+        raise HTTPException(status_code=400, detail=f"kind must be among {', '.join(search.KINDS)}")
+    limit = max(1, min(limit, 100))
+    return await asyncio.to_thread(search.search, q, kinds, limit, max(offset, 0))
+
+
+@app.post("/api/search/rebuild")
+async def rebuild_search_index(http_request: Request):
+    """Reindex every stored conversation."""
+    _require_admin(http_request)
+    return await asyncio.to_thread(search.rebuild_index)
+
+
+@app.get("/api/export")
+async def export_conversations(
+    http_request: Request,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    conversation_type: Optional[str] = None,
+    pinned_only: bool = False
+):
+    """
+    Stream conversations as NDJSON, one per line.
+
+    `since` (inclusive) and `until` (exclusive) are ISO dates or datetimes
+    compared against each conversation's creation time.
+    """
+    _require_admin(http_request)
+    try:
+        filters = {
+            "since": archive.parse_date(since),
+            "until": archive.parse_date(until),
+            "conversation_type": conversation_type,
+            "pinned_only": pinned_only,
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+
+    return StreamingResponse(
+        archive.export_lines(**filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="conversations.ndjson"'},
     )
 
 
+@app.post("/api/import")
+async def import_conversations(http_request: Request, on_conflict: str = "skip"):
+    """
+    Import conversations from an NDJSON request body, as produced by /api/export.
+
+    `on_conflict` decides what happens to conversations whose ID already
+    exists: "skip", "overwrite", or "new_id" (import under a fresh ID).
+    """
+    _require_admin(http_request)
+    if on_conflict not in archive.CONFLICT_POLICIES:
+        raise HTTPException(status_code=400, detail=f"on_conflict must be one of {', '.join(archive.CONFLICT_POLICIES)}")
+    return await archive.import_stream(http_request.stream(), on_conflict)
+
+
+class CreateBatchRequest(BaseModel):
+    """Request to run the council over a set of questions."""
+    questions: Optional[List[Union[str, Dict[str, Any]]]] = None
+    questions_jsonl: Optional[str] = None  # Alternative to `questions`: raw JSONL text
+    council_members: Optional[List[str]] = None  # List of model IDs or Persona IDs
+    chairman_id: Optional[str] = None  # Model ID or Persona ID
+    member_budget: Optional[int] = None  # Members queried per question, picked adaptively
+    concurrency: Optional[int] = Field(None, ge=1)  # Capped at BATCH_MAX_CONCURRENCY
+
+
+@app.post("/api/batches")
+async def create_batch(request: CreateBatchRequest, http_request: Request):
+    """
+    Create a batch evaluation and start running it in the background.
+
+    Usage is charged to the requesting client; the batch's concurrency,
+    not the client's run limits, bounds how many questions run at once.
+    """
+    client = _client_id(http_request)
+    if request.questions_jsonl is not None:
+        lines = request.questions_jsonl.splitlines()
+    else:
+        lines = [json.dumps(q) for q in request.questions or []]
+
+    try:
+        questions = batch.parse_questions(lines)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+
+    council_config = personas.resolve_council_config(request.council_members, request.chairman_id)
+    if request.member_budget:
+        council_config["member_budget"] = request.member_budget
+    new_batch = batch.create_batch(questions, council_config, request.concurrency, client)
+    batch.start_batch(new_batch["id"])
+    return batch.get_batch(new_batch["id"])
+
+
+@app.get("/api/batches")
+async def list_batches():
+    """List all batches."""
+    return batch.list_batches()
+
+
+@app.get("/api/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """Get a batch's progress and, once finished, its ranking summary."""
+    found = batch.get_batch(batch_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return found
+
+
+@app.get("/api/batches/{batch_id}/results")
+async def get_batch_results(batch_id: str):
+    """Stream a batch's results as JSONL, including completed questions of a running batch."""
+    if batch.get_batch(batch_id) is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    def lines():
+        for result in batch.iter_results(batch_id):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/api/batches/{batch_id}/resume")
+async def resume_batch(batch_id: str):
+    """Resume an interrupted, cancelled or failed batch from its checkpoint."""
+    found = batch.get_batch(batch_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if not batch.start_batch(batch_id):
+        raise HTTPException(status_code=409, detail="Batch is already running")
+    return batch.get_batch(batch_id)
+
+
+@app.post("/api/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str):
+    """Cancel a running batch; finished questions are kept for resuming."""
+    if not batch.cancel_batch(batch_id):
+        raise HTTPException(status_code=409, detail="Batch is not running")
+    return {"status": "cancelling"}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8001, reload=True)
@@ -0,0 +1,231 @@
+"""Rolling conversation memory for multi-turn council context."""
+
+import asyncio
+from typing import List, Dict, Any, Optional
+from . import personas, storage, usage
+from .llm_client import query_model, PRIORITY_BACKGROUND
+from .metrics import STAGE_DURATION, timed
+from .config import MEMORY_RECENT_TURNS, MEMORY_TURN_MAX_CHARS, MEMORY_SUMMARY_MAX_CHARS
+
+# Maximum number of turns folded into the summary with a single chairman call.
+# Only relevant when catching up on older conversations that predate memory.
+SUMMARY_BATCH_TURNS = 4
+
+# Summary updates running in the background after their turn, per conversation
+_pending_updates: Dict[str, asyncio.Task] = {}
+
+
+def _clip(text: str, limit: int) -> str:
+    """Clip text to at most `limit` characters."""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 3] + "..."
+
+
+def extract_turns(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Pair each completed assistant message with the user message that prompted it.
+
+    Args:
+        messages: Stored conversation messages
+
+    Returns:
+        List of dicts with 'question' and 'answer' keys, oldest first
+    """
+    turns = []
+    pending_question = None
+    for msg in messages:
+        if msg.get("role") == "user":
+            pending_question = msg.get("content", "")
+        elif msg.get("role") == "assistant" and pending_question is not None:
+            stage3 = msg.get("stage3") or {}
+            answer = stage3.get("response")
+            if answer:
+                turns.append({"question": pending_question, "answer": answer})
+            pending_question = None
+    return turns
+
+
+def build_context(conversation: Dict[str, Any], before: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Build the bounded context for the next turn of a conversation.
+
+    The context is the cached rolling summary (if any) followed by the last
+    MEMORY_RECENT_TURNS completed turns, so its size does not grow with the
+    length of the thread.
+
+    Args:
+        conversation: Conversation dict as returned by storage
+        before: Build the context of an earlier turn instead: only messages
+            before this index count, and the summary is left out if it
+            already covers later turns
+
+    Returns:
+        List of message dicts to place before the new user message
+    """
+    memory = conversation.get("memory") or {}
+    summary = memory.get("summary")
+    turns = extract_turns(conversation.get("messages", [])[:before])
+    recent = turns[-MEMORY_RECENT_TURNS:] if MEMORY_RECENT_TURNS > 0 else []
+    if before is not None and memory.get("turns_summarized", 0) > len(turns) - len(recent):
+        summary = None
+
+    context = []
+    if summary:
+        context.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{summary}"
+        })
+    for turn in recent:
+        context.append({"role": "user", "content": _clip(turn["question"], MEMORY_TURN_MAX_CHARS)})
+        context.append({"role": "assistant", "content": _clip(turn["answer"], MEMORY_TURN_MAX_CHARS)})
+    return context
+
+
+def format_context(context: Optional[List[Dict[str, str]]]) -> str:
+    """Render context messages as plain text for the ranking and chairman prompts."""
+    if not context:
+        return ""
+
+    lines = []
+    for msg in context:
+        if msg["role"] == "system":
+            lines.append(msg["content"])
+        elif msg["role"] == "user":
+            lines.append(f"User: {msg['content']}")
+        else:
+            lines.append(f"Council answer: {msg['content']}")
+    return "\n\n".join(lines)
+
+
+@timed(STAGE_DURATION, stage="memory_summary")
+async def summarize_turns(
+    previous_summary: str,
+    turns: List[Dict[str, str]],
+    chairman_member: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Fold turns into the rolling summary using the chairman model.
+
+    Args:
+        previous_summary: The current summary (may be empty)
+        turns: Turns that have just fallen out of the verbatim window
+        chairman_member: The chairman persona/model configuration
+
+    Returns:
+        The new summary, or None if the chairman failed
+    """
+    turns_text = "\n\n".join([
+        f"User: {_clip(turn['question'], MEMORY_TURN_MAX_CHARS)}\n"
+        f"Council answer: {_clip(turn['answer'], MEMORY_TURN_MAX_CHARS)}"
+        for turn in turns
+    ])
+
+    prompt = f"""You are the Chairman of Quorum, maintaining a running summary of a conversation.
+
+Current summary:
+{previous_summary or "(empty)"}
+
+New exchanges to incorporate:
+{turns_text}
+
+Rewrite the summary so it incorporates the new exchanges. Keep the facts, conclusions and open questions a follow-up question might refer to, and drop everything else.
+The summary must stay under {MEMORY_SUMMARY_MAX_CHARS // 6} words. Respond with the summary only."""
+
+    messages = [{"role": "user", "content": prompt}]
+    response = await query_model(
+        chairman_member['model_id'],
+        messages,
+        system_prompt=chairman_member.get('system_prompt'),
+        priority=PRIORITY_BACKGROUND,
+        inference=personas.inference_profile(chairman_member)
+    )
+
+    if response is None or not response.get('content'):
+        return None
+
+    return _clip(response['content'].strip(), MEMORY_SUMMARY_MAX_CHARS)
+
+
+async def update_memory(conversation_id: str, chairman_member: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bring the cached summary up to date after an assistant message was stored.
+
+    Only turns that have left the verbatim window are summarized, so in the
+    steady state this is a single chairman call per turn, and none at all
+    while the conversation is shorter than the window.
+
+    Args:
+        conversation_id: Conversation identifier
+        chairman_member: The chairman persona/model configuration
+
+    Returns:
+        The (possibly unchanged) memory dict
+    """
+    conversation = storage.get_conversation(conversation_id)
+    if conversation is None:
+        raise ValueError(f"Conversation {conversation_id} not found")
+
+    memory = conversation.get("memory") or {"summary": "", "turns_summarized": 0}
+    turns = extract_turns(conversation.get("messages", []))
+    target = max(0, len(turns) - MEMORY_RECENT_TURNS)
+
+    while memory["turns_summarized"] < target:
+        start = memory["turns_summarized"]
+        end = min(target, start + SUMMARY_BATCH_TURNS)
+        summary = await summarize_turns(memory["summary"], turns[start:end], chairman_member)
+        if summary is None:
+            # Keep the old summary; the next turn will retry from here
+            break
+        memory = {"summary": summary, "turns_summarized": end}
+        await asyncio.to_thread(storage.update_conversation_memory, conversation_id, memory)
+
+    return memory
+
+
+def schedule_update(conversation_id: str, chairman_member: Dict[str, Any]) -> asyncio.Task:
+    """
+    Run update_memory in the background, so a finished turn does not wait on it.
+
+    Updates of one conversation run one after another, and the chairman's
+    usage is added to the conversation's totals. The next turn of the
+    conversation waits for it before building its context (see wait_for_update).
+    """
+    previous = _pending_updates.get(conversation_id)
+
+    async def run():
+        if previous is not None:
+            await asyncio.wait([previous])
+        with usage.track() as spent:
+            try:
+                await update_memory(conversation_id, chairman_member)
+            except Exception as e:
+                print(f"Error updating memory of conversation {conversation_id}: {e}")
+        if spent["calls"]:
+            try:
+                await asyncio.to_thread(storage.add_conversation_usage, conversation_id, spent)
+            except ValueError:
+                pass  # Deleted meanwhile
+
+    def forget(task: asyncio.Task):
+        if _pending_updates.get(conversation_id) is task:
+            del _pending_updates[conversation_id]
+
+    task = asyncio.create_task(run())
+    _pending_updates[conversation_id] = task
+    task.add_done_callback(forget)
+    return task
+
+
+async def wait_for_update(conversation_id: str) -> bool:
+    """
+    Wait for a background summary update of a conversation to finish.
+
+    Returns:
+        Whether one was running (the stored memory may have changed then)
+    """
+    task = _pending_updates.get(conversation_id)
+    if task is None:
+        return False
+    await asyncio.wait([task])
+    return True
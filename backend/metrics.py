@@ -0,0 +1,228 @@
+"""In-process metrics exposed in the Prometheus text format at /metrics."""
+
+import functools
+import inspect
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets in seconds; model calls range from sub-second
+# OpenRouter answers to multi-minute local generations
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set."""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., count, sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += 1
+        state[-1] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, state in self._values.items():
+            for bound, count in zip(self.buckets, state):
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing the wall-clock duration of a sync or async function."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start, **labels)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+
+def render_latest() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+MODEL_REQUEST_DURATION = Histogram(
+    "quorum_model_request_duration_seconds",
+    "Latency of model calls, excluding scheduler queueing.",
+    ["provider", "model", "outcome"],
+)
+MODEL_QUEUE_WAIT = Histogram(
+    "quorum_model_queue_wait_seconds",
+    "Time model calls spent waiting for a scheduler slot.",
+    ["host", "priority"],
+)
+MODEL_ERRORS = Counter(
+    "quorum_model_errors_total",
+    "Failed model calls by error class.",
+    ["provider", "model", "error"],
+)
+MODEL_TOKENS = Counter(
+    "quorum_model_tokens_total",
+    "Tokens processed by model calls.",
+    ["provider", "model", "kind"],
+)
+MODEL_COST = Counter(
+    "quorum_model_cost_usd_total",
+    "Spend on model calls (reported by OpenRouter or estimated from catalog pricing).",
+    ["provider", "model"],
+)
+MODEL_COMPUTE_SECONDS = Counter(
+    "quorum_model_compute_seconds_total",
+    "Model load and evaluation time reported by Ollama.",
+    ["provider", "model"],
+)
+MODEL_TOKENS_PER_SECOND = Histogram(
+    "quorum_model_tokens_per_second",
+    "Generation speed of model calls.",
+    ["provider", "model"],
+    buckets=TOKENS_PER_SECOND_BUCKETS,
+)
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "quorum_scheduler_queue_depth",
+    "Model calls waiting for a scheduler slot.",
+    ["host"],
+)
+SCHEDULER_ACTIVE = Gauge(
+    "quorum_scheduler_active_calls",
+    "Model calls currently holding a scheduler slot.",
+    ["host"],
+)
+STAGE_DURATION = Histogram(
+    "quorum_stage_duration_seconds",
+    "Time spent in each council stage.",
+    ["stage"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "quorum_admission_rejections_total",
+    "Requests refused by admission control.",
+    ["reason"],
+)
+ACTIVE_SSE_STREAMS = Gauge(
+    "quorum_active_sse_streams",
+    "Number of open SSE streams.",
+)
+STORAGE_DURATION = Histogram(
+    "quorum_storage_operation_duration_seconds",
+    "Latency of conversation storage operations.",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+
+
+def record_tokens(provider: str, model: str, prompt_tokens: Optional[int],
+                  completion_tokens: Optional[int], generation_seconds: Optional[float]):
+    """Record token counts and, when the generation time is known, tokens per second."""
+    if prompt_tokens:
+        MODEL_TOKENS.inc(prompt_tokens, provider=provider, model=model, kind="prompt")
+    if completion_tokens:
+        MODEL_TOKENS.inc(completion_tokens, provider=provider, model=model, kind="completion")
+        if generation_seconds and generation_seconds > 0:
+            MODEL_TOKENS_PER_SECOND.observe(completion_tokens / generation_seconds, provider=provider, model=model)
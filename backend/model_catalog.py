@@ -0,0 +1,222 @@
+"""Cached catalog of available models, refreshed in the background."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .config import (
+    MODEL_CATALOG_REFRESH_SECONDS,
+    MODEL_CATALOG_TIMEOUT,
+    MODEL_CATALOG_OPENROUTER,
+    OPENROUTER_MODELS_URL,
+)
+
+# Served when the live OpenRouter list is disabled or unreachable
+DEFAULT_OPENROUTER_MODELS = [
+    {"id": "openai/gpt-5.1", "name": "GPT-5.1", "provider": "OpenAI"},
+    {"id": "google/gemini-3-pro-preview", "name": "Gemini 3 Pro", "provider": "Google"},
+    {"id": "anthropic/claude-sonnet-4.5", "name": "Claude Sonnet 4.5", "provider": "Anthropic"},
+    {"id": "x-ai/grok-4", "name": "Grok 4", "provider": "X.AI"},
+]
+
+# Display names for OpenRouter model ID prefixes
+_PROVIDER_NAMES = {
+    "openai": "OpenAI",
+    "google": "Google",
+    "anthropic": "Anthropic",
+    "x-ai": "X.AI",
+    "meta-llama": "Meta",
+    "mistralai": "Mistral",
+    "deepseek": "DeepSeek",
+    "qwen": "Qwen",
+}
+
+
+def _empty_source() -> Dict[str, Any]:
+    return {"status": "unknown", "refreshed_at": None, "error": None, "models": [], "url": None}
+
+
+_sources: Dict[str, Dict[str, Any]] = {
+    "ollama": _empty_source(),
+    "openrouter": {**_empty_source(), "models": list(DEFAULT_OPENROUTER_MODELS)},
+}
+
+# Context lengths from /api/show, keyed by model digest so each model is
+# only inspected once
+_context_lengths: Dict[str, Optional[int]] = {}
+
+_refresh_lock: Optional[asyncio.Lock] = None
+_loop_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _ollama_url(path: str) -> str:
+    from .settings import get_settings
+
+    return get_settings().get("ollama_base_url").replace("/api/chat", path)
+
+
+async def _ollama_context_length(client: httpx.AsyncClient, name: str, digest: str) -> Optional[int]:
+    if digest in _context_lengths:
+        return _context_lengths[digest]
+    context_length = None
+    try:
+        response = await client.post(_ollama_url("/api/show"), json={"model": name})
+        if response.status_code == 200:
+            model_info = response.json().get("model_info") or {}
+            context_length = next(
+                (v for k, v in model_info.items() if k.endswith(".context_length")), None
+            )
+    except httpx.HTTPError:
+        # Leave uncached so the next refresh tries again
+        return None
+    _context_lengths[digest] = context_length
+    return context_length
+
+
+async def refresh_ollama():
+    """Reload installed and loaded models (with size, quantization and context length) from Ollama."""
+    source = _sources["ollama"]
+    tags_url = _ollama_url("/api/tags")
+    try:
+        async with httpx.AsyncClient(timeout=MODEL_CATALOG_TIMEOUT) as client:
+            tags = await client.get(tags_url)
+            tags.raise_for_status()
+            try:
+                running = await client.get(_ollama_url("/api/ps"))
+                loaded = {m["name"]: m for m in running.json().get("models", [])} if running.status_code == 200 else {}
+            except httpx.HTTPError:
+                loaded = {}
+
+            models = []
+            for m in tags.json().get("models", []):
+                details = m.get("details") or {}
+                running_model = loaded.get(m["name"])
+                models.append({
+                    "id": f"ollama/{m['name']}",
+                    "name": m["name"],
+                    "provider": "Ollama",
+                    "size": m.get("size"),
+                    "parameter_size": details.get("parameter_size"),
+                    "quantization": details.get("quantization_level"),
+                    "family": details.get("family"),
+                    "context_length": await _ollama_context_length(client, m["name"], m.get("digest", m["name"])),
+                    "loaded": running_model is not None,
+                    "vram": running_model.get("size_vram") if running_model else None,
+                })
+    except Exception as e:
+        # Keep the last known list of the same server; its models are
+        # probably still installed
+        if source["url"] != tags_url:
+            source.update(models=[], url=tags_url)
+        source.update(status="unreachable", error=str(e) or type(e).__name__, refreshed_at=time.time())
+        return
+
+    source.update(status="ok", error=None, refreshed_at=time.time(), models=models, url=tags_url)
+
+
+def _openrouter_provider(model_id: str) -> str:
+    prefix = model_id.split("/", 1)[0]
+    return _PROVIDER_NAMES.get(prefix, prefix.replace("-", " ").title())
+
+
+async def refresh_openrouter():
+    """Reload the OpenRouter model list (with context length and pricing)."""
+    source = _sources["openrouter"]
+    try:
+        async with httpx.AsyncClient(timeout=MODEL_CATALOG_TIMEOUT) as client:
+            response = await client.get(OPENROUTER_MODELS_URL)
+            response.raise_for_status()
+            data = response.json().get("data", [])
+    except Exception as e:
+        source.update(status="unreachable", error=str(e) or type(e).__name__, refreshed_at=time.time())
+        return
+
+    models = [
+        {
+            "id": m["id"],
+            "name": m.get("name", m["id"]),
+            "provider": _openrouter_provider(m["id"]),
+            "context_length": m.get("context_length"),
+            "pricing": m.get("pricing"),
+        }
+        for m in data
+        if "id" in m
+    ]
+    source.update(status="ok", error=None, refreshed_at=time.time(), models=models or list(DEFAULT_OPENROUTER_MODELS))
+
+
+async def refresh():
+    """Refresh every catalog source concurrently; concurrent callers share one refresh."""
+    global _refresh_lock
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    if _refresh_lock.locked():
+        # Someone is already refreshing; wait for their result
+        async with _refresh_lock:
+            return
+    async with _refresh_lock:
+        refreshes = [refresh_ollama()]
+        if MODEL_CATALOG_OPENROUTER:
+            refreshes.append(refresh_openrouter())
+        await asyncio.gather(*refreshes)
+
+
+async def ensure_loaded():
+    """Wait for the first refresh if none has happened yet (only right after startup)."""
+    if _sources["ollama"]["refreshed_at"] is None:
+        await refresh()
+
+
+def get_models() -> List[Dict[str, Any]]:
+    """All cached models, OpenRouter first; never waits on a provider."""
+    return _sources["openrouter"]["models"] + _sources["ollama"]["models"]
+
+
+def get_context_length(model_id: str) -> Optional[int]:
+    """Context length of a cached model (e.g. "ollama/llama3"), if known."""
+    return next((m.get("context_length") for m in get_models() if m["id"] == model_id), None)
+
+
+def get_status() -> Dict[str, Any]:
+    """Per-source refresh status and model counts."""
+    return {
+        name: {
+            "status": source["status"],
+            "refreshed_at": source["refreshed_at"],
+            "error": source["error"],
+            "models": len(source["models"]),
+        }
+        for name, source in _sources.items()
+    }
+
+
+def request_refresh():
+    """Ask the background task to refresh now (e.g. after the Ollama URL changed)."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def run_refresh_loop():
+    """Refresh the catalog every MODEL_CATALOG_REFRESH_SECONDS, or sooner when asked."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"Error refreshing model catalog: {e}")
+        try:
+            await asyncio.wait_for(_wakeup.wait(), MODEL_CATALOG_REFRESH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def start_refresh_loop():
+    """Start the background refresh task (no-op if already running)."""
+    global _loop_task
+    if _loop_task is None or _loop_task.done():
+        _loop_task = asyncio.create_task(run_refresh_loop())
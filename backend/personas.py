@@ -3,17 +3,29 @@
 import json
 import os
 import uuid
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Union
 from pydantic import BaseModel
+from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
 
 PERSONAS_FILE = "data/personas.json"
 
+class InferenceProfile(BaseModel):
+    """Generation settings for a persona's model calls; unset fields use the provider's defaults."""
+    num_ctx: Optional[int] = None  # Ollama context window; unset sizes it to each prompt
+    num_predict: Optional[int] = None  # Ollama reply length limit (tokens)
+    temperature: Optional[float] = None
+    keep_alive: Optional[Union[str, int]] = None  # How long Ollama keeps the model loaded, e.g. "30m"
+    num_thread: Optional[int] = None  # Ollama CPU threads
+    max_tokens: Optional[int] = None  # OpenRouter reply length limit (tokens)
+
+
 class Persona(BaseModel):
     id: str
     name: str
     model_id: str  # The underlying model (e.g., "ollama/gpt-oss:20b")
     system_prompt: str
     avatar_color: str = "#3b82f6"  # Default blue
+    inference: Dict[str, Any] = {}  # Set fields of an InferenceProfile
 
 
 def _ensure_data_dir():
@@ -40,7 +52,18 @@ def get_persona(persona_id: str) -> Optional[Dict]:
     return None
 
 
-def create_persona(name: str, model_id: str, system_prompt: str, avatar_color: str = "#3b82f6") -> Dict:
+def _save_personas(personas: List[Dict]):
+    with open(PERSONAS_FILE, "w") as f:
+        json.dump(personas, f, indent=2)
+
+
+def create_persona(
+    name: str,
+    model_id: str,
+    system_prompt: str,
+    avatar_color: str = "#3b82f6",
+    inference: Optional[Dict[str, Any]] = None
+) -> Dict:
     personas = list_personas()
     
     new_persona = {
@@ -48,24 +71,103 @@ def create_persona(name: str, model_id: str, system_prompt: str, avatar_color: s
         "name": name,
         "model_id": model_id,
         "system_prompt": system_prompt,
-        "avatar_color": avatar_color
+        "avatar_color": avatar_color,
+        "inference": inference or {}
     }
     
     personas.append(new_persona)
-    
-    with open(PERSONAS_FILE, "w") as f:
-        json.dump(personas, f, indent=2)
+    _save_personas(personas)
         
     return new_persona
 
 
+def update_persona(persona_id: str, changes: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Change fields of a persona.
+
+    Conversations pick up a changed inference profile on their next model
+    call; other fields were copied into their council when they started.
+
+    Args:
+        persona_id: Persona identifier
+        changes: Fields to replace ('inference' replaces the whole profile)
+
+    Returns:
+        The updated persona, or None if it does not exist
+    """
+    personas = list_personas()
+    for persona in personas:
+        if persona["id"] == persona_id:
+            persona.update(changes)
+            _save_personas(personas)
+            return persona
+    return None
+
+
 def delete_persona(persona_id: str) -> bool:
     personas = list_personas()
     initial_len = len(personas)
     personas = [p for p in personas if p["id"] != persona_id]
     
     if len(personas) < initial_len:
-        with open(PERSONAS_FILE, "w") as f:
-            json.dump(personas, f, indent=2)
+        _save_personas(personas)
         return True
     return False
+
+
+def resolve_member(member_id: str) -> Dict:
+    """
+    Resolve a persona id or raw model id to a council member.
+
+    Args:
+        member_id: Persona id, or a model id such as "ollama/llama3"
+
+    Returns:
+        Member dict with model_id, name, system_prompt, type and id
+    """
+    persona = get_persona(member_id)
+    if persona:
+        return {
+            "model_id": persona['model_id'],
+            "name": persona['name'],
+            "system_prompt": persona['system_prompt'],
+            "inference": persona.get('inference') or {},
+            "type": "persona",
+            "id": persona['id']
+        }
+    # Assume it's a raw model ID
+    return {
+        "model_id": member_id,
+        "name": member_id,
+        "system_prompt": None,
+        "type": "model",
+        "id": member_id
+    }
+
+
+def inference_profile(member: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Current inference profile of a council member.
+
+    A persona's profile is read from the persona itself, so edits apply to
+    conversations already using it; the copy in the member dict is the
+    fallback for deleted personas.
+    """
+    if member.get("type") == "persona":
+        persona = get_persona(member["id"])
+        if persona is not None:
+            return persona.get("inference") or {}
+    return member.get("inference") or {}
+
+
+def resolve_council_config(member_ids: Optional[List[str]] = None, chairman_id: Optional[str] = None) -> Dict:
+    """
+    Build a council configuration, falling back to the defaults from config.
+
+    Returns:
+        Dict with "members" (list of member dicts) and "chairman"
+    """
+    return {
+        "members": [resolve_member(m) for m in (member_ids or COUNCIL_MODELS)],
+        "chairman": resolve_member(chairman_id or CHAIRMAN_MODEL)
+    }
@@ -0,0 +1,344 @@
+"""Full-text search over stored conversations (SQLite FTS5)."""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from .config import SEARCH_INDEX_FILE, SEARCH_INDEX_STAGE1
+
+# Kinds of indexed documents: conversation titles, user messages, Stage 3
+# answers and (optionally) individual Stage 1 answers
+KINDS = ("title", "user", "stage3", "stage1")
+
+# Highlight markers around matched terms in snippets
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+# Text lives in the FTS5 table; what each row belongs to lives in `entries`
+# (same rowid), which is indexed by conversation so updates and deletes do
+# not scan the full-text table
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(body, tokenize = 'porter unicode61');
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    conversation_id TEXT NOT NULL,
+    message_id TEXT,
+    kind TEXT NOT NULL,
+    member TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_by_message ON entries (conversation_id, message_id);
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    created_at TEXT,
+    conversation_type TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_connection: Optional[sqlite3.Connection] = None
+# Storage writes come from request handlers and worker threads (imports,
+# compaction), so all access to the shared connection is serialized
+_lock = threading.RLock()
+
+# Rebuilds run one at a time, in the background, into a separate file that
+# replaces the index when done; meanwhile the live index keeps serving (and
+# taking writes), and conversations written are reindexed after the swap
+_build_lock = threading.Lock()
+_build_thread: Optional[threading.Thread] = None
+_building = False
+_dirty: Set[str] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the index, starting a background build if it was never built."""
+    global _connection
+    with _lock:
+        if _connection is None:
+            os.makedirs(os.path.dirname(SEARCH_INDEX_FILE), exist_ok=True)
+            connection = sqlite3.connect(SEARCH_INDEX_FILE, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            _connection = connection
+            if connection.execute("SELECT 1 FROM meta WHERE key = 'built_at'").fetchone() is None:
+                start_index_build()
+        return _connection
+
+
+def start_index_build():
+    """Rebuild the index in a background thread, unless a build is already running."""
+    global _build_thread, _building
+    with _lock:
+        if _build_thread is None or not _build_thread.is_alive():
+            _building = True
+            _build_thread = threading.Thread(target=rebuild_index, name="search-index-build", daemon=True)
+            _build_thread.start()
+
+
+def is_building() -> bool:
+    """Whether a rebuild is in progress (results may be incomplete until it is done)."""
+    return _building
+
+
+def _mark_dirty(conversation_id: str):
+    if _building:
+        _dirty.add(conversation_id)
+
+
+def _message_documents(message: Dict[str, Any]) -> List[tuple]:
+    """(body, kind, member) rows for one message."""
+    if message.get("role") == "user":
+        return [(message.get("content", ""), "user", None)]
+
+    documents = []
+    stage3 = message.get("stage3") or {}
+    if stage3.get("response"):
+        documents.append((stage3["response"], "stage3", stage3.get("model")))
+    if SEARCH_INDEX_STAGE1:
+        for result in message.get("stage1") or []:
+            if result.get("response"):
+                documents.append((result["response"], "stage1", result.get("persona_name") or result.get("model")))
+    return documents
+
+
+def _add_document(connection: sqlite3.Connection, body: str, conversation_id: str,
+                  message_id: Optional[str], kind: str, member: Optional[str]):
+    cursor = connection.execute(
+        "INSERT INTO entries (conversation_id, message_id, kind, member) VALUES (?, ?, ?, ?)",
+        (conversation_id, message_id, kind, member)
+    )
+    connection.execute("INSERT INTO documents (rowid, body) VALUES (?, ?)", (cursor.lastrowid, body))
+
+
+def _delete_documents(connection: sqlite3.Connection, where: str, params: tuple):
+    ids = [(row[0],) for row in connection.execute(f"SELECT id FROM entries WHERE {where}", params)]
+    connection.executemany("DELETE FROM documents WHERE rowid = ?", ids)
+    connection.executemany("DELETE FROM entries WHERE id = ?", ids)
+
+
+def _insert_message(connection: sqlite3.Connection, conversation_id: str, message: Dict[str, Any]):
+    _delete_documents(connection, "conversation_id = ? AND message_id = ?", (conversation_id, message.get("id")))
+    for body, kind, member in _message_documents(message):
+        _add_document(connection, body, conversation_id, message.get("id"), kind, member)
+
+
+def _upsert_conversation(connection: sqlite3.Connection, conversation: Dict[str, Any]):
+    title = conversation.get("title", "New Conversation")
+    connection.execute(
+        "INSERT OR REPLACE INTO conversations (id, title, created_at, conversation_type) VALUES (?, ?, ?, ?)",
+        (conversation["id"], title, conversation.get("created_at"), conversation.get("conversation_type", "standard"))
+    )
+    _delete_documents(connection, "conversation_id = ? AND message_id IS NULL", (conversation["id"],))
+    _add_document(connection, title, conversation["id"], None, "title", None)
+
+
+def _index_conversation(connection: sqlite3.Connection, conversation: Dict[str, Any]):
+    _delete_documents(connection, "conversation_id = ?", (conversation["id"],))
+    _upsert_conversation(connection, conversation)
+    for message in conversation.get("messages", []):
+        _insert_message(connection, conversation["id"], message)
+
+
+def index_conversation(conversation: Dict[str, Any]):
+    """(Re)index a whole conversation, e.g. after an import."""
+    with _lock:
+        _mark_dirty(conversation["id"])
+        connection = _connect()
+        with connection:
+            _index_conversation(connection, conversation)
+
+
+def index_message(conversation: Dict[str, Any], message: Dict[str, Any]):
+    """
+    Index one new or changed message.
+
+    Args:
+        conversation: The conversation the message belongs to
+        message: The stored message dict
+    """
+    with _lock:
+        _mark_dirty(conversation["id"])
+        connection = _connect()
+        with connection:
+            _upsert_conversation(connection, conversation)
+            _insert_message(connection, conversation["id"], message)
+
+
+def update_conversation(conversation: Dict[str, Any]):
+    """Update a conversation's title and listing details in the index."""
+    with _lock:
+        _mark_dirty(conversation["id"])
+        connection = _connect()
+        with connection:
+            _upsert_conversation(connection, conversation)
+
+
+def remove_conversation(conversation_id: str):
+    """Drop a deleted conversation from the index."""
+    with _lock:
+        _mark_dirty(conversation_id)
+        connection = _connect()
+        with connection:
+            _delete_documents(connection, "conversation_id = ?", (conversation_id,))
+            connection.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+
+def rebuild_index() -> Dict[str, int]:
+    """
+    Reindex every stored conversation from scratch.
+
+    Reads every conversation, so it runs in a worker thread (see
+    start_index_build); the live index is only locked for the final swap.
+    """
+    from . import storage
+
+    global _connection, _building
+    with _build_lock:
+        with _lock:
+            _building = True
+            _dirty.clear()
+        try:
+            tmp_path = SEARCH_INDEX_FILE + ".rebuild"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.makedirs(os.path.dirname(SEARCH_INDEX_FILE), exist_ok=True)
+            build = sqlite3.connect(tmp_path)
+            counts = {"conversations": 0}
+            try:
+                build.executescript(_SCHEMA)
+                with build:
+                    for conversation in storage.iter_conversations():
+                        _index_conversation(build, conversation)
+                        counts["conversations"] += 1
+                    build.execute("INSERT INTO documents(documents) VALUES ('optimize')")
+                    build.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)",
+                        (datetime.utcnow().isoformat(),)
+                    )
+                counts["documents"] = build.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            finally:
+                build.close()
+
+            with _lock:
+                if _connection is not None:
+                    _connection.close()
+                    _connection = None
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(SEARCH_INDEX_FILE + suffix):
+                        os.remove(SEARCH_INDEX_FILE + suffix)
+                os.replace(tmp_path, SEARCH_INDEX_FILE)
+                _building = False
+                dirty = list(_dirty)
+                _dirty.clear()
+        finally:
+            _building = False
+
+    # Conversations written during the build may be missing or stale in it.
+    # Storage is read outside _lock, as storage writes index under their own lock
+    for conversation_id in dirty:
+        conversation = storage.get_conversation(conversation_id)
+        if conversation is None:
+            remove_conversation(conversation_id)
+        else:
+            index_conversation(conversation)
+    return counts
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query.
+
+    Every word must match (the last one as a prefix, for search-as-you-type);
+    words are quoted so FTS5 operators and punctuation in the input are
+    taken literally.
+
+    Returns:
+        The MATCH expression, or None if the text has no words
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(
+    query: str,
+    kinds: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """
+    Search indexed conversations, best matches first (BM25).
+
+    Args:
+        query: Free text
+        kinds: Restrict to these document kinds (see KINDS)
+        limit: Page size
+        offset: Results to skip, for pagination
+
+    Returns:
+        Dict with the total match count and one page of results, each with
+        the conversation, message, kind, member and a highlighted snippet;
+        'indexing' is set while a rebuild is running
+    """
+    match = build_match_query(query)
+    if match is None:
+        return {"query": query, "total": 0, "results": [], "indexing": is_building()}
+
+    where = "documents MATCH ?"
+    params: List[Any] = [match]
+    if kinds:
+        where += f" AND entries.kind IN ({', '.join('?' for _ in kinds)})"
+        params.extend(kinds)
+
+    with _lock:
+        connection = _connect()
+        total = connection.execute(
+            f"SELECT COUNT(*) FROM documents JOIN entries ON entries.id = documents.rowid WHERE {where}",
+            params
+        ).fetchone()[0]
+        rows = connection.execute(
+            f"""
+            SELECT conversation_id, message_id, kind, member,
+                   snippet(documents, 0, ?, ?, '…', ?), bm25(documents),
+                   title, created_at, conversation_type
+            FROM documents
+            JOIN entries ON entries.id = documents.rowid
+            LEFT JOIN conversations ON conversations.id = entries.conversation_id
+            WHERE {where}
+            ORDER BY bm25(documents)
+            LIMIT ? OFFSET ?
+            """,
+            [SNIPPET_START, SNIPPET_END, SNIPPET_TOKENS, *params, limit, offset]
+        ).fetchall()
+
+    return {
+        "query": query,
+        "total": total,
+        "indexing": is_building(),
+        "results": [
+            {
+                "conversation_id": conversation_id,
+                "message_id": message_id,
+                "kind": kind,
+                "member": member,
+                "snippet": snippet,
+                "score": round(-score, 4),
+                "conversation_title": title,
+                "created_at": created_at,
+                "conversation_type": conversation_type,
+            }
+            for conversation_id, message_id, kind, member, snippet, score, title, created_at, conversation_type in rows
+        ],
+    }
@@ -0,0 +1,265 @@
+"""Adaptive council member selection from historical performance."""
+
+import asyncio
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import SELECTION_STATS_FILE, SELECTION_EXPLORATION, SELECTION_LATENCY_WEIGHT
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "turns": 0,          # Turns the member was queried in
+        "failures": 0,       # Turns its Stage 1 answer failed
+        "reward_sum": 0.0,   # Sum of per-turn rewards (see _rank_reward)
+        "rewards": 0,        # Turns that produced a reward
+        "latency_sum": 0.0,  # Sum of Stage 1 latencies in seconds
+        "latencies": 0,
+    }
+
+
+_stats: Optional[Dict[str, Dict[str, Any]]] = None
+
+# Serializes writes of the stats file (rebuilds run in a worker thread)
+_save_lock = threading.Lock()
+# Guards _stats against a rebuild swapping it out mid-update or mid-save
+_stats_lock = threading.Lock()
+
+# One list per rebuild in progress, of the turns recorded since it started;
+# they are replayed onto its result so the swap does not lose them
+_rebuild_buffers: List[List[Tuple[Any, ...]]] = []
+
+_build_task: Optional[asyncio.Task] = None
+
+
+def _save_stats():
+    with _save_lock:
+        with _stats_lock:
+            data = json.dumps(_stats, indent=2)
+        os.makedirs(os.path.dirname(SELECTION_STATS_FILE), exist_ok=True)
+        tmp_path = SELECTION_STATS_FILE + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, SELECTION_STATS_FILE)
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-member performance stats, keyed by member name.
+
+    Loaded from SELECTION_STATS_FILE. Without one, stats start empty until
+    the startup rebuild (see start_stats_build) has mined stored
+    conversations.
+    """
+    global _stats
+    if _stats is None:
+        if os.path.exists(SELECTION_STATS_FILE):
+            with open(SELECTION_STATS_FILE) as f:
+                _stats = json.load(f)
+        else:
+            _stats = {}
+    return _stats
+
+
+def ensure_stats():
+    """Rebuild the stats right away if there is no stats file (for the CLI, which has no startup)."""
+    if not os.path.exists(SELECTION_STATS_FILE):
+        rebuild_stats()
+
+
+def start_stats_build():
+    """Rebuild the stats in a worker thread if there is no stats file yet (no-op otherwise)."""
+    global _build_task
+    if os.path.exists(SELECTION_STATS_FILE):
+        return
+    if _build_task is None or _build_task.done():
+        _build_task = asyncio.create_task(asyncio.to_thread(rebuild_stats))
+
+
+def _rank_reward(average_rank: float, ranked: int) -> float:
+    """Map an average rank among `ranked` answers to a reward in [0, 1], 1 being best."""
+    return 1.0 - (average_rank - 1) / (ranked - 1)
+
+
+def _stage1_latencies(compact_timeline: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Seconds each member spent answering in Stage 1, from a stored turn timeline."""
+    if not compact_timeline:
+        return {}
+    rows = compact_timeline.get("spans", [])
+    stage1_ids = {row[0] for row in rows if row[2] == "stage1"}
+    return {
+        row[5]["member"]: row[4] / 1000
+        for row in rows
+        if row[2] == "member" and row[1] in stage1_ids and len(row) > 5 and "member" in row[5]
+    }
+
+
+def _record(
+    stats: Dict[str, Dict[str, Any]],
+    stage1_results: List[Dict[str, Any]],
+    metadata: Dict[str, Any],
+    compact_timeline: Optional[Dict[str, Any]]
+):
+    from .council import is_error_response
+
+    rankings = metadata.get("aggregate_rankings") or []
+    # Merged duplicate answers (label_to_members) share one ranked position,
+    # so ranks run up to the number of labels, not of members
+    positions = len(metadata.get("label_to_model") or {}) or len(rankings)
+    latencies = _stage1_latencies(compact_timeline)
+
+    failed = set()
+    for result in stage1_results:
+        member = stats.setdefault(result['persona_name'], _empty_stats())
+        member["turns"] += 1
+        if is_error_response(result):
+            failed.add(result['persona_name'])
+            member["failures"] += 1
+            # A failed answer is as bad as finishing last
+            member["rewards"] += 1
+        if result['persona_name'] in latencies:
+            member["latency_sum"] += latencies[result['persona_name']]
+            member["latencies"] += 1
+
+    if rankings and positions > 1:
+        for entry in rankings:
+            if entry["model"] in failed:
+                continue
+            member = stats.setdefault(entry["model"], _empty_stats())
+            member["reward_sum"] += _rank_reward(entry["average_rank"], positions)
+            member["rewards"] += 1
+
+
+def record_turn(
+    stage1_results: List[Dict[str, Any]],
+    metadata: Dict[str, Any],
+    compact_timeline: Optional[Dict[str, Any]] = None
+):
+    """
+    Update member stats with the outcome of a council turn.
+
+    Args:
+        stage1_results: The turn's Stage 1 results
+        metadata: The turn's metadata (aggregate_rankings)
+        compact_timeline: The turn's timeline, for Stage 1 latencies
+    """
+    stats = get_stats()
+    with _stats_lock:
+        _record(stats, stage1_results, metadata, compact_timeline)
+        for buffer in _rebuild_buffers:
+            buffer.append((stage1_results, metadata, compact_timeline))
+        rebuilding = bool(_rebuild_buffers)
+    # A rebuild in progress writes the file when done; a partial file now
+    # would stop an interrupted rebuild from being retried on restart
+    if not rebuilding:
+        _save_stats()
+
+
+def rebuild_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Recompute member stats from every stored conversation.
+
+    Reads every conversation, so call it from a worker thread when the
+    event loop is running.
+    """
+    from . import storage
+
+    global _stats
+    stats = {}
+    seen = set()  # Timeline start times of the turns read, to skip them when replaying
+    buffer: List[Tuple[Any, ...]] = []
+    with _stats_lock:
+        _rebuild_buffers.append(buffer)
+    try:
+        for summary in storage.list_conversations():
+            conversation = storage.get_conversation(summary["id"])
+            if conversation is None:
+                continue
+            for message in conversation["messages"]:
+                if message.get("role") == "assistant" and message.get("stage1"):
+                    _record(stats, message["stage1"], message.get("metadata") or {}, message.get("timeline"))
+                    if message.get("timeline"):
+                        seen.add(message["timeline"].get("t0"))
+    except BaseException:
+        with _stats_lock:
+            _rebuild_buffers.remove(buffer)
+        raise
+    with _stats_lock:
+        _rebuild_buffers.remove(buffer)
+        # Turns recorded during the rebuild went to the old stats, unless
+        # the rebuild already read them from their conversation
+        for stage1_results, metadata, compact_timeline in buffer:
+            if not compact_timeline or compact_timeline.get("t0") not in seen:
+                _record(stats, stage1_results, metadata, compact_timeline)
+        _stats = stats
+    _save_stats()
+    return _stats
+
+
+def score_members(members: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Upper-confidence-bound score for each candidate member.
+
+    Mean reward (peer-review quality, with failures counting as last place)
+    plus an exploration bonus that shrinks as a member is tried more, minus
+    a latency penalty relative to the slowest candidate. Members with no
+    history score infinity so they are tried first.
+    """
+    stats = get_stats()
+    names = [m.get('name', m['model_id']) for m in members]
+    total_rewards = sum(stats.get(n, {}).get("rewards", 0) for n in names)
+
+    mean_latency = {}
+    for name in names:
+        member = stats.get(name)
+        if member and member["latencies"]:
+            mean_latency[name] = member["latency_sum"] / member["latencies"]
+    slowest = max(mean_latency.values(), default=0.0)
+
+    scores = {}
+    for name in names:
+        member = stats.get(name)
+        if not member or not member["rewards"]:
+            scores[name] = math.inf
+            continue
+        mean = member["reward_sum"] / member["rewards"]
+        bonus = SELECTION_EXPLORATION * math.sqrt(math.log(max(total_rewards, 1)) / member["rewards"])
+        penalty = SELECTION_LATENCY_WEIGHT * mean_latency[name] / slowest if name in mean_latency and slowest else 0.0
+        scores[name] = mean + bonus - penalty
+    return scores
+
+
+def choose_members(
+    members: List[Dict[str, Any]],
+    budget: Optional[int]
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Pick at most `budget` members to query this turn.
+
+    Args:
+        members: The conversation's full council
+        budget: Members to query per turn (None or >= council size queries everyone)
+
+    Returns:
+        Tuple of (selected members in council order, selection record for
+        the turn's metadata or None when everyone is queried)
+    """
+    if not budget or budget >= len(members):
+        return members, None
+
+    # A council needs at least two answers to review
+    budget = max(budget, 2)
+    scores = score_members(members)
+    ranked = sorted(members, key=lambda m: scores[m.get('name', m['model_id'])], reverse=True)
+    chosen = {id(m) for m in ranked[:budget]}
+    selected = [m for m in members if id(m) in chosen]
+
+    record = {
+        "budget": budget,
+        "selected": [m.get('name', m['model_id']) for m in selected],
+        "scores": {name: (round(score, 4) if math.isfinite(score) else None) for name, score in scores.items()},
+    }
+    return selected, record
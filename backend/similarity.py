@@ -0,0 +1,115 @@
+"""Cheap text similarity for comparing Stage 1 answers."""
+
+import math
+import random
+import re
+import zlib
+from typing import List, Optional, Sequence, Set
+
+# Words per shingle; 3-word shingles ignore shared vocabulary but catch
+# shared phrasing
+SHINGLE_SIZE = 3
+# Hash functions per MinHash signature; the Jaccard estimate has a standard
+# error of about 1 / sqrt(NUM_PERMUTATIONS)
+NUM_PERMUTATIONS = 128
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """
+    Hash the word n-grams of a text.
+
+    Markdown, punctuation and case are ignored, so the same answer with
+    different formatting yields the same shingles. Texts shorter than
+    `size` words become a single shingle.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode())
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash_signature(shingle_set: Set[int]) -> List[int]:
+    """MinHash signature of a shingle set."""
+    if not shingle_set:
+        return [_MERSENNE_PRIME] * NUM_PERMUTATIONS
+    return [
+        min((a * s + b) % _MERSENNE_PRIME for s in shingle_set)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def pairwise_min_similarity(texts: List[str]) -> float:
+    """
+    Lowest estimated Jaccard similarity between any two texts.
+
+    Returns:
+        1.0 for fewer than two texts; 0.0 if any text has no words, since
+        empty texts would otherwise match each other exactly
+    """
+    shingle_sets = [shingles(t) for t in texts]
+    if len(shingle_sets) > 1 and not all(shingle_sets):
+        return 0.0
+    signatures = [minhash_signature(s) for s in shingle_sets]
+    lowest = 1.0
+    for i in range(len(signatures)):
+        for j in range(i + 1, len(signatures)):
+            lowest = min(lowest, estimate_jaccard(signatures[i], signatures[j]))
+    return lowest
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def pairwise_min_cosine(vectors: List[Sequence[float]]) -> Optional[float]:
+    """Lowest cosine similarity between any two vectors (None for fewer than two)."""
+    if len(vectors) < 2:
+        return None
+    return min(
+        cosine(vectors[i], vectors[j])
+        for i in range(len(vectors))
+        for j in range(i + 1, len(vectors))
+    )
+
+
+def cluster_texts(texts: List[str], threshold: float) -> List[List[int]]:
+    """
+    Group near-duplicate texts.
+
+    Each text joins the first cluster whose representative (its first text)
+    it is at least `threshold` similar to, so cluster order and
+    representatives follow input order.
+
+    Returns:
+        Clusters as lists of indices into `texts`
+    """
+    signatures = [minhash_signature(shingles(t)) for t in texts]
+    clusters: List[List[int]] = []
+    for i, signature in enumerate(signatures):
+        for cluster in clusters:
+            if estimate_jaccard(signatures[cluster[0]], signature) >= threshold:
+                cluster.append(i)
+                break
+        else:
+            clusters.append([i])
+    return clusters
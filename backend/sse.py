@@ -0,0 +1,175 @@
+"""
+Server-sent event framing for council run streams.
+
+Protocol 1 (the default) sends every event as a JSON `data:` line, exactly
+as the event was published. Protocol 2 is compact:
+
+- the event type moves to the SSE `event:` field (`message` for the
+  agentic council's role-bearing message events), and the payload is
+  serialized without whitespace (with orjson when it is installed);
+- a message event whose stages were already sent in the same stream
+  carries `refs` ({"stage1": event id, ...}) instead of repeating them;
+  `metadata` refers to the stage2_complete event's metadata;
+- idle streams get `: hb` comment heartbeats;
+- frames can be gzip-compressed, flushed per frame.
+"""
+
+import asyncio
+import json
+import zlib
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .config import SSE_DEFAULT_PROTOCOL, SSE_HEARTBEAT_SECONDS, SSE_GZIP
+
+PROTOCOLS = (1, 2)
+
+HEARTBEAT_FRAME = ": hb\n\n"
+
+# Message event fields that can be sent as a reference: field -> (stage
+# event type, key of that event holding the value)
+_REFERENCE_FIELDS = {
+    "stage1": ("stage1_complete", "data"),
+    "stage2": ("stage2_complete", "data"),
+    "stage3": ("stage3_complete", "data"),
+    "metadata": ("stage2_complete", "metadata"),
+}
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON, via orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def format_sse(event_id: int, event: Dict[str, Any]) -> str:
+    """Format a single event as a protocol 1 SSE frame with an id for Last-Event-ID replay."""
+    return f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+
+
+class EventEncoder:
+    """
+    Turns one stream's job events into SSE frames.
+
+    Protocol 2 is stateful: it remembers the stage events already sent on
+    this stream so a later message event can point at them.
+    """
+
+    def __init__(self, protocol: int = SSE_DEFAULT_PROTOCOL):
+        self.protocol = protocol
+        self._sent_stages: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    def _with_refs(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        payload = dict(event)
+        refs = {}
+        for field, (stage_type, key) in _REFERENCE_FIELDS.items():
+            sent = self._sent_stages.get(stage_type)
+            if field not in payload or sent is None:
+                continue
+            value = sent[1].get(key)
+            # Identity covers live jobs; equality covers events replayed from a log
+            if value is payload[field] or value == payload[field]:
+                refs[field] = sent[0]
+                del payload[field]
+        if refs:
+            payload["refs"] = refs
+        return payload
+
+    def encode(self, event_id: int, event: Dict[str, Any]) -> str:
+        """Format an event for this stream's protocol."""
+        if self.protocol == 1:
+            return format_sse(event_id, event)
+
+        event_type = event.get("type")
+        if event_type in ("stage1_complete", "stage2_complete", "stage3_complete"):
+            self._sent_stages[event_type] = (event_id, event)
+
+        if event_type is None:
+            name = "message"
+            payload = self._with_refs(event) if event.get("role") == "assistant" else event
+        else:
+            name = event_type
+            payload = {k: v for k, v in event.items() if k != "type"}
+        return f"id: {event_id}\nevent: {name}\ndata: {dumps(payload)}\n\n"
+
+
+async def with_heartbeats(frames: AsyncIterator[str], interval: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Pass frames through, inserting a heartbeat comment whenever none arrives for `interval` seconds."""
+    iterator = frames.__aiter__()
+    next_frame = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_frame}, timeout=interval)
+            if not done:
+                yield HEARTBEAT_FRAME
+                continue
+            try:
+                frame = next_frame.result()
+            except StopAsyncIteration:
+                return
+            yield frame
+            next_frame = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        if not next_frame.done():
+            next_frame.cancel()
+            await asyncio.gather(next_frame, return_exceptions=True)
+        await iterator.aclose()
+
+
+async def gzip_frames(frames: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """
+    Gzip a frame stream, flushing after every frame so the client can
+    decode each one as soon as it arrives. The compressor keeps its window
+    across frames, so repeated keys and text compress well.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async with aclosing(frames):
+        async for frame in frames:
+            yield compressor.compress(frame.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def negotiate(protocol: Optional[int], accept_encoding: Optional[str]) -> Tuple[int, bool]:
+    """
+    Pick the protocol and whether to gzip a stream.
+
+    Args:
+        protocol: Protocol the client asked for (None for the default)
+        accept_encoding: The request's Accept-Encoding header
+
+    Returns:
+        Tuple of (protocol, gzip); only protocol 2 streams are compressed
+
+    Raises:
+        ValueError: For an unknown protocol
+    """
+    protocol = protocol or SSE_DEFAULT_PROTOCOL
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"Unsupported SSE protocol {protocol}")
+    use_gzip = protocol >= 2 and SSE_GZIP and "gzip" in (accept_encoding or "").lower()
+    return protocol, use_gzip
+
+
+def wrap_stream(frames: AsyncIterator[str], protocol: int, use_gzip: bool) -> Tuple[AsyncIterator, Dict[str, str]]:
+    """
+    Apply protocol 2's heartbeats and compression to a frame stream.
+
+    Returns:
+        Tuple of (body iterator, extra response headers)
+    """
+    headers = {"X-SSE-Protocol": str(protocol)}
+    if protocol < 2:
+        return frames, headers
+    if SSE_HEARTBEAT_SECONDS:
+        frames = with_heartbeats(frames)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        return gzip_frames(frames), headers
+    return frames, headers
@@ -1,11 +1,69 @@
-"""JSON-based storage for conversations."""
+"""
+JSON-based storage for conversations.
 
+Conversations live in one of two tiers: hot ({id}.json, compact JSON) or
+cold ({id}.json.gz, moved there by backend.compaction once idle). Reads
+handle either tier transparently; any write makes a conversation hot again.
+"""
+
+import asyncio
+import copy
+import gzip
 import json
 import os
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
-from .config import DATA_DIR
+from .config import DATA_DIR, PENDING_TURNS_DIR, MESSAGE_REVISIONS_KEEP
+from .metrics import STORAGE_DURATION, timed
+from . import coordination, search, usage
+
+HOT_SUFFIX = ".json"
+COLD_SUFFIX = ".json.gz"
+
+# Serialize this process's writes of a conversation (between request
+# handlers, writes moved off the event loop and the compaction thread), so
+# a conversation is never demoted while being written. Striped like the
+# coordinator's locks, so writes of unrelated conversations never wait for
+# each other. Reentrant because reads may write back lazy migrations.
+_stripe_locks = [threading.RLock() for _ in range(coordination.STORAGE_LOCK_STRIPES)]
+
+# Conversation writes and deletes made by this process; part of the list
+# ETag alongside the data directory's mtime, which catches other processes'
+# writes but may be too coarse to tell two quick writes apart
+_write_count = 0
+
+# Listing metadata of cold conversations, keyed by path: (mtime, metadata).
+# Cold files rarely change, so this avoids decompressing them on every list.
+_cold_metadata: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _update_search_index(update, *args):
+    """Apply a search index update; a failing index never fails a write."""
+    try:
+        update(*args)
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+
+
+@contextmanager
+def conversation_lock(conversation_id: str) -> Iterator[None]:
+    """
+    Hold a conversation's write lock for a read-modify-write sequence.
+
+    Takes this process's lock on the conversation's stripe and, with a
+    shared coordination backend, the conversation's lock across processes,
+    so two API workers cannot both load a conversation, change it and
+    overwrite each other. Reentrant. The cross-process lock may wait for
+    another process, so async code runs writes in a thread (see
+    checkpoint_turn).
+    """
+    stripe = zlib.crc32(conversation_id.encode()) % coordination.STORAGE_LOCK_STRIPES
+    with _stripe_locks[stripe], coordination.get_coordinator().storage_lock(conversation_id):
+        yield
 
 
 def ensure_data_dir():
@@ -15,7 +73,100 @@ def ensure_data_dir():
 
 def get_conversation_path(conversation_id: str) -> str:
     """Get the file path for a conversation."""
-    return os.path.join(DATA_DIR, f"{conversation_id}.json")
+    return os.path.join(DATA_DIR, f"{conversation_id}{HOT_SUFFIX}")
+
+
+def get_cold_conversation_path(conversation_id: str) -> str:
+    """Get the file path for a compressed (cold) conversation."""
+    return os.path.join(DATA_DIR, f"{conversation_id}{COLD_SUFFIX}")
+
+
+def find_conversation_path(conversation_id: str) -> Optional[str]:
+    """Path of a conversation's file in whichever tier holds it, or None."""
+    for path in (get_conversation_path(conversation_id), get_cold_conversation_path(conversation_id)):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def is_cold_path(path: str) -> bool:
+    """Whether a conversation file is in the compressed tier."""
+    return path.endswith(COLD_SUFFIX)
+
+
+def read_conversation_file(path: str) -> Dict[str, Any]:
+    """Load a conversation file from either tier."""
+    if is_cold_path(path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_conversation_file(conversation: Dict[str, Any], cold: bool = False, mtime: Optional[float] = None):
+    """
+    Write a conversation to the given tier and remove it from the other.
+
+    Args:
+        conversation: Conversation dict to write
+        cold: Write the compressed tier instead of the hot one
+        mtime: Modification time to stamp on the file; compaction keeps the
+            original so the file's age still reflects the last activity
+    """
+    hot_path = get_conversation_path(conversation['id'])
+    cold_path = get_cold_conversation_path(conversation['id'])
+    path, other_path = (cold_path, hot_path) if cold else (hot_path, cold_path)
+
+    data = json.dumps(conversation, separators=(',', ':'))
+    # Per process, in case another process writes the same conversation
+    # without holding its lock (e.g. the local coordination backend)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with conversation_lock(conversation['id']):
+        if cold:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                f.write(data)
+        else:
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+        if mtime is not None:
+            os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, path)
+        if os.path.exists(other_path):
+            os.remove(other_path)
+        _mark_written()
+
+
+def _mark_written():
+    global _write_count
+    _write_count += 1
+
+
+def get_conversation_etag(conversation_id: str) -> Optional[str]:
+    """
+    Weak ETag for a conversation's stored content, from a single stat.
+
+    Returns:
+        The ETag, or None if the conversation does not exist
+    """
+    for path in (get_conversation_path(conversation_id), get_cold_conversation_path(conversation_id)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return None
+
+
+def get_list_etag() -> str:
+    """
+    Weak ETag for the conversation list.
+
+    Every save replaces a file in DATA_DIR, which updates the directory's
+    mtime, so one stat tells whether any conversation changed.
+    """
+    ensure_data_dir()
+    stat = os.stat(DATA_DIR)
+    return f'W/"{stat.st_mtime_ns:x}-{_write_count:x}"'
 
 
 def create_conversation(conversation_id: str, conversation_type: str = "standard") -> Dict[str, Any]:
@@ -40,28 +191,34 @@ def create_conversation(conversation_id: str, conversation_type: str = "standard
     }
 
     # Save to file
-    path = get_conversation_path(conversation_id)
-    with open(path, 'w') as f:
-        json.dump(conversation, f, indent=2)
+    write_conversation_file(conversation)
+    _update_search_index(search.update_conversation, conversation)
 
     return conversation
 
 
 import uuid
 
+@timed(STORAGE_DURATION, operation="read")
 def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
     """
     Load a conversation from storage.
     Ensures all messages have IDs and pinned status.
     """
-    path = get_conversation_path(conversation_id)
-
-    if not os.path.exists(path):
+    # Files are replaced atomically, so reading needs no lock; a file moved
+    # to the other tier after it was found is looked up again
+    for _ in range(3):
+        path = find_conversation_path(conversation_id)
+        if path is None:
+            return None
+        try:
+            data = read_conversation_file(path)
+            break
+        except FileNotFoundError:
+            continue
+    else:
         return None
 
-    with open(path, 'r') as f:
-        data = json.load(f)
-        
     # Lazy migration: Ensure all messages have IDs and pinned status
     modified = False
     for msg in data.get("messages", []):
@@ -78,20 +235,39 @@ def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
     return data
 
 
+@timed(STORAGE_DURATION, operation="write")
 def save_conversation(conversation: Dict[str, Any]):
     """
-    Save a conversation to storage.
+    Save a conversation to storage (always to the hot tier).
 
     Args:
         conversation: Conversation dict to save
     """
     ensure_data_dir()
+    write_conversation_file(conversation)
 
-    path = get_conversation_path(conversation['id'])
-    with open(path, 'w') as f:
-        json.dump(conversation, f, indent=2)
 
+def _conversation_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": data["id"],
+        "created_at": data["created_at"],
+        "title": data.get("title", "New Conversation"),
+        "message_count": len(data["messages"]),
+        "conversation_type": data.get("conversation_type", "standard")
+    }
 
+
+def _cold_conversation_metadata(path: str) -> Dict[str, Any]:
+    mtime = os.path.getmtime(path)
+    cached = _cold_metadata.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    metadata = _conversation_metadata(read_conversation_file(path))
+    _cold_metadata[path] = (mtime, metadata)
+    return metadata
+
+
+@timed(STORAGE_DURATION, operation="list")
 def list_conversations() -> List[Dict[str, Any]]:
     """
     List all conversations (metadata only).
@@ -103,21 +279,17 @@ def list_conversations() -> List[Dict[str, Any]]:
 
     conversations = []
     for filename in os.listdir(DATA_DIR):
-        if filename.endswith('.json'):
-            path = os.path.join(DATA_DIR, filename)
-            try:
+        path = os.path.join(DATA_DIR, filename)
+        try:
+            if filename.endswith(HOT_SUFFIX):
                 with open(path, 'r') as f:
-                    data = json.load(f)
                     # Return metadata only
-                    conversations.append({
-                        "id": data["id"],
-                        "created_at": data["created_at"],
-                        "title": data.get("title", "New Conversation"),
-                        "message_count": len(data["messages"]),
-                        "conversation_type": data.get("conversation_type", "standard")
-                    })
-            except Exception:
-                continue
+                    conversations.append(_conversation_metadata(json.load(f)))
+            elif filename.endswith(COLD_SUFFIX):
+                conversations.append(_cold_conversation_metadata(path))
+        except Exception:
+            # Unreadable, or moved between tiers while listing
+            continue
 
     # Sort by creation time, newest first
     conversations.sort(key=lambda x: x["created_at"], reverse=True)
@@ -125,6 +297,55 @@ def list_conversations() -> List[Dict[str, Any]]:
     return conversations
 
 
+def iter_conversations() -> Iterator[Dict[str, Any]]:
+    """
+    Yield every stored conversation, one at a time, from either tier.
+
+    Files are read as stored (no lazy migration, cold ones stay cold), so
+    memory use does not grow with the number of conversations.
+    """
+    ensure_data_dir()
+
+    for filename in os.listdir(DATA_DIR):
+        if not (filename.endswith(HOT_SUFFIX) or filename.endswith(COLD_SUFFIX)):
+            continue
+        try:
+            conversation = read_conversation_file(os.path.join(DATA_DIR, filename))
+        except Exception:
+            # Unreadable, or moved between tiers while iterating
+            continue
+        yield conversation
+
+
+def conversation_exists(conversation_id: str) -> bool:
+    """Whether a conversation is stored in either tier."""
+    return find_conversation_path(conversation_id) is not None
+
+
+@timed(STORAGE_DURATION, operation="write_batch")
+def save_conversations(conversations: List[Dict[str, Any]]):
+    """
+    Save several conversations to storage in one batch.
+
+    Args:
+        conversations: Conversation dicts to save
+    """
+    ensure_data_dir()
+    for conversation in conversations:
+        write_conversation_file(conversation)
+    for conversation in conversations:
+        _update_search_index(search.index_conversation, conversation)
+
+
+def _new_user_message(content: str) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "role": "user",
+        "content": content,
+        "pinned": False
+    }
+
+
 def add_user_message(conversation_id: str, content: str):
     """
     Add a user message to a conversation.
@@ -133,18 +354,127 @@ def add_user_message(conversation_id: str, content: str):
         conversation_id: Conversation identifier
         content: User message content
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        message = _new_user_message(content)
+        conversation["messages"].append(message)
+
+        save_conversation(conversation)
+    _update_search_index(search.index_message, conversation, message)
+
+
+def _set_pending_marker(conversation_id: str, pending: bool):
+    path = os.path.join(PENDING_TURNS_DIR, conversation_id)
+    if pending:
+        os.makedirs(PENDING_TURNS_DIR, exist_ok=True)
+        Path(path).touch()
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def begin_turn(conversation_id: str, content: str, turn: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add a user message and record the council turn it starts as pending.
+
+    Both are written together, so a conversation never has an unanswered
+    message without the checkpoint needed to resume it. Starting a turn
+    abandons any earlier pending one.
+
+    Args:
+        conversation_id: Conversation identifier
+        content: User message content
+        turn: Turn details: 'members' and 'chairman', plus anything the
+            caller needs to resume it; 'query' defaults to `content`
 
-    conversation["messages"].append({
+    Returns:
+        The pending turn, with empty stage checkpoints
+    """
+    message = _new_user_message(content)
+    turn = {
+        "query": content,
+        **turn,
         "id": str(uuid.uuid4()),
-        "role": "user",
-        "content": content,
-        "pinned": False
-    })
+        "user_message_id": message["id"],
+        "started_at": datetime.utcnow().isoformat(),
+        "status": "running",
+        "completed_stage": 0,
+        "stage1": [None] * len(turn["members"]),
+        "stage2": None,
+        "metadata": None,
+    }
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        conversation["messages"].append(message)
+        conversation["pending_turn"] = turn
+        save_conversation(conversation)
+        _set_pending_marker(conversation_id, True)
+    _update_search_index(search.index_message, conversation, message)
+    return turn
 
-    save_conversation(conversation)
+
+def update_pending_turn(conversation_id: str, turn: Dict[str, Any]) -> bool:
+    """
+    Checkpoint a pending turn's progress.
+
+    Returns:
+        False if the turn is no longer the conversation's pending turn
+        (finished, discarded or superseded), in which case nothing is written
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None or (conversation.get("pending_turn") or {}).get("id") != turn["id"]:
+            return False
+        conversation["pending_turn"] = {k: v for k, v in turn.items() if k != "stage3"}
+        save_conversation(conversation)
+    return True
+
+
+async def checkpoint_turn(conversation_id: str, turn: Dict[str, Any]) -> bool:
+    """
+    update_pending_turn from async code: written in a thread, so waiting for
+    the conversation's lock never blocks the event loop.
+
+    A snapshot of `turn` is written, since the caller keeps filling it in
+    meanwhile; callers checkpointing one turn concurrently must serialize
+    their calls, so an older snapshot never overwrites a newer one.
+    """
+    return await asyncio.to_thread(update_pending_turn, conversation_id, copy.deepcopy(turn))
+
+
+def discard_pending_turn(conversation_id: str) -> bool:
+    """
+    Drop a conversation's pending turn and the user message that started it.
+
+    Returns:
+        False if there was no pending turn
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None or not conversation.get("pending_turn"):
+            # Drop a stale marker
+            _set_pending_marker(conversation_id, False)
+            return False
+        turn = conversation.pop("pending_turn")
+        conversation["messages"] = [
+            m for m in conversation["messages"] if m.get("id") != turn.get("user_message_id")
+        ]
+        save_conversation(conversation)
+        _set_pending_marker(conversation_id, False)
+    _update_search_index(search.index_conversation, conversation)
+    return True
+
+
+def list_pending_turns() -> List[str]:
+    """IDs of conversations marked as having an unfinished turn."""
+    if not os.path.isdir(PENDING_TURNS_DIR):
+        return []
+    return os.listdir(PENDING_TURNS_DIR)
 
 
 def add_assistant_message(
@@ -152,10 +482,12 @@ def add_assistant_message(
     stage1: List[Dict[str, Any]],
     stage2: List[Dict[str, Any]],
     stage3: Dict[str, Any],
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None,
+    timeline: Optional[Dict[str, Any]] = None
 ):
     """
-    Add an assistant message with all 3 stages to a conversation.
+    Add an assistant message with all 3 stages to a conversation,
+    completing its pending turn.
 
     Args:
         conversation_id: Conversation identifier
@@ -163,11 +495,8 @@ def add_assistant_message(
         stage2: List of model rankings
         stage3: Final synthesized response
         metadata: Optional metadata including aggregate rankings
+        timeline: Optional compact span tree of the turn (see timeline.to_compact)
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
-
     message = {
         "id": str(uuid.uuid4()),
         "role": "assistant",
@@ -176,13 +505,73 @@ def add_assistant_message(
         "stage3": stage3,
         "pinned": False
     }
-    
+
     if metadata:
         message["metadata"] = metadata
+    if timeline:
+        message["timeline"] = timeline
 
-    conversation["messages"].append(message)
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
 
-    save_conversation(conversation)
+        conversation["messages"].append(message)
+        conversation.pop("pending_turn", None)
+
+        save_conversation(conversation)
+        _set_pending_marker(conversation_id, False)
+    _update_search_index(search.index_message, conversation, message)
+
+
+def revise_assistant_message(
+    conversation_id: str,
+    message_id: str,
+    changes: Dict[str, Any],
+    reason: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Replace stages of an assistant message in place, keeping the old ones.
+
+    The replaced values are appended to the message's 'revisions' (at most
+    MESSAGE_REVISIONS_KEEP are kept) and its 'revision' counter goes up.
+
+    Args:
+        conversation_id: Conversation identifier
+        message_id: Message identifier
+        changes: New values for any of 'stage1', 'stage2', 'stage3', 'metadata'
+        reason: What was regenerated, recorded with the revision
+
+    Returns:
+        The updated message
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        message = next(
+            (m for m in conversation["messages"] if m.get("id") == message_id and m.get("role") == "assistant"),
+            None
+        )
+        if message is None:
+            raise ValueError(f"Message {message_id} not found in conversation {conversation_id}")
+
+        revision = {
+            **reason,
+            "revised_at": datetime.utcnow().isoformat(),
+            **{field: message.get(field) for field in changes},
+        }
+        revisions = message.setdefault("revisions", [])
+        revisions.append(revision)
+        if len(revisions) > MESSAGE_REVISIONS_KEEP:
+            del revisions[:len(revisions) - MESSAGE_REVISIONS_KEEP]
+        message.update(changes)
+        message["revision"] = message.get("revision", 0) + 1
+
+        save_conversation(conversation)
+    _update_search_index(search.index_message, conversation, message)
+    return message
 
 
 def toggle_message_pin(conversation_id: str, message_id: str) -> bool:
@@ -196,16 +585,17 @@ def toggle_message_pin(conversation_id: str, message_id: str) -> bool:
     Returns:
         New pinned status (bool)
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
-        
-    for msg in conversation["messages"]:
-        if msg.get("id") == message_id:
-            msg["pinned"] = not msg.get("pinned", False)
-            save_conversation(conversation)
-            return msg["pinned"]
-            
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        for msg in conversation["messages"]:
+            if msg.get("id") == message_id:
+                msg["pinned"] = not msg.get("pinned", False)
+                save_conversation(conversation)
+                return msg["pinned"]
+
     raise ValueError(f"Message {message_id} not found in conversation {conversation_id}")
 
 
@@ -217,16 +607,62 @@ def update_conversation_title(conversation_id: str, title: str):
         conversation_id: Conversation identifier
         title: New title for the conversation
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        conversation["title"] = title
+        save_conversation(conversation)
+    _update_search_index(search.update_conversation, conversation)
+
+
+def update_conversation_memory(conversation_id: str, memory: Dict[str, Any]):
+    """
+    Update the cached rolling summary of a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        memory: Dict with 'summary' and 'turns_summarized' keys
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        conversation["memory"] = memory
+        save_conversation(conversation)
+
+
+def add_conversation_usage(conversation_id: str, spent: Dict[str, Any]):
+    """
+    Add a turn's model usage to a conversation's running totals.
+
+    Args:
+        conversation_id: Conversation identifier
+        spent: Usage totals (see usage.track)
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        conversation["usage"] = usage.add_usage(conversation.get("usage") or usage.empty_usage(), spent)
+        save_conversation(conversation)
+
 
-    conversation["title"] = title
-    save_conversation(conversation)
 def delete_conversation(conversation_id: str) -> bool:
-    """Delete a conversation."""
-    file_path = os.path.join(DATA_DIR, f"{conversation_id}.json")
-    if os.path.exists(file_path):
-        os.remove(file_path)
-        return True
-    return False
+    """Delete a conversation from whichever tier holds it."""
+    deleted = False
+    with conversation_lock(conversation_id):
+        for path in (get_conversation_path(conversation_id), get_cold_conversation_path(conversation_id)):
+            if os.path.exists(path):
+                os.remove(path)
+                _cold_metadata.pop(path, None)
+                deleted = True
+        if deleted:
+            _mark_written()
+            _set_pending_marker(conversation_id, False)
+    if deleted:
+        _update_search_index(search.remove_conversation, conversation_id)
+    return deleted
@@ -0,0 +1,139 @@
+"""Per-turn execution timelines: a span tree per council turn."""
+
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Version of the compact format stored with assistant messages
+TIMELINE_VERSION = 1
+
+
+class Span:
+    """A timed operation with attributes and child spans."""
+
+    __slots__ = ("name", "start", "end", "attrs", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.children: List["Span"] = []
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Record a span as a child of the current one.
+
+    Tasks created inside the block (e.g. by asyncio.gather) inherit it as
+    their parent, so parallel member calls nest under their stage.
+    """
+    new_span = Span(name, {k: v for k, v in attrs.items() if v is not None})
+    parent = _current_span.get()
+    if parent is not None:
+        parent.children.append(new_span)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    finally:
+        new_span.end = time.time()
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator wrapping an async function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attrs):
+    """Set attributes on the current span, if there is one."""
+    current = _current_span.get()
+    if current is not None:
+        current.attrs.update({k: v for k, v in attrs.items() if v is not None})
+
+
+def to_compact(root: Span) -> Dict[str, Any]:
+    """
+    Serialize a span tree for storage.
+
+    Spans are flattened into rows of [id, parent_id, name, start_ms, duration_ms]
+    plus an attrs dict when there are attributes. Times are relative to the
+    root; spans still open are closed at the current time.
+    """
+    now = time.time()
+    rows = []
+
+    def visit(node: Span, parent_id: int):
+        span_id = len(rows)
+        end = node.end if node.end is not None else now
+        row = [span_id, parent_id, node.name,
+               round((node.start - root.start) * 1000, 1),
+               round((end - node.start) * 1000, 1)]
+        if node.attrs:
+            row.append(node.attrs)
+        rows.append(row)
+        for child in node.children:
+            visit(child, span_id)
+
+    visit(root, -1)
+    return {"v": TIMELINE_VERSION, "t0": root.start, "spans": rows}
+
+
+def to_chrome_trace(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a stored timeline to Chrome trace / Perfetto JSON.
+
+    Complete ("X") events on one thread must nest strictly, so overlapping
+    siblings (parallel member calls) are spread across extra thread lanes.
+    """
+    rows = sorted(compact.get("spans", []), key=lambda r: (r[3], -r[4]))
+    lane_of: Dict[int, int] = {}
+    open_spans: List[List[tuple]] = []  # per lane: stack of (end_ms, span_id)
+
+    events = []
+    for row in rows:
+        span_id, parent_id, name, start_ms, duration_ms = row[:5]
+        attrs = row[5] if len(row) > 5 else {}
+        end_ms = start_ms + duration_ms
+
+        for stack in open_spans:
+            while stack and stack[-1][0] <= start_ms:
+                stack.pop()
+
+        lane = None
+        parent_lane = lane_of.get(parent_id)
+        if parent_lane is not None and open_spans[parent_lane] and open_spans[parent_lane][-1][1] == parent_id:
+            lane = parent_lane
+        else:
+            lane = next((i for i, stack in enumerate(open_spans) if not stack), None)
+            if lane is None:
+                open_spans.append([])
+                lane = len(open_spans) - 1
+
+        lane_of[span_id] = lane
+        open_spans[lane].append((end_ms, span_id))
+        label = attrs.get("member") or attrs.get("model")
+        events.append({
+            "name": f"{name} {label}" if label else name,
+            "cat": name,
+            "ph": "X",
+            "ts": round((compact.get("t0", 0) * 1000 + start_ms) * 1000),
+            "dur": round(duration_ms * 1000),
+            "pid": 1,
+            "tid": lane + 1,
+            "args": attrs,
+        })
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,232 @@
+"""
+Usage accounting: tokens, compute time and cost of model calls.
+
+llm_client reports every successful call here. A call is added to every
+tracker open in the calling task (a council stage, a whole turn) and to
+the running totals of the calling client and its team in USAGE_FILE.
+Conversation budgets are checked against the conversation's stored totals
+plus whatever its current turn has spent so far.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from . import coordination, metrics
+from .config import (
+    USAGE_FILE,
+    USAGE_TEAMS,
+    USAGE_TOKEN_BUDGET,
+    USAGE_COST_BUDGET,
+    USAGE_BUDGET_ACTION,
+    USAGE_DOWNGRADE_MODEL,
+)
+
+# Totals of calls made outside any client's request (e.g. startup work)
+INTERNAL_CLIENT = "internal"
+
+# Serializes this process's read-modify-write of USAGE_FILE; other
+# processes are kept out by the coordinator's lock on it
+_lock = threading.Lock()
+
+# Trackers open in the current task, outermost first; tasks started inside
+# a track() block inherit them, so parallel member calls count towards it
+_trackers: contextvars.ContextVar[Tuple[Dict[str, Any], ...]] = contextvars.ContextVar("usage_trackers", default=())
+
+# Client ids (see admission.identify_client) of the keys in USAGE_TEAMS
+_team_clients: Optional[Dict[str, str]] = None
+
+
+def empty_usage() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "compute_ms": 0.0,  # Ollama load and evaluation time (GPU time)
+        "cost": 0.0,        # OpenRouter spend in USD
+    }
+
+
+def add_usage(totals: Dict[str, Any], usage: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add one call's usage, or another set of totals, to `totals` in place.
+
+    Returns:
+        `totals`
+    """
+    totals["calls"] += usage.get("calls", 1)
+    for key in ("prompt_tokens", "completion_tokens"):
+        totals[key] += usage.get(key) or 0
+    totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+    totals["compute_ms"] = round(totals["compute_ms"] + (usage.get("compute_ms") or 0), 1)
+    totals["cost"] = round(totals["cost"] + (usage.get("cost") or 0), 6)
+    return totals
+
+
+def normalize(
+    provider: str,
+    model: str,
+    usage: Optional[Dict[str, Any]],
+    duration_seconds: float
+) -> Dict[str, Any]:
+    """
+    Bring a provider's usage report into the common shape.
+
+    OpenRouter calls without a reported cost are priced from the model
+    catalog when it knows the model's per-token prices.
+
+    Returns:
+        Dict with provider, model, prompt_tokens, completion_tokens,
+        compute_ms, cost and duration_ms (wall time of the request)
+    """
+    usage = usage or {}
+    cost = usage.get("cost")
+    if cost is None and provider == "openrouter":
+        cost = _catalog_cost(model, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+    return {
+        "provider": provider,
+        "model": model,
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "compute_ms": usage.get("compute_ms"),
+        "cost": cost,
+        "duration_ms": round(duration_seconds * 1000, 1),
+    }
+
+
+def _catalog_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    from . import model_catalog
+
+    pricing = next((m.get("pricing") for m in model_catalog.get_models() if m["id"] == model), None)
+    if not pricing:
+        return None
+    try:
+        return (prompt_tokens or 0) * float(pricing.get("prompt") or 0) + \
+            (completion_tokens or 0) * float(pricing.get("completion") or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def track() -> Iterator[Dict[str, Any]]:
+    """Total the usage of model calls made inside the block, including by tasks it starts."""
+    totals = empty_usage()
+    token = _trackers.set(_trackers.get() + (totals,))
+    try:
+        yield totals
+    finally:
+        _trackers.reset(token)
+
+
+async def record(usage: Dict[str, Any]):
+    """
+    Account for one model call (see normalize) in the current task.
+
+    The client and team totals are written from a worker thread, so a
+    USAGE_FILE lock held by another process never stalls the event loop.
+    """
+    for totals in _trackers.get():
+        add_usage(totals, usage)
+
+    labels = {"provider": usage["provider"], "model": usage["model"]}
+    if usage.get("cost"):
+        metrics.MODEL_COST.inc(usage["cost"], **labels)
+    if usage.get("compute_ms"):
+        metrics.MODEL_COMPUTE_SECONDS.inc(usage["compute_ms"] / 1000, **labels)
+
+    from . import admission
+
+    client = admission.current_client() or INTERNAL_CLIENT
+    try:
+        await asyncio.to_thread(_charge, client, team_of(client), usage)
+    except OSError as e:
+        print(f"Error saving usage totals: {e}")
+
+
+def team_of(client: str) -> Optional[str]:
+    """The team USAGE_TEAMS assigns a client's API key to, if any."""
+    global _team_clients
+    if _team_clients is None:
+        from . import admission
+
+        _team_clients = {admission.key_client_id(key): team for key, team in USAGE_TEAMS.items()}
+    return _team_clients.get(client)
+
+
+def _load_totals() -> Dict[str, Any]:
+    if not os.path.exists(USAGE_FILE):
+        return {"clients": {}, "teams": {}}
+    with open(USAGE_FILE) as f:
+        return json.load(f)
+
+
+def _charge(client: str, team: Optional[str], usage: Dict[str, Any]):
+    with _lock, coordination.get_coordinator().storage_lock(USAGE_FILE):
+        data = _load_totals()
+        add_usage(data["clients"].setdefault(client, empty_usage()), usage)
+        if team is not None:
+            add_usage(data["teams"].setdefault(team, empty_usage()), usage)
+        data["updated_at"] = datetime.utcnow().isoformat()
+
+        os.makedirs(os.path.dirname(USAGE_FILE) or ".", exist_ok=True)
+        tmp_path = f"{USAGE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, USAGE_FILE)
+
+
+def get_totals() -> Dict[str, Any]:
+    """Usage totals per client and per team, with the default budgets."""
+    with _lock:
+        data = _load_totals()
+    return {
+        **data,
+        "budgets": {
+            "tokens": USAGE_TOKEN_BUDGET,
+            "cost": USAGE_COST_BUDGET,
+            "action": USAGE_BUDGET_ACTION,
+            "downgrade_model": USAGE_DOWNGRADE_MODEL,
+        },
+    }
+
+
+def check_budget(conversation: Dict[str, Any], spent: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Check a conversation against its token and cost budgets.
+
+    Budgets come from its council config (token_budget, cost_budget) or
+    USAGE_TOKEN_BUDGET / USAGE_COST_BUDGET.
+
+    Args:
+        conversation: Conversation dict as returned by storage
+        spent: Usage of the turn in progress, not stored yet
+
+    Returns:
+        None within budget; otherwise a dict with the exceeded budget
+        ('tokens' or 'cost'), 'used', 'budget' and the 'action' to take:
+        'downgrade' (with 'model') or 'stop'
+    """
+    config = conversation.get("council_config") or {}
+    used = add_usage(add_usage(empty_usage(), conversation.get("usage") or empty_usage()), spent or empty_usage())
+
+    for kind, used_amount, budget in (
+        ("tokens", used["total_tokens"], config.get("token_budget", USAGE_TOKEN_BUDGET)),
+        ("cost", used["cost"], config.get("cost_budget", USAGE_COST_BUDGET)),
+    ):
+        if budget is not None and used_amount >= budget:
+            exceeded = {"exceeded": kind, "used": used_amount, "budget": budget}
+            if USAGE_BUDGET_ACTION == "downgrade" and USAGE_DOWNGRADE_MODEL:
+                return {**exceeded, "action": "downgrade", "model": USAGE_DOWNGRADE_MODEL}
+            return {**exceeded, "action": "stop"}
+    return None
+
+
+def downgrade(member: Dict[str, Any]) -> Dict[str, Any]:
+    """A council member switched to USAGE_DOWNGRADE_MODEL, keeping its name and prompt."""
+    return {**member, "model_id": USAGE_DOWNGRADE_MODEL, "downgraded_from": member["model_id"]}
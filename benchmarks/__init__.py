@@ -0,0 +1 @@
+"""Benchmarks and load tests that run against a fake model provider."""
@@ -0,0 +1,117 @@
+"""Helpers shared by the benchmark and load-test scripts."""
+
+import json
+import os
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Relative change in a latency percentile (or drop in throughput) reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+def prepare_backend_environment(fake_url: str) -> str:
+    """
+    Point the backend at the fake provider and isolate its data directory.
+
+    Must run before `backend` is imported, since config reads the
+    environment at import time. The backend stores everything under a
+    relative data/ directory, so switching to a fresh working directory
+    keeps benchmark conversations out of the real ones.
+
+    Returns:
+        The temporary working directory
+    """
+    os.environ["OLLAMA_BASE_URL"] = f"{fake_url}/api/chat"
+    os.environ["OPENROUTER_API_URL"] = f"{fake_url}/api/v1/chat/completions"
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake-key")
+    workdir = tempfile.mkdtemp(prefix="quorum-bench-")
+    os.chdir(workdir)
+    return workdir
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples (q in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of latency samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean": round(sum(samples) / len(samples), 4),
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RESULTS_DIR.parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def save_results(name: str, results: Dict[str, Any], meta: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """Write results to benchmarks/results/<name>-<timestamp>.json (or `output`)."""
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {**meta, "timestamp": datetime.now().isoformat(), "git_revision": _git_revision()},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare_results(baseline_path: str, results: Dict[str, Any]) -> List[str]:
+    """
+    Compare results against a saved baseline.
+
+    Latency summaries are compared on p50/p95/p99 and throughput values on
+    their magnitude. Returns one line per compared metric, prefixed with
+    "REGRESSION" when it got worse by more than REGRESSION_THRESHOLD.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    lines = []
+
+    def visit(path: str, old: Any, new: Any):
+        if isinstance(old, dict) and isinstance(new, dict):
+            if "p50" in old and "p50" in new:
+                for q in ("p50", "p95", "p99"):
+                    report(f"{path}.{q}", old[q], new[q], higher_is_better=False)
+                return
+            for key in old:
+                if key in new:
+                    visit(f"{path}.{key}" if path else key, old[key], new[key])
+        elif path.endswith("throughput") and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            report(path, old, new, higher_is_better=True)
+
+    def report(path: str, old: float, new: float, higher_is_better: bool):
+        if not old:
+            return
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION " if worse > REGRESSION_THRESHOLD else ""
+        lines.append(f"{flag}{path}: {old:.4f} -> {new:.4f} ({change:+.1%})")
+
+    visit("", baseline, results)
+    return lines
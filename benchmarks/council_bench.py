@@ -0,0 +1,239 @@
+"""
+Council benchmark suite.
+
+Drives run_full_council, run_agentic_council and the storage layer against
+the in-repo fake provider at varying council sizes and concurrency, and
+reports throughput plus p50/p95/p99 per stage.
+
+Usage:
+    python -m benchmarks.council_bench
+    python -m benchmarks.council_bench --sizes 2,4,8 --concurrency 1,4,16 --runs 16
+    python -m benchmarks.council_bench --compare benchmarks/results/council-baseline.json
+
+Results are saved under benchmarks/results/ (see --output).
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+from .common import prepare_backend_environment, summarize, save_results, compare_results
+from .fake_provider import FakeProfile, running_fake_provider, add_profile_arguments, profile_from_args
+
+STAGES = ("stage1", "stage2", "stage3")
+
+
+def _members(size: int, provider: str) -> List[Dict[str, Any]]:
+    prefix = "ollama/" if provider == "ollama" else "fake/"
+    return [
+        {"model_id": f"{prefix}fake-{i}", "name": f"{prefix}fake-{i}", "system_prompt": None}
+        for i in range(size)
+    ]
+
+
+def _stage_durations(root) -> Dict[str, float]:
+    """Stage durations (seconds) from the children of a timeline span."""
+    return {
+        child.name: child.end - child.start
+        for child in root.children
+        if child.name in STAGES and child.end is not None
+    }
+
+
+async def bench_full_council(size: int, concurrency: int, runs: int, provider: str) -> Dict[str, Any]:
+    """Run `runs` standard council turns, `concurrency` at a time."""
+    from backend import llm_client, timeline
+    from backend.council import run_full_council
+
+    members = _members(size, provider)
+    chairman = members[0]
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = {name: [] for name in ("turn",) + STAGES}
+
+    async def one_run(i: int):
+        async with semaphore:
+            # Each run is its own fair-share key, like a separate conversation
+            llm_client.set_schedule_context(f"bench-{i}")
+            with timeline.span("turn") as root:
+                await run_full_council(f"Benchmark question {i}?", members, chairman)
+            samples["turn"].append(root.end - root.start)
+            for stage, duration in _stage_durations(root).items():
+                samples[stage].append(duration)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_run(i) for i in range(runs)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": round(runs / elapsed, 4),
+        "wall_seconds": round(elapsed, 3),
+        **{name: summarize(values) for name, values in samples.items()},
+    }
+
+
+async def bench_agentic(size: int, concurrency: int, runs: int, provider: str) -> Dict[str, Any]:
+    """Run `runs` agentic councils to completion, `concurrency` at a time."""
+    from backend import llm_client, storage, timeline, usage
+    from backend.council import run_agentic_council
+
+    members = _members(size, provider)
+    chairman = members[0]
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = {"conversation": [], "round": [], **{stage: [] for stage in STAGES}}
+    rounds = 0
+
+    async def one_run(i: int):
+        nonlocal rounds
+        async with semaphore:
+            conversation_id = str(uuid.uuid4())
+            storage.create_conversation(conversation_id, "agentic")
+            turn = storage.begin_turn(conversation_id, f"Agentic benchmark question {i}?", {
+                "members": members,
+                "chairman": chairman,
+                "round": 1,
+            })
+            llm_client.set_schedule_context(conversation_id)
+
+            with timeline.span("conversation") as root, usage.track() as spent:
+                async for event in run_agentic_council(turn, conversation_id, spent):
+                    if event.get("type") == "error":
+                        raise RuntimeError(event["message"])
+            samples["conversation"].append(root.end - root.start)
+            for round_span in root.children:
+                if round_span.name != "round" or round_span.end is None:
+                    continue
+                rounds += 1
+                samples["round"].append(round_span.end - round_span.start)
+                for stage, duration in _stage_durations(round_span).items():
+                    samples[stage].append(duration)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_run(i) for i in range(runs)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": round(runs / elapsed, 4),
+        "round_throughput": round(rounds / elapsed, 4),
+        "wall_seconds": round(elapsed, 3),
+        **{name: summarize(values) for name, values in samples.items()},
+    }
+
+
+def bench_storage(conversations: int, turns: int, council_size: int) -> Dict[str, Any]:
+    """Time storage writes, reads and listing for realistically sized conversations."""
+    from backend import storage
+
+    answer = "lorem ipsum " * 400
+    stage1 = [{"model": f"m{i}", "persona_name": f"m{i}", "response": answer} for i in range(council_size)]
+    stage2 = [{"model": f"m{i}", "persona_name": f"m{i}", "ranking": answer, "parsed_ranking": []} for i in range(council_size)]
+    stage3 = {"model": "m0", "persona_name": "m0", "response": answer}
+
+    ids = [str(uuid.uuid4()) for _ in range(conversations)]
+    samples = {"create": [], "add_user_message": [], "add_assistant_message": [], "get": [], "list": []}
+
+    def timed(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        samples[name].append(time.perf_counter() - start)
+        return result
+
+    for conversation_id in ids:
+        timed("create", storage.create_conversation, conversation_id)
+        for turn in range(turns):
+            timed("add_user_message", storage.add_user_message, conversation_id, f"question {turn}")
+            timed("add_assistant_message", storage.add_assistant_message, conversation_id, stage1, stage2, stage3, {})
+
+    for conversation_id in ids:
+        timed("get", storage.get_conversation, conversation_id)
+    for _ in range(5):
+        timed("list", storage.list_conversations)
+
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+async def run_suite(args: argparse.Namespace, profile: FakeProfile) -> Dict[str, Any]:
+    async with running_fake_provider(profile, port=args.port) as fake_url:
+        prepare_backend_environment(fake_url)
+
+        from backend import llm_client
+        if args.host_concurrency:
+            llm_client.OLLAMA_CONCURRENCY = args.host_concurrency
+            llm_client.OPENROUTER_CONCURRENCY = args.host_concurrency
+
+        results: Dict[str, Any] = {}
+        suites = set(args.suites.split(","))
+
+        for size in _parse_ints(args.sizes):
+            for concurrency in _parse_ints(args.concurrency):
+                if "full" in suites:
+                    key = f"full_council/size={size}/concurrency={concurrency}"
+                    print(f"Running {key} ...", flush=True)
+                    results[key] = await bench_full_council(size, concurrency, args.runs, args.provider)
+                if "agentic" in suites:
+                    key = f"agentic/size={size}/concurrency={concurrency}"
+                    print(f"Running {key} ...", flush=True)
+                    results[key] = await bench_agentic(size, concurrency, max(1, args.runs // 4), args.provider)
+
+        if "storage" in suites:
+            for size in _parse_ints(args.storage_conversations):
+                key = f"storage/conversations={size}"
+                print(f"Running {key} ...", flush=True)
+                results[key] = bench_storage(size, args.storage_turns, max(_parse_ints(args.sizes)))
+
+        return results
+
+
+def print_results(results: Dict[str, Any]):
+    for key, result in results.items():
+        print(f"\n{key}")
+        for name, value in result.items():
+            if isinstance(value, dict) and value.get("count"):
+                print(f"  {name:<24} p50={value['p50'] * 1000:.1f}ms  p95={value['p95'] * 1000:.1f}ms  "
+                      f"p99={value['p99'] * 1000:.1f}ms  (n={value['count']})")
+            elif not isinstance(value, dict):
+                print(f"  {name:<24} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quorum council benchmarks against a fake provider")
+    parser.add_argument("--suites", default="full,agentic,storage", help="Comma-separated: full, agentic, storage")
+    parser.add_argument("--sizes", default="2,4,8", help="Council sizes")
+    parser.add_argument("--concurrency", default="1,4", help="Concurrent council runs")
+    parser.add_argument("--runs", type=int, default=8, help="Council runs per configuration")
+    parser.add_argument("--provider", choices=["ollama", "openrouter"], default="ollama")
+    parser.add_argument("--host-concurrency", type=int, default=None,
+                        help="Override the scheduler's per-host slot count")
+    parser.add_argument("--storage-conversations", default="100,500", help="Conversation counts for the storage suite")
+    parser.add_argument("--storage-turns", type=int, default=5, help="Turns per conversation in the storage suite")
+    parser.add_argument("--port", type=int, default=11435, help="Port for the fake provider")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/council-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline results file to compare against")
+    add_profile_arguments(parser)
+    parser.set_defaults(latency="fixed:0.05", tps=400.0, output_tokens=120)
+    args = parser.parse_args()
+
+    profile = profile_from_args(args)
+    results = asyncio.run(run_suite(args, profile))
+    print_results(results)
+
+    path = save_results("council", results, {"args": vars(args), "profile": asdict(profile)}, args.output)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        print(f"\nComparison with {args.compare}:")
+        lines = compare_results(args.compare, results)
+        for line in lines:
+            print(f"  {line}")
+        if not lines:
+            print("  No configurations in common with the baseline")
+
+
+if __name__ == "__main__":
+    main()
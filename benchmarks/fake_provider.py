@@ -0,0 +1,295 @@
+"""
+Fake Ollama / OpenRouter server for benchmarks and load tests.
+
+Serves the subset of both APIs that the backend uses, with configurable
+latency distributions, generation speed, failure rates and streaming, so
+council performance can be measured without a GPU or API credits.
+
+Run standalone:
+    python -m benchmarks.fake_provider --port 11435 --latency lognormal:0.8:0.4 --tps 40
+
+then point the backend at it:
+    OLLAMA_BASE_URL=http://127.0.0.1:11435/api/chat \\
+    OPENROUTER_API_URL=http://127.0.0.1:11435/api/v1/chat/completions \\
+    uv run python -m backend.main
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FILLER_WORDS = (
+    "the council considered several angles and found that the answer depends on "
+    "context evidence and tradeoffs between accuracy depth clarity and cost"
+).split()
+
+
+@dataclass
+class FakeProfile:
+    """Behaviour of the fake provider."""
+    # Time before the first token: "fixed:S", "uniform:LO:HI",
+    # "lognormal:MEDIAN:SIGMA" or "exponential:MEAN" (seconds)
+    latency: str = "fixed:0.2"
+    # Decode speed and answer length
+    tokens_per_second: float = 50.0
+    output_tokens: int = 200
+    # Probability that a request fails with HTTP 500
+    failure_rate: float = 0.0
+    # Tokens per streamed chunk when the client asks for streaming
+    chunk_tokens: int = 4
+    # Commentary judges keep generating after their FINAL RANKING
+    trailing_tokens: int = 0
+    # Random seed for reproducible runs (None for nondeterministic)
+    seed: Optional[int] = None
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Sample a first-token latency in seconds from a distribution spec."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(":") if v]
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return median * rng.lognormvariate(0.0, sigma)
+    if kind == "exponential":
+        return rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _last_user_text(messages: List[Dict[str, str]]) -> str:
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            return msg.get("content") or ""
+    return ""
+
+
+def generate_answer(messages: List[Dict[str, str]], profile: FakeProfile, rng: random.Random) -> List[str]:
+    """
+    Produce an answer as a list of tokens.
+
+    Ranking prompts get an evaluation followed by a well-formed FINAL RANKING
+    over the labels in the prompt, so Stage 2 parsing behaves as with real
+    judges. Title prompts get a short title.
+    """
+    prompt = _last_user_text(messages)
+
+    if "Generate a very short title" in prompt:
+        return ["Fake", " Council", " Title"]
+
+    words = [rng.choice(FILLER_WORDS) for _ in range(profile.output_tokens)]
+    tokens = [(" " if i else "") + w for i, w in enumerate(words)]
+
+    labels = sorted(set(re.findall(r"Response ([A-Z]):", prompt)))
+    if "FINAL RANKING:" in prompt and labels:
+        rng.shuffle(labels)
+        tokens.append("\n\nFINAL RANKING:")
+        for position, label in enumerate(labels, start=1):
+            tokens.append(f"\n{position}. Response {label}")
+        tokens.append("\n\n")
+        tokens += [(" " if i else "") + rng.choice(FILLER_WORDS) for i in range(profile.trailing_tokens)]
+    return tokens
+
+
+def apply_stop(tokens: List[str], stop: Optional[List[str]]) -> List[str]:
+    """Cut the answer at the first stop sequence, as providers do."""
+    if not stop:
+        return tokens
+    text = ""
+    for i, token in enumerate(tokens):
+        text += token
+        if any(s in text for s in stop):
+            return tokens[:i]
+    return tokens
+
+
+def create_app(profile: FakeProfile) -> FastAPI:
+    """Create the fake provider app for a profile."""
+    app = FastAPI(title="Fake LLM provider")
+    rng = random.Random(profile.seed)
+    stats = {"requests": 0, "failures": 0, "active": 0, "max_active": 0}
+
+    async def begin() -> Optional[JSONResponse]:
+        """Count the request and decide whether it fails."""
+        stats["requests"] += 1
+        if rng.random() < profile.failure_rate:
+            stats["failures"] += 1
+            await asyncio.sleep(sample_latency(profile.latency, rng) / 4)
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        return None
+
+    async def token_stream(tokens: List[str]):
+        """Yield chunks of tokens paced at the profile's decode speed."""
+        stats["active"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            await asyncio.sleep(sample_latency(profile.latency, rng))
+            step = max(1, profile.chunk_tokens)
+            for i in range(0, len(tokens), step):
+                chunk = tokens[i:i + step]
+                await asyncio.sleep(len(chunk) / profile.tokens_per_second)
+                yield "".join(chunk)
+        finally:
+            stats["active"] -= 1
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [
+            {"name": "fake-small:latest", "size": 2_000_000_000,
+             "details": {"parameter_size": "3B", "quantization_level": "Q4_K_M", "family": "fake"}},
+            {"name": "fake-large:latest", "size": 12_000_000_000,
+             "details": {"parameter_size": "20B", "quantization_level": "Q8_0", "family": "fake"}},
+        ]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": [{"name": "fake-small:latest"}]}
+
+    @app.post("/api/show")
+    async def show(request: Request):
+        body = await request.json()
+        return {"model_info": {"fake.context_length": 32768}, "details": {"family": "fake"},
+                "name": body.get("model") or body.get("name")}
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        failure = await begin()
+        if failure:
+            return failure
+
+        tokens = apply_stop(generate_answer(body.get("messages", []), profile, rng),
+                            (body.get("options") or {}).get("stop"))
+        prompt_tokens = sum(len((m.get("content") or "").split()) for m in body.get("messages", []))
+        started = time.perf_counter_ns()
+
+        def final_fields():
+            return {
+                "done": True,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": len(tokens),
+                "eval_duration": int(len(tokens) / profile.tokens_per_second * 1e9),
+                "total_duration": time.perf_counter_ns() - started,
+            }
+
+        if body.get("stream", True):
+            async def ndjson():
+                async for text in token_stream(tokens):
+                    yield json.dumps({"model": body["model"], "message": {"role": "assistant", "content": text}, "done": False}) + "\n"
+                yield json.dumps({"model": body["model"], "message": {"role": "assistant", "content": ""}, **final_fields()}) + "\n"
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        content = "".join([text async for text in token_stream(tokens)])
+        return {"model": body["model"], "message": {"role": "assistant", "content": content}, **final_fields()}
+
+    @app.get("/api/v1/models")
+    async def openrouter_models():
+        return {"data": [
+            {"id": "fake/remote-small", "name": "Fake Remote Small", "context_length": 128000},
+            {"id": "fake/remote-large", "name": "Fake Remote Large", "context_length": 200000},
+        ]}
+
+    @app.post("/api/v1/chat/completions")
+    async def openrouter_chat(request: Request):
+        body = await request.json()
+        failure = await begin()
+        if failure:
+            return failure
+
+        tokens = apply_stop(generate_answer(body.get("messages", []), profile, rng), body.get("stop"))
+        prompt_tokens = sum(len((m.get("content") or "").split()) for m in body.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+
+        if body.get("stream"):
+            async def sse():
+                async for text in token_stream(tokens):
+                    yield "data: " + json.dumps({"choices": [{"delta": {"content": text}}]}) + "\n\n"
+                yield "data: " + json.dumps({"choices": [{"delta": {}, "finish_reason": "stop"}], "usage": usage}) + "\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(sse(), media_type="text/event-stream")
+
+        content = "".join([text async for text in token_stream(tokens)])
+        return {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "profile": asdict(profile)}
+
+    return app
+
+
+@asynccontextmanager
+async def running_fake_provider(profile: FakeProfile, host: str = "127.0.0.1", port: int = 11435):
+    """
+    Run the fake provider on the current event loop for the duration of the block.
+
+    Yields:
+        The server's base URL
+    """
+    config = uvicorn.Config(create_app(profile), host=host, port=port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add FakeProfile options to an argument parser."""
+    defaults = FakeProfile()
+    parser.add_argument("--latency", default=defaults.latency,
+                        help="First-token latency distribution, e.g. fixed:0.2, uniform:0.1:1, lognormal:0.5:0.4")
+    parser.add_argument("--tps", type=float, default=defaults.tokens_per_second, help="Tokens per second")
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens, help="Tokens per answer")
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate, help="Fraction of failing requests")
+    parser.add_argument("--chunk-tokens", type=int, default=defaults.chunk_tokens, help="Tokens per streamed chunk")
+    parser.add_argument("--trailing-tokens", type=int, default=defaults.trailing_tokens,
+                        help="Tokens judges generate after their final ranking")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+
+
+def profile_from_args(args: argparse.Namespace) -> FakeProfile:
+    return FakeProfile(
+        latency=args.latency,
+        tokens_per_second=args.tps,
+        output_tokens=args.output_tokens,
+        failure_rate=args.failure_rate,
+        chunk_tokens=args.chunk_tokens,
+        trailing_tokens=args.trailing_tokens,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama/OpenRouter server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"[{datetime.now():%H:%M:%S}] Fake provider on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
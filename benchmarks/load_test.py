@@ -0,0 +1,333 @@
+"""
+HTTP load test for the FastAPI app.
+
+Runs backend.main:app and the fake provider in-process, then simulates
+concurrent users who create conversations, stream council turns over SSE,
+list conversations, toggle pins and fetch long histories. Reports request
+latencies, SSE time-to-first-event, event-loop lag on the app's loop and
+storage operation latency under contention (from /metrics).
+
+Usage:
+    python -m benchmarks.load_test --users 20 --duration 60
+    python -m benchmarks.load_test --users 50 --history-turns 200 --compare benchmarks/results/load-baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from .common import prepare_backend_environment, summarize, save_results, compare_results
+from .fake_provider import running_fake_provider, add_profile_arguments, profile_from_args
+
+STORAGE_METRIC = "quorum_storage_operation_duration_seconds"
+
+
+class LoadStats:
+    """Latency samples and error counts collected during a run."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.max_scheduler_queued = 0
+
+    def record(self, name: str, seconds: float):
+        self.samples[name].append(seconds)
+
+    def error(self, name: str):
+        self.errors[name] += 1
+
+
+async def monitor_event_loop(stats: LoadStats, stop: asyncio.Event, interval: float = 0.02):
+    """
+    Measure how late the loop wakes a sleeping task.
+
+    The app, the fake provider and the virtual users share this loop, so
+    any blocking call in a request handler (e.g. synchronous file I/O)
+    shows up here as lag.
+    """
+    from backend import llm_client
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stats.record("event_loop_lag", max(0.0, time.perf_counter() - start - interval))
+        for host_stats in llm_client.get_scheduler_stats().values():
+            stats.max_scheduler_queued = max(stats.max_scheduler_queued, host_stats["queued"])
+
+
+async def timed_request(client: httpx.AsyncClient, stats: LoadStats, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        stats.error(name)
+        return None
+    stats.record(name, time.perf_counter() - start)
+    return response
+
+
+async def stream_turn(client: httpx.AsyncClient, stats: LoadStats, conversation_id: str, content: str,
+                      headers: Optional[Dict[str, str]] = None) -> bool:
+    """Send a message over SSE, recording time to first event and to completion."""
+    start = time.perf_counter()
+    first_event = None
+    completed = False
+    try:
+        async with client.stream("POST", f"/api/conversations/{conversation_id}/message/stream",
+                                 json={"content": content}, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = json.loads(line[6:])
+                if event.get("type") == "complete":
+                    completed = True
+                elif event.get("type") == "error":
+                    break
+    except httpx.HTTPError:
+        pass
+
+    if not completed:
+        stats.error("sse_turn")
+        return False
+    stats.record("sse_first_event", first_event)
+    stats.record("sse_turn", time.perf_counter() - start)
+    return True
+
+
+async def virtual_user(client: httpx.AsyncClient, stats: LoadStats, user_id: int, args: argparse.Namespace,
+                       members: List[str], history_ids: List[str], deadline: float):
+    """One simulated user looping through a realistic mix of requests until the deadline."""
+    rng = random.Random(user_id)
+    # Each user is its own client, with its own admission budget
+    headers = {"X-API-Key": f"load-test-user-{user_id}"}
+    turn = 0
+    while time.perf_counter() < deadline:
+        response = await timed_request(client, stats, "create_conversation", "POST", "/api/conversations",
+                                       json={"council_members": members, "chairman_id": members[0]}, headers=headers)
+        if response is None:
+            await asyncio.sleep(1)
+            continue
+        conversation_id = response.json()["id"]
+
+        for _ in range(args.turns):
+            if time.perf_counter() >= deadline:
+                break
+            turn += 1
+            await stream_turn(client, stats, conversation_id, f"User {user_id} question {turn}?", headers)
+
+            await timed_request(client, stats, "list_conversations", "GET", "/api/conversations", headers=headers)
+
+            response = await timed_request(client, stats, "get_conversation", "GET", f"/api/conversations/{conversation_id}",
+                                           headers=headers)
+            if response is not None:
+                messages = response.json()["messages"]
+                if messages:
+                    message_id = rng.choice(messages)["id"]
+                    await timed_request(client, stats, "toggle_pin", "POST",
+                                        f"/api/conversations/{conversation_id}/messages/{message_id}/toggle_pin",
+                                        headers=headers)
+
+            if history_ids:
+                await timed_request(client, stats, "get_long_history", "GET",
+                                    f"/api/conversations/{rng.choice(history_ids)}", headers=headers)
+
+            await asyncio.sleep(rng.uniform(0, args.think_time))
+
+
+def seed_long_histories(count: int, turns: int, council_size: int) -> List[str]:
+    """Create conversations with long histories directly in storage."""
+    from backend import storage
+
+    answer = "lorem ipsum " * 300
+    stage1 = [{"model": f"m{i}", "persona_name": f"m{i}", "response": answer} for i in range(council_size)]
+    stage2 = [{"model": f"m{i}", "persona_name": f"m{i}", "ranking": answer, "parsed_ranking": []} for i in range(council_size)]
+    stage3 = {"model": "m0", "persona_name": "m0", "response": answer}
+
+    ids = []
+    for _ in range(count):
+        conversation = storage.create_conversation(str(uuid.uuid4()))
+        for turn in range(turns):
+            conversation["messages"].append({"id": str(uuid.uuid4()), "role": "user", "content": f"question {turn}"})
+            conversation["messages"].append({"id": str(uuid.uuid4()), "role": "assistant",
+                                             "stage1": stage1, "stage2": stage2, "stage3": stage3})
+        storage.save_conversation(conversation)
+        ids.append(conversation["id"])
+    return ids
+
+
+def parse_histogram(text: str, name: str) -> Dict[str, Dict[str, Any]]:
+    """Parse a labelled histogram from Prometheus text into {operation: {buckets, count, sum}}."""
+    result: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"buckets": {}, "count": 0.0, "sum": 0.0})
+    pattern = re.compile(rf'^{name}_(bucket|count|sum)\{{operation="([^"]*)"(?:,le="([^"]*)")?\}} (\S+)$')
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if not match:
+            continue
+        kind, operation, le, value = match.groups()
+        if kind == "bucket":
+            result[operation]["buckets"][float(le)] = float(value)
+        else:
+            result[operation][kind] = float(value)
+    return result
+
+
+def histogram_quantile(buckets: Dict[float, float], q: float) -> float:
+    """Estimate a quantile from cumulative bucket counts, interpolating within the bucket."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if not total:
+        return 0.0
+    rank = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / max(count - lower_count, 1e-9)
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+def storage_contention(before: str, after: str) -> Dict[str, Any]:
+    """Storage latency per operation over the run, from /metrics snapshots."""
+    old = parse_histogram(before, STORAGE_METRIC)
+    new = parse_histogram(after, STORAGE_METRIC)
+    report = {}
+    for operation, state in new.items():
+        base = old.get(operation, {"buckets": {}, "count": 0.0, "sum": 0.0})
+        count = state["count"] - base["count"]
+        if count <= 0:
+            continue
+        buckets = {b: v - base["buckets"].get(b, 0.0) for b, v in state["buckets"].items()}
+        report[operation] = {
+            "count": int(count),
+            "mean": round((state["sum"] - base["sum"]) / count, 5),
+            "p50": round(histogram_quantile(buckets, 0.50), 5),
+            "p95": round(histogram_quantile(buckets, 0.95), 5),
+            "p99": round(histogram_quantile(buckets, 0.99), 5),
+        }
+    return report
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    profile = profile_from_args(args)
+    async with running_fake_provider(profile, port=args.provider_port) as fake_url:
+        prepare_backend_environment(fake_url)
+
+        from backend.main import app
+
+        history_ids = seed_long_histories(args.history_conversations, args.history_turns, args.council_size)
+        for _ in range(args.background_conversations):
+            seed_long_histories(1, 2, args.council_size)
+
+        config = uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        stats = LoadStats()
+        stop = asyncio.Event()
+        members = [f"ollama/fake-{i}" for i in range(args.council_size)]
+        limits = httpx.Limits(max_connections=args.users * 4, max_keepalive_connections=args.users * 2)
+
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits,
+                                         timeout=httpx.Timeout(args.request_timeout)) as client:
+                metrics_before = (await client.get("/metrics")).text
+                monitor = asyncio.create_task(monitor_event_loop(stats, stop))
+
+                start = time.perf_counter()
+                deadline = start + args.duration
+                # Stagger arrivals over the ramp-up period
+                users = []
+                for user_id in range(args.users):
+                    users.append(asyncio.create_task(
+                        virtual_user(client, stats, user_id, args, members, history_ids, deadline)))
+                    await asyncio.sleep(args.ramp_up / max(1, args.users))
+                await asyncio.gather(*users)
+                elapsed = time.perf_counter() - start
+
+                stop.set()
+                await monitor
+                metrics_after = (await client.get("/metrics")).text
+        finally:
+            server.should_exit = True
+            await server_task
+
+    completed_turns = len(stats.samples["sse_turn"])
+    return {
+        "throughput": round(completed_turns / elapsed, 4),
+        "wall_seconds": round(elapsed, 3),
+        "errors": dict(stats.errors),
+        "max_scheduler_queued": stats.max_scheduler_queued,
+        "latency": {name: summarize(values) for name, values in sorted(stats.samples.items())},
+        "storage": storage_contention(metrics_before, metrics_after),
+    }
+
+
+def print_results(results: Dict[str, Any]):
+    print(f"\nCompleted turns/s: {results['throughput']}  (wall {results['wall_seconds']}s)")
+    print(f"Errors: {results['errors'] or 'none'}")
+    print(f"Max queued model calls: {results['max_scheduler_queued']}")
+    for section in ("latency", "storage"):
+        print(f"\n{section}")
+        for name, value in results[section].items():
+            if value.get("count"):
+                print(f"  {name:<22} p50={value['p50'] * 1000:.1f}ms  p95={value['p95'] * 1000:.1f}ms  "
+                      f"p99={value['p99'] * 1000:.1f}ms  (n={value['count']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test for the Quorum API against a fake provider")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Test duration in seconds")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which users arrive")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per conversation before starting a new one")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Max random pause between turns (seconds)")
+    parser.add_argument("--council-size", type=int, default=3, help="Council members per conversation")
+    parser.add_argument("--history-conversations", type=int, default=5, help="Seeded long-history conversations")
+    parser.add_argument("--history-turns", type=int, default=100, help="Turns in each long-history conversation")
+    parser.add_argument("--background-conversations", type=int, default=200,
+                        help="Extra short conversations seeded so listing has realistic cost")
+    parser.add_argument("--request-timeout", type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--port", type=int, default=8011, help="Port for the app under test")
+    parser.add_argument("--provider-port", type=int, default=11436, help="Port for the fake provider")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline results file to compare against")
+    add_profile_arguments(parser)
+    parser.set_defaults(latency="lognormal:0.3:0.5", tps=200.0, output_tokens=150)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(args))
+    print_results(results)
+
+    path = save_results("load", results, {"args": vars(args), "profile": asdict(profile_from_args(args))}, args.output)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        print(f"\nComparison with {args.compare}:")
+        lines = compare_results(args.compare, results)
+        for line in lines:
+            print(f"  {line}")
+        if not lines:
+            print("  Nothing in common with the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import Sidebar from './components/Sidebar';
 import ChatInterface from './components/ChatInterface';
 import PersonaManager from './components/PersonaManager';
@@ -15,6 +15,8 @@ function App() {
   const [currentConversationId, setCurrentConversationId] = useState(null);
   const [currentConversation, setCurrentConversation] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
+  // Conversation whose council run this page is streaming, if any
+  const streamingConversationRef = useRef(null);
 
   // Dialog states
   const [isPersonaManagerOpen, setIsPersonaManagerOpen] = useState(false);
@@ -27,10 +29,14 @@ function App() {
     loadConversations();
   }, []);
 
-  // Load conversation details when selected
+  // Load conversation details when selected, following its run if one is still going
   useEffect(() => {
     if (currentConversationId) {
-      loadConversation(currentConversationId);
+      loadConversation(currentConversationId).then((conv) => {
+        if (conv?.pending_turn?.status === 'running') {
+          reattachToRun(conv);
+        }
+      });
     }
   }, [currentConversationId]);
 
@@ -56,8 +62,79 @@ function App() {
         }
         return conv;
       });
+      return conv;
     } catch (error) {
       console.error('Failed to load conversation:', error);
+      return null;
+    }
+  };
+
+  // A run still going when the page was (re)loaded is followed again,
+  // replaying its events, before its turn is offered for resuming
+  const reattachToRun = async (conv) => {
+    if (streamingConversationRef.current === conv.id) return;
+    streamingConversationRef.current = conv.id;
+    setIsLoading(true);
+
+    setCurrentConversation((prev) => ({
+      ...prev,
+      messages: [...prev.messages, {
+        role: 'assistant',
+        stage1: null,
+        stage2: null,
+        stage3: null,
+        metadata: null,
+        loading: {
+          stage1: false,
+          stage2: false,
+          stage3: false,
+        },
+      }],
+    }));
+
+    // Agentic rounds stored before the reload are replayed too: their
+    // follow-up questions are already shown, so each one only starts the
+    // placeholder over for the next round
+    const storedQuestions = new Set(conv.messages.filter((m) => m.role === 'user').map((m) => m.content));
+    const handleReplayEvent = (eventType, event) => {
+      if (event.role === 'user' && storedQuestions.has(event.content)) {
+        setCurrentConversation((prev) => ({
+          ...prev,
+          messages: [...prev.messages.slice(0, -1), {
+            role: 'assistant',
+            stage1: null,
+            stage2: null,
+            stage3: null,
+            metadata: null,
+            loading: {
+              stage1: false,
+              stage2: false,
+              stage3: false,
+            },
+          }],
+        }));
+        return;
+      }
+      if (eventType === 'complete' || eventType === 'title_complete' || eventType === 'cancelled') {
+        event.conversationId = conv.id;
+      }
+      handleStreamEvent(eventType, event);
+    };
+
+    try {
+      await api.reattachStream(conv.id, handleReplayEvent);
+    } catch (error) {
+      console.error('Failed to reattach to council run:', error);
+    } finally {
+      streamingConversationRef.current = null;
+      setIsLoading(false);
+      // Show what the run stored, or its interrupted turn with Resume
+      try {
+        const latest = await api.getConversation(conv.id);
+        setCurrentConversation((prev) => (prev && prev.id === conv.id ? latest : prev));
+      } catch (error) {
+        console.error('Failed to load conversation:', error);
+      }
     }
   };
 
@@ -120,15 +197,18 @@ function App() {
       // Create a wrapper that captures the conversation ID
       const handleStreamEventWithId = (eventType, event) => {
         // Add conversationId to the event for the complete handler
-        if (eventType === 'complete' || eventType === 'title_complete') {
+        if (eventType === 'complete' || eventType === 'title_complete' || eventType === 'cancelled') {
           event.conversationId = currentConversationId;
         }
         handleStreamEvent(eventType, event);
       };
+      streamingConversationRef.current = currentConversationId;
       await api.sendMessageStream(currentConversationId, content, handleStreamEventWithId);
     } catch (error) {
       console.error('Failed to re-run conversation:', error);
       setIsLoading(false);
+    } finally {
+      streamingConversationRef.current = null;
     }
   };
 
@@ -273,6 +353,27 @@ function App() {
         setIsLoading(false);
         break;
 
+      case 'cancelled': {
+        console.log('Council run cancelled:', event.message);
+        setIsLoading(false);
+        // Show the stopped turn as stored, with Resume and Discard
+        const cancelledId = event.conversationId || currentConversationId;
+        if (cancelledId) {
+          api.getConversation(cancelledId)
+            .then((latest) => setCurrentConversation((prev) => (prev && prev.id === latest.id ? latest : prev)))
+            .catch((error) => console.error('Failed to load conversation:', error));
+        }
+        break;
+      }
+
+      case 'budget_exceeded':
+        // Either the council continues on a cheaper model or the run ends here
+        console.warn('Conversation over budget:', event.data);
+        if (event.data.action === 'stop') {
+          setIsLoading(false);
+        }
+        break;
+
       default:
         // Handle new message types for Agentic Council
         // If we receive a full message object, append it
@@ -410,11 +511,12 @@ function App() {
       // Create a wrapper that captures the conversation ID
       const handleStreamEventWithId = (eventType, event) => {
         // Add conversationId to the event for the complete handler
-        if (eventType === 'complete' || eventType === 'title_complete') {
+        if (eventType === 'complete' || eventType === 'title_complete' || eventType === 'cancelled') {
           event.conversationId = targetId;
         }
         handleStreamEvent(eventType, event);
       };
+      streamingConversationRef.current = targetId;
       await api.sendMessageStream(targetId, content, handleStreamEventWithId);
     } catch (error) {
       console.error('Failed to send message:', error);
@@ -424,6 +526,89 @@ function App() {
         messages: prev.messages.slice(0, -2),
       }));
       setIsLoading(false);
+    } finally {
+      streamingConversationRef.current = null;
+    }
+  };
+
+  const handleResumeTurn = async () => {
+    if (!currentConversationId || !currentConversation?.pending_turn) return;
+
+    setIsLoading(true);
+    try {
+      // Completed stages are replayed from the checkpoint, the rest are streamed
+      const assistantMessage = {
+        role: 'assistant',
+        stage1: null,
+        stage2: null,
+        stage3: null,
+        metadata: null,
+        loading: {
+          stage1: false,
+          stage2: false,
+          stage3: false,
+        },
+      };
+
+      setCurrentConversation((prev) => ({
+        ...prev,
+        pending_turn: null,
+        messages: [...prev.messages, assistantMessage],
+      }));
+
+      const handleStreamEventWithId = (eventType, event) => {
+        if (eventType === 'complete' || eventType === 'title_complete' || eventType === 'cancelled') {
+          event.conversationId = currentConversationId;
+        }
+        handleStreamEvent(eventType, event);
+      };
+      streamingConversationRef.current = currentConversationId;
+      await api.resumeTurnStream(currentConversationId, handleStreamEventWithId);
+    } catch (error) {
+      console.error('Failed to resume turn:', error);
+      setIsLoading(false);
+      await loadConversation(currentConversationId);
+    } finally {
+      streamingConversationRef.current = null;
+    }
+  };
+
+  const handleCancelRun = async () => {
+    const conversationId = streamingConversationRef.current;
+    if (!conversationId) return;
+    try {
+      // The stream then ends with a 'cancelled' event
+      await api.cancelMessage(conversationId);
+    } catch (error) {
+      console.error('Failed to cancel council run:', error);
+    }
+  };
+
+  const handleDiscardTurn = async () => {
+    if (!currentConversationId) return;
+    try {
+      await api.discardPendingTurn(currentConversationId);
+      const conv = await api.getConversation(currentConversationId);
+      setCurrentConversation(conv);
+    } catch (error) {
+      console.error('Failed to discard turn:', error);
+    }
+  };
+
+  const handleRegenerate = async (messageId, target, member) => {
+    if (!currentConversationId) return;
+
+    setIsLoading(true);
+    try {
+      const message = await api.regenerateMessage(currentConversationId, messageId, target, member);
+      setCurrentConversation((prev) => ({
+        ...prev,
+        messages: prev.messages.map((m) => (m.id === messageId ? message : m)),
+      }));
+    } catch (error) {
+      console.error('Failed to regenerate:', error);
+    } finally {
+      setIsLoading(false);
     }
   };
 
@@ -492,6 +677,10 @@ function App() {
               onSendMessage={handleSendMessage}
               isLoading={isLoading}
               onReRun={handleReRun}
+              onResumeTurn={handleResumeTurn}
+              onDiscardTurn={handleDiscardTurn}
+              onCancelRun={handleCancelRun}
+              onRegenerate={handleRegenerate}
               onTogglePin={async (messageId) => {
                 try {
                   const result = await api.toggleMessagePin(currentConversationId, messageId);
@@ -4,16 +4,75 @@
 
 const API_BASE = 'http://localhost:8001';
 
+// url -> { etag, body } of the last successful conditional GET
+const responseCache = new Map();
+
+/**
+ * GET a JSON resource with If-None-Match, reusing the cached body on 304.
+ * Unchanged resources cost the server a stat and transfer no body.
+ */
+async function getJsonConditional(url, errorMessage) {
+  const cached = responseCache.get(url);
+  const response = await fetch(url, {
+    cache: 'no-store',
+    headers: cached ? { 'If-None-Match': cached.etag } : {},
+  });
+  if (response.status === 304 && cached) {
+    return cached.body;
+  }
+  if (!response.ok) {
+    throw new Error(errorMessage);
+  }
+  const body = await response.json();
+  const etag = response.headers.get('ETag');
+  if (etag) {
+    responseCache.set(url, { etag, body });
+  } else {
+    responseCache.delete(url);
+  }
+  return body;
+}
+
+// User API key this browser sends with council runs and settings changes.
+// The backend never returns it, so it is kept locally once entered in Settings.
+const USER_API_KEY_STORAGE = 'userApiKey';
+
+function getUserApiKey() {
+  return localStorage.getItem(USER_API_KEY_STORAGE) || '';
+}
+
+function councilHeaders(apiKey = getUserApiKey()) {
+  const headers = { 'Content-Type': 'application/json' };
+  if (apiKey) {
+    headers['X-API-Key'] = apiKey;
+  }
+  return headers;
+}
+
+/**
+ * Error for a refused council run, including the server's reason and
+ * Retry-After when it was rate limited (429) or the queue was full (503).
+ */
+async function councilError(response, message = 'Failed to send message') {
+  if (![401, 403, 429, 503].includes(response.status)) {
+    return new Error(message);
+  }
+  const { detail } = await response.json().catch(() => ({}));
+  const retryAfter = response.headers.get('Retry-After');
+  const error = new Error(
+    `${detail || message}${retryAfter ? ` (retry in ${retryAfter}s)` : ''}`
+  );
+  error.status = response.status;
+  error.retryAfter = retryAfter ? Number(retryAfter) : null;
+  return error;
+}
+
 export const api = {
   /**
    * List all conversations.
    */
   async listConversations() {
-    const response = await fetch(`${API_BASE}/api/conversations`);
-    if (!response.ok) {
-      throw new Error('Failed to list conversations');
-    }
-    return response.json();
+    return getJsonConditional(`${API_BASE}/api/conversations`, 'Failed to list conversations');
   },
 
   /**
@@ -65,7 +124,7 @@ export const api = {
   /**
    * Create a new persona.
    */
-  async createPersona(name, modelId, systemPrompt, avatarColor) {
+  async createPersona(name, modelId, systemPrompt, avatarColor, inference = null) {
     const response = await fetch(`${API_BASE}/api/personas`, {
       method: 'POST',
       headers: {
@@ -76,6 +135,7 @@ export const api = {
         model_id: modelId,
         system_prompt: systemPrompt,
         avatar_color: avatarColor,
+        inference,
       }),
     });
     if (!response.ok) {
@@ -84,6 +144,24 @@ export const api = {
     return response.json();
   },
 
+  /**
+   * Update fields of a persona, e.g. its inference profile
+   * ({ num_ctx, num_predict, temperature, keep_alive, num_thread, max_tokens }).
+   */
+  async updatePersona(personaId, changes) {
+    const response = await fetch(`${API_BASE}/api/personas/${personaId}`, {
+      method: 'PUT',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(changes),
+    });
+    if (!response.ok) {
+      throw new Error('Failed to update persona');
+    }
+    return response.json();
+  },
+
   /**
    * Delete a persona.
    */
@@ -104,12 +182,28 @@ export const api = {
     const response = await fetch(`${API_BASE}/api/conversations/${conversationId}`, {
       method: 'DELETE',
     });
+    responseCache.delete(`${API_BASE}/api/conversations/${conversationId}`);
     if (!response.ok) {
       throw new Error('Failed to delete conversation');
     }
     return response.json();
   },
 
+  /**
+   * Full-text search over conversations and council answers.
+   * @param {string} query - Free text; the last word matches as a prefix
+   * @param {number} limit - Results per page
+   * @param {number} offset - Results to skip
+   */
+  async search(query, limit = 20, offset = 0) {
+    const params = new URLSearchParams({ q: query, limit, offset });
+    const response = await fetch(`${API_BASE}/api/search?${params}`);
+    if (!response.ok) {
+      throw new Error('Failed to search');
+    }
+    return response.json();
+  },
+
   /**
    * Get settings.
    */
@@ -122,18 +216,30 @@ export const api = {
   },
 
   /**
-   * Update settings.
+   * The user API key this browser sends ('' if none).
+   */
+  getUserApiKey,
+
+  /**
+   * Update settings. A user_api_key in `settings` changes the server's key
+   * and becomes this browser's key; the request is authorized with the
+   * previous local key, or the new one while there is none.
    */
   async updateSettings(settings) {
     const response = await fetch(`${API_BASE}/api/settings`, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: councilHeaders(getUserApiKey() || settings.user_api_key),
       body: JSON.stringify(settings),
     });
     if (!response.ok) {
-      throw new Error('Failed to update settings');
+      throw await councilError(response, 'Failed to update settings');
+    }
+    if (settings.user_api_key !== undefined) {
+      if (settings.user_api_key) {
+        localStorage.setItem(USER_API_KEY_STORAGE, settings.user_api_key);
+      } else {
+        localStorage.removeItem(USER_API_KEY_STORAGE);
+      }
     }
     return response.json();
   },
@@ -142,13 +248,10 @@ export const api = {
    * Get a specific conversation.
    */
   async getConversation(conversationId) {
-    const response = await fetch(
-      `${API_BASE}/api/conversations/${conversationId}`
+    return getJsonConditional(
+      `${API_BASE}/api/conversations/${conversationId}`,
+      'Failed to get conversation'
     );
-    if (!response.ok) {
-      throw new Error('Failed to get conversation');
-    }
-    return response.json();
   },
 
   /**
@@ -159,14 +262,12 @@ export const api = {
       `${API_BASE}/api/conversations/${conversationId}/message`,
       {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
+        headers: councilHeaders(),
         body: JSON.stringify({ content }),
       }
     );
     if (!response.ok) {
-      throw new Error('Failed to send message');
+      throw await councilError(response);
     }
     return response.json();
   },
@@ -187,6 +288,42 @@ export const api = {
     return response.json();
   },
 
+  /**
+   * Regenerate one Stage 1 member ('stage1'), the Stage 2 rankings ('stage2',
+   * optionally one judge's) or Stage 3 ('stage3') of a stored answer.
+   * Returns the updated message.
+   */
+  async regenerateMessage(conversationId, messageId, target, member = null) {
+    const response = await fetch(
+      `${API_BASE}/api/conversations/${conversationId}/messages/${messageId}/regenerate`,
+      {
+        method: 'POST',
+        headers: councilHeaders(),
+        body: JSON.stringify({ target, member }),
+      }
+    );
+    if (!response.ok) {
+      throw await councilError(response);
+    }
+    return response.json();
+  },
+
+  /**
+   * Cancel the council run in progress for a conversation.
+   */
+  async cancelMessage(conversationId) {
+    const response = await fetch(
+      `${API_BASE}/api/conversations/${conversationId}/cancel`,
+      {
+        method: 'POST',
+      }
+    );
+    if (!response.ok) {
+      throw new Error('Failed to cancel message');
+    }
+    return response.json();
+  },
+
   /**
    * Send a message and receive streaming updates.
    * @param {string} conversationId - The conversation ID
@@ -196,41 +333,196 @@ export const api = {
    */
   async sendMessageStream(conversationId, content, onEvent) {
     const response = await fetch(
-      `${API_BASE}/api/conversations/${conversationId}/message/stream`,
+      `${API_BASE}/api/conversations/${conversationId}/message/stream?protocol=2`,
       {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
+        headers: councilHeaders(),
         body: JSON.stringify({ content }),
       }
     );
 
     if (!response.ok) {
-      throw new Error('Failed to send message');
+      throw await councilError(response);
     }
 
-    const reader = response.body.getReader();
-    const decoder = new TextDecoder();
+    await followRunStream(conversationId, response, onEvent);
+  },
 
-    while (true) {
-      const { done, value } = await reader.read();
-      if (done) break;
+  /**
+   * Resume an interrupted turn from its checkpoint, streaming like sendMessageStream.
+   */
+  async resumeTurnStream(conversationId, onEvent) {
+    const response = await fetch(
+      `${API_BASE}/api/conversations/${conversationId}/resume/stream?protocol=2`,
+      {
+        method: 'POST',
+        headers: councilHeaders(),
+      }
+    );
 
-      const chunk = decoder.decode(value);
-      const lines = chunk.split('\n');
+    if (!response.ok) {
+      throw await councilError(response);
+    }
 
-      for (const line of lines) {
-        if (line.startsWith('data: ')) {
-          const data = line.slice(6);
-          try {
-            const event = JSON.parse(data);
-            onEvent(event.type, event);
-          } catch (e) {
-            console.error('Failed to parse SSE event:', e);
-          }
-        }
+    await followRunStream(conversationId, response, onEvent);
+  },
+
+  /**
+   * Reattach to the conversation's council run, if one is still going
+   * (e.g. after a page reload), replaying its events from the start.
+   * @returns {Promise<boolean>} false if the conversation has no active run
+   */
+  async reattachStream(conversationId, onEvent) {
+    const response = await openRunStream(conversationId, null, 0);
+    if (response.status === 404) {
+      return false;
+    }
+    if (!response.ok) {
+      throw new Error('Failed to reattach to council run');
+    }
+    await followRunStream(conversationId, response, onEvent);
+    return true;
+  },
+
+  /**
+   * Discard an interrupted turn and its unanswered message.
+   */
+  async discardPendingTurn(conversationId) {
+    const response = await fetch(
+      `${API_BASE}/api/conversations/${conversationId}/pending_turn`,
+      {
+        method: 'DELETE',
       }
+    );
+    if (!response.ok) {
+      throw new Error('Failed to discard turn');
     }
+    return response.json();
   },
 };
+
+// Reconnects of a council run stream that dropped before the run ended;
+// the count starts over whenever a reconnect delivers new events
+const STREAM_RECONNECT_ATTEMPTS = 5;
+const STREAM_RECONNECT_DELAY_MS = 1000;
+
+/**
+ * Open the reattach stream of a council run (the conversation's active
+ * one without jobId), replaying the events after lastEventId.
+ */
+function openRunStream(conversationId, jobId, lastEventId) {
+  const params = new URLSearchParams({ protocol: 2 });
+  if (jobId) {
+    params.set('job_id', jobId);
+  }
+  return fetch(`${API_BASE}/api/conversations/${conversationId}/stream?${params}`, {
+    headers: { 'Last-Event-ID': String(lastEventId) },
+  });
+}
+
+/**
+ * Read a council run stream to the end of the run. If the connection drops
+ * first, reattach through the stream endpoint with Last-Event-ID, so no
+ * event is lost or delivered twice.
+ */
+async function followRunStream(conversationId, response, onEvent) {
+  const jobId = response.headers.get('X-Job-Id');
+  const stream = { lastEventId: 0, ended: false, stagePayloads: new Map() };
+  try {
+    await readEventStream(response, onEvent, stream);
+  } catch (e) {
+    console.warn('Council run stream dropped:', e);
+  }
+
+  let attempts = 0;
+  while (!stream.ended && jobId && attempts < STREAM_RECONNECT_ATTEMPTS) {
+    attempts += 1;
+    await new Promise((resolve) => setTimeout(resolve, STREAM_RECONNECT_DELAY_MS));
+    const seen = stream.lastEventId;
+    try {
+      const retry = await openRunStream(conversationId, jobId, seen);
+      if (retry.status === 404) {
+        // The run and its log are gone
+        break;
+      }
+      if (retry.ok) {
+        await readEventStream(retry, onEvent, stream);
+      }
+    } catch (e) {
+      console.warn('Council run stream dropped:', e);
+    }
+    if (stream.lastEventId > seen) {
+      attempts = 0;
+    }
+  }
+}
+
+/**
+ * Read a council run event stream, calling onEvent(eventType, event) for each event.
+ * Handles both the original protocol (one JSON event per data line) and the
+ * compact protocol 2 (type in the SSE event field, stage payloads sent once
+ * and referenced by event id), so callers always see protocol 1 events.
+ * `stream` carries the last event id, whether the run's job_end arrived and
+ * the stage payloads across reconnects (see followRunStream).
+ */
+async function readEventStream(response, onEvent, stream) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const { stagePayloads } = stream; // event id -> stageN_complete payload
+  let buffer = '';
+
+  const dispatch = (frame) => {
+    let id = null;
+    let name = null;
+    let data = '';
+    for (const line of frame.split('\n')) {
+      if (line.startsWith('id: ')) id = Number(line.slice(4));
+      else if (line.startsWith('event: ')) name = line.slice(7);
+      else if (line.startsWith('data: ')) data += line.slice(6);
+    }
+    // Comment-only frames are heartbeats
+    if (!data) return;
+
+    let event;
+    try {
+      event = JSON.parse(data);
+    } catch (e) {
+      console.error('Failed to parse SSE event:', e);
+      return;
+    }
+
+    if (id !== null) {
+      stream.lastEventId = id;
+    }
+    if (name) {
+      if (/^stage\d_complete$/.test(name) && id !== null) {
+        stagePayloads.set(id, event);
+      }
+      if (event.refs) {
+        for (const [field, ref] of Object.entries(event.refs)) {
+          const source = stagePayloads.get(ref);
+          event[field] = field === 'metadata' ? source?.metadata : source?.data;
+        }
+        delete event.refs;
+      }
+      if (name !== 'message') {
+        event = { type: name, ...event };
+      }
+    }
+    if (event.type === 'job_end') {
+      stream.ended = true;
+    }
+    onEvent(event.type, event);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const frames = buffer.split('\n\n');
+    buffer = frames.pop();
+    frames.forEach(dispatch);
+  }
+  if (buffer.trim()) dispatch(buffer);
+}
@@ -12,11 +12,46 @@ import NewConversationDialog from './NewConversationDialog';
 import { api } from '../api';
 import './ChatInterface.css';
 
+// Totals of an answer's per-stage model usage (metadata.usage)
+function usageTotals(stageUsage) {
+  if (!stageUsage) return null;
+  return Object.values(stageUsage).reduce(
+    (totals, u) => ({
+      tokens: totals.tokens + (u.total_tokens || 0),
+      cost: totals.cost + (u.cost || 0),
+      computeMs: totals.computeMs + (u.compute_ms || 0),
+    }),
+    { tokens: 0, cost: 0, computeMs: 0 }
+  );
+}
+
+function UsageBadge({ metadata }) {
+  const totals = usageTotals(metadata?.usage);
+  if (!totals) return null;
+  const parts = [`${totals.tokens.toLocaleString()} tokens`];
+  if (totals.cost > 0) parts.push(`$${totals.cost.toFixed(4)}`);
+  if (totals.computeMs > 0) parts.push(`${(totals.computeMs / 1000).toFixed(1)}s GPU`);
+  const budget = metadata.budget;
+  return (
+    <span
+      className={`usage-badge ${budget ? 'over-budget' : ''}`}
+      title={budget ? `Over the ${budget.exceeded} budget (${budget.used} of ${budget.budget}); answered by ${budget.model}` : 'Model usage of this answer'}
+    >
+      {parts.join(' · ')}
+      {budget && ' · downgraded'}
+    </span>
+  );
+}
+
 export default function ChatInterface({
   conversation,
   onSendMessage,
   isLoading,
   onReRun,
+  onResumeTurn,
+  onDiscardTurn,
+  onCancelRun,
+  onRegenerate,
   onTogglePin,
   onQuickStart
 }) {
@@ -68,6 +103,12 @@ export default function ChatInterface({
     }
   };
 
+  // Stored answers (with an id) can have a stage regenerated while no run is going
+  const regenerateHandler = (msg) => {
+    if (!onRegenerate || !msg.id || isLoading || msg.loading) return undefined;
+    return (target, member) => onRegenerate(msg.id, target, member);
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
@@ -237,6 +278,7 @@ export default function ChatInterface({
                               <AvatarFallback>AI</AvatarFallback>
                             </Avatar>
                             <span className="message-label">QuorumAI</span>
+                            <UsageBadge metadata={msg.metadata} />
                           </div>
                           <button
                             className={`pin-btn ${msg.pinned ? 'active' : ''}`}
@@ -259,7 +301,7 @@ export default function ChatInterface({
                             </span>
                           </div>
                         )}
-                        {msg.stage1 && <Stage1 responses={msg.stage1} />}
+                        {msg.stage1 && <Stage1 responses={msg.stage1} onRegenerate={regenerateHandler(msg)} />}
 
                         {/* Stage 2 */}
                         {msg.loading?.stage2 && (
@@ -276,7 +318,10 @@ export default function ChatInterface({
                           <Stage2
                             rankings={msg.stage2}
                             labelToModel={msg.metadata?.label_to_model}
+                            labelToMembers={msg.metadata?.label_to_members}
                             aggregateRankings={msg.metadata?.aggregate_rankings}
+                            consensus={msg.metadata?.consensus}
+                            onRegenerate={regenerateHandler(msg)}
                           />
                         )}
 
@@ -291,7 +336,7 @@ export default function ChatInterface({
                             </span>
                           </div>
                         )}
-                        {msg.stage3 && <Stage3 finalResponse={msg.stage3} />}
+                        {msg.stage3 && <Stage3 finalResponse={msg.stage3} onRegenerate={regenerateHandler(msg)} />}
                       </div>
                     )}
                   </div>
@@ -301,8 +346,45 @@ export default function ChatInterface({
 
             {/* Removed global loading indicator - stages show their own loading states */}
 
+            {/* Run in progress (its answer is still streaming in): stop it */}
+            {isLoading && onCancelRun && conversation.messages[conversation.messages.length - 1]?.loading && (
+              <div className="rerun-container">
+                <Tooltip>
+                  <TooltipTrigger asChild>
+                    <button className="rerun-btn" onClick={onCancelRun}>
+                      ■ Stop
+                    </button>
+                  </TooltipTrigger>
+                  <TooltipContent>Stop the council; the turn can be resumed later</TooltipContent>
+                </Tooltip>
+              </div>
+            )}
+
+            {/* Interrupted turn: continue from its checkpoint or give up on it */}
+            {!isLoading && conversation.pending_turn && onResumeTurn && (
+              <div className="rerun-container pending-turn-container">
+                <span className="pending-turn-note">
+                  This turn was interrupted
+                  {conversation.pending_turn.completed_stage > 0 && ` after Stage ${conversation.pending_turn.completed_stage}`}.
+                </span>
+                <Tooltip>
+                  <TooltipTrigger asChild>
+                    <button className="rerun-btn" onClick={onResumeTurn}>
+                      ▶ Resume
+                    </button>
+                  </TooltipTrigger>
+                  <TooltipContent>Continue from the last completed step</TooltipContent>
+                </Tooltip>
+                {onDiscardTurn && (
+                  <button className="rerun-btn" onClick={onDiscardTurn}>
+                    ✕ Discard
+                  </button>
+                )}
+              </div>
+            )}
+
             {/* Re-run button (Standard Council only) */}
-            {!isLoading && conversation.messages.length > 0 && conversation.conversation_type !== 'agentic' && onReRun && (
+            {!isLoading && !conversation.pending_turn && conversation.messages.length > 0 && conversation.conversation_type !== 'agentic' && onReRun && (
               <div className="rerun-container">
                 <Tooltip>
                   <TooltipTrigger asChild>
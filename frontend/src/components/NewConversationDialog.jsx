@@ -108,7 +108,7 @@ function NewConversationDialog({
     // Combine models and personas for display
     const allOptions = [
         ...personas.map(p => ({ ...p, type: 'persona', label: p.name, sub: p.model_id })),
-        ...models.map(m => ({ ...m, type: 'model', label: m.name, sub: m.provider }))
+        ...models.map(m => ({ ...m, type: 'model', label: m.name, sub: m.parameter_size ? `${m.provider} · ${m.parameter_size}${m.loaded ? ' · loaded' : ''}` : m.provider }))
     ];
 
     return (
@@ -6,6 +6,33 @@ import { Avatar, AvatarImage, AvatarFallback } from './ui/Avatar';
 import { api } from '../api';
 import './PersonaManager.css';
 
+// Short catalog details for a model, e.g. "8B Q4_0, 8k ctx, loaded"
+function modelDetails(model) {
+    const parts = [];
+    if (model.parameter_size) parts.push(model.quantization ? `${model.parameter_size} ${model.quantization}` : model.parameter_size);
+    if (model.context_length) parts.push(`${Math.round(model.context_length / 1024)}k ctx`);
+    if (model.loaded) parts.push('loaded');
+    return parts.join(', ');
+}
+
+// Short summary of an inference profile, e.g. "ctx 8192, temp 0.2"
+function profileSummary(inference) {
+    if (!inference) return '';
+    const parts = [];
+    if (inference.num_ctx) parts.push(`ctx ${inference.num_ctx}`);
+    if (inference.num_predict) parts.push(`max ${inference.num_predict} tokens`);
+    if (inference.max_tokens) parts.push(`max ${inference.max_tokens} tokens`);
+    if (inference.temperature != null) parts.push(`temp ${inference.temperature}`);
+    if (inference.keep_alive != null) parts.push(`keep ${inference.keep_alive}`);
+    if (inference.num_thread) parts.push(`${inference.num_thread} threads`);
+    return parts.join(', ');
+}
+
+// Numeric form field to profile value (empty: provider default)
+function numberOrNull(value) {
+    return value === '' ? null : Number(value);
+}
+
 function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
     const [personas, setPersonas] = useState([]);
     const [models, setModels] = useState([]);
@@ -17,6 +44,10 @@ function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
     const [modelId, setModelId] = useState('');
     const [systemPrompt, setSystemPrompt] = useState('');
     const [avatarColor, setAvatarColor] = useState('#3b82f6');
+    const [temperature, setTemperature] = useState('');
+    const [numCtx, setNumCtx] = useState('');
+    const [maxReplyTokens, setMaxReplyTokens] = useState('');
+    const [keepAlive, setKeepAlive] = useState('');
 
     useEffect(() => {
         loadData();
@@ -70,9 +101,21 @@ function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
     const handleSubmit = async (e) => {
         e.preventDefault();
         try {
-            await api.createPersona(name, modelId, systemPrompt, avatarColor);
+            // Ollama limits replies with num_predict, OpenRouter with max_tokens
+            const isOllama = modelId.startsWith('ollama/');
+            const inference = {
+                temperature: numberOrNull(temperature),
+                num_ctx: isOllama ? numberOrNull(numCtx) : null,
+                [isOllama ? 'num_predict' : 'max_tokens']: numberOrNull(maxReplyTokens),
+                keep_alive: isOllama && keepAlive ? keepAlive : null,
+            };
+            await api.createPersona(name, modelId, systemPrompt, avatarColor, inference);
             setName('');
             setSystemPrompt('');
+            setTemperature('');
+            setNumCtx('');
+            setMaxReplyTokens('');
+            setKeepAlive('');
             loadData(); // Reload list
         } catch (error) {
             console.error('Failed to create persona:', error);
@@ -106,6 +149,9 @@ function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
                                         <div>
                                             <strong>{p.name}</strong>
                                             <span className="model-badge">{p.model_id}</span>
+                                            {profileSummary(p.inference) && (
+                                                <span className="model-badge">{profileSummary(p.inference)}</span>
+                                            )}
                                         </div>
                                     </div>
                                     <AlertDialog>
@@ -170,6 +216,7 @@ function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
                                 {availableModels.map(m => (
                                     <SelectItem key={m.id} value={m.id}>
                                         {m.name}
+                                        {modelDetails(m) && ` (${modelDetails(m)})`}
                                     </SelectItem>
                                 ))}
                             </SelectContent>
@@ -187,6 +234,45 @@ function PersonaManager({ isOpen, onClose, isEmbedded = false }) {
                         />
                     </div>
 
+                    <div className="form-group inference-fields">
+                        <label>Inference (leave empty for defaults)</label>
+                        <div className="inference-grid">
+                            <input
+                                type="number"
+                                step="0.1"
+                                min="0"
+                                value={temperature}
+                                onChange={(e) => setTemperature(e.target.value)}
+                                placeholder="Temperature"
+                            />
+                            <input
+                                type="number"
+                                min="1"
+                                value={maxReplyTokens}
+                                onChange={(e) => setMaxReplyTokens(e.target.value)}
+                                placeholder="Max reply tokens"
+                            />
+                            {modelId.startsWith('ollama/') && (
+                                <>
+                                    <input
+                                        type="number"
+                                        min="512"
+                                        step="512"
+                                        value={numCtx}
+                                        onChange={(e) => setNumCtx(e.target.value)}
+                                        placeholder="Context window (auto)"
+                                    />
+                                    <input
+                                        type="text"
+                                        value={keepAlive}
+                                        onChange={(e) => setKeepAlive(e.target.value)}
+                                        placeholder="Keep alive, e.g. 30m"
+                                    />
+                                </>
+                            )}
+                        </div>
+                    </div>
+
                     <div className="form-group">
                         <label>Avatar Color</label>
                         <input
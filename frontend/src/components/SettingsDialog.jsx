@@ -9,6 +9,7 @@ function SettingsDialog({ isOpen, onClose, isEmbedded = false }) {
     const [ollamaUrl, setOllamaUrl] = useState('');
     const [openrouterApiKey, setOpenrouterApiKey] = useState('');
     const [userApiKey, setUserApiKey] = useState('');
+    const [userApiKeySet, setUserApiKeySet] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
     const [isSaving, setIsSaving] = useState(false);
 
@@ -27,7 +28,8 @@ function SettingsDialog({ isOpen, onClose, isEmbedded = false }) {
             const config = await api.getSettings();
             setOllamaUrl(config.ollama_base_url || '');
             setOpenrouterApiKey(config.openrouter_api_key || '');
-            setUserApiKey(config.user_api_key || '');
+            setUserApiKey(api.getUserApiKey());
+            setUserApiKeySet(Boolean(config.user_api_key_set));
         } catch (error) {
             console.error('Failed to load settings:', error);
             toast({
@@ -44,11 +46,16 @@ function SettingsDialog({ isOpen, onClose, isEmbedded = false }) {
         e.preventDefault();
         setIsSaving(true);
         try {
-            await api.updateSettings({
+            const changes = {
                 ollama_base_url: ollamaUrl,
-                openrouter_api_key: openrouterApiKey,
-                user_api_key: userApiKey
-            });
+                openrouter_api_key: openrouterApiKey
+            };
+            // The server keeps its key unless this browser's key was changed
+            if (userApiKey !== api.getUserApiKey()) {
+                changes.user_api_key = userApiKey;
+            }
+            const updated = await api.updateSettings(changes);
+            setUserApiKeySet(Boolean(updated.user_api_key_set));
             toast({
                 title: "Success",
                 description: "Settings saved successfully.",
@@ -63,7 +70,7 @@ function SettingsDialog({ isOpen, onClose, isEmbedded = false }) {
             console.error('Failed to save settings:', error);
             toast({
                 title: "Error",
-                description: "Failed to save settings.",
+                description: error.status ? error.message : "Failed to save settings.",
                 type: "error"
             });
         } finally {
@@ -88,7 +95,8 @@ function SettingsDialog({ isOpen, onClose, isEmbedded = false }) {
                             placeholder="sk-..."
                         />
                         <p className="help-text">
-                            Your personal API Key (e.g. OpenAI).
+                            Once set, starting a council run or changing settings requires this key (sent as <code>X-API-Key</code>); clients are rate limited per key.
+                            It is kept in this browser only{userApiKeySet && !userApiKey ? '; a key is set on the server, enter it here to use it' : ''}.
                         </p>
                     </div>
 
@@ -4,8 +4,18 @@ import { Switch } from './ui/Switch';
 import { AlertDialog, AlertDialogTrigger, AlertDialogContent, AlertDialogHeader, AlertDialogTitle, AlertDialogDescription, AlertDialogFooter, AlertDialogCancel, AlertDialogAction } from './ui/AlertDialog';
 import { Tooltip, TooltipTrigger, TooltipContent, TooltipProvider } from './ui/Tooltip';
 import { ScrollArea } from './ui/ScrollArea';
+import { api } from '../api';
 import './Sidebar.css';
 
+const RESULT_LABELS = { title: 'Title', user: 'Question', stage3: 'Final answer', stage1: 'Answer' };
+
+// Render a search snippet, bolding the <mark>ed terms without injecting HTML
+function Snippet({ text }) {
+  return text.split(/<mark>(.*?)<\/mark>/g).map((part, i) =>
+    i % 2 === 1 ? <mark key={i}>{part}</mark> : part
+  );
+}
+
 export default function Sidebar({
   conversations,
   currentConversationId,
@@ -24,8 +34,30 @@ export default function Sidebar({
     return saved ? parseInt(saved, 10) : 260;
   });
   const [isResizing, setIsResizing] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
   const sidebarRef = useRef(null);
 
+  useEffect(() => {
+    if (!searchQuery.trim()) {
+      setSearchResults(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const results = await api.search(searchQuery);
+        if (!cancelled) setSearchResults(results);
+      } catch (error) {
+        console.error('Failed to search:', error);
+      }
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery]);
+
   useEffect(() => {
     localStorage.setItem('sidebarWidth', sidebarWidth.toString());
   }, [sidebarWidth]);
@@ -109,53 +141,85 @@ export default function Sidebar({
           </div>
         </div>
 
+        <div className="sidebar-search">
+          <input
+            type="search"
+            placeholder="Search conversations..."
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+          />
+        </div>
+
         <ScrollArea className="conversations-list-scroll">
-          <div className="conversations-list">
-            {conversations.map((conv) => (
-              <div
-                key={conv.id}
-                className={`conversation-item ${conv.id === currentConversationId ? 'active' : ''
-                  }`}
-                onClick={() => onSelectConversation(conv.id)}
-              >
-                <div className="conversation-content">
-                  <div className="conversation-title">
-                    {conv.conversation_type === 'agentic' && (
-                      <span className="agentic-icon" title="Agentic Council">⚡</span>
-                    )}
-                    {conv.title}
-                  </div>
-                  <div className="conversation-meta">
-                    {new Date(conv.created_at).toLocaleDateString()} • {conv.message_count} msgs
+          {searchResults ? (
+            <div className="conversations-list">
+              {searchResults.results.length === 0 && (
+                <div className="no-conversations">No matches</div>
+              )}
+              {searchResults.results.map((result, index) => (
+                <div
+                  key={`${result.conversation_id}-${result.message_id}-${index}`}
+                  className={`conversation-item ${result.conversation_id === currentConversationId ? 'active' : ''}`}
+                  onClick={() => onSelectConversation(result.conversation_id)}
+                >
+                  <div className="conversation-content">
+                    <div className="conversation-title">{result.conversation_title}</div>
+                    <div className="search-snippet"><Snippet text={result.snippet} /></div>
+                    <div className="conversation-meta">
+                      {RESULT_LABELS[result.kind]}{result.member ? ` • ${result.member.split('/')[1] || result.member}` : ''}
+                    </div>
                   </div>
                 </div>
+              ))}
+            </div>
+          ) : (
+            <div className="conversations-list">
+              {conversations.map((conv) => (
+                <div
+                  key={conv.id}
+                  className={`conversation-item ${conv.id === currentConversationId ? 'active' : ''
+                    }`}
+                  onClick={() => onSelectConversation(conv.id)}
+                >
+                  <div className="conversation-content">
+                    <div className="conversation-title">
+                      {conv.conversation_type === 'agentic' && (
+                        <span className="agentic-icon" title="Agentic Council">⚡</span>
+                      )}
+                      {conv.title}
+                    </div>
+                    <div className="conversation-meta">
+                      {new Date(conv.created_at).toLocaleDateString()} • {conv.message_count} msgs
+                    </div>
+                  </div>
 
-                <AlertDialog>
-                  <AlertDialogTrigger asChild>
-                    <button
-                      className="delete-conv-btn"
-                      onClick={(e) => e.stopPropagation()}
-                      title="Delete conversation"
-                    >
-                      &times;
-                    </button>
-                  </AlertDialogTrigger>
-                  <AlertDialogContent>
-                    <AlertDialogHeader>
-                      <AlertDialogTitle>Delete Conversation</AlertDialogTitle>
-                      <AlertDialogDescription>
-                        Are you sure you want to delete "{conv.title}"? This action cannot be undone.
-                      </AlertDialogDescription>
-                    </AlertDialogHeader>
-                    <AlertDialogFooter>
-                      <AlertDialogCancel>Cancel</AlertDialogCancel>
-                      <AlertDialogAction onClick={() => onDeleteConversation(conv.id)}>Delete</AlertDialogAction>
-                    </AlertDialogFooter>
-                  </AlertDialogContent>
-                </AlertDialog>
-              </div>
-            ))}
-          </div>
+                  <AlertDialog>
+                    <AlertDialogTrigger asChild>
+                      <button
+                        className="delete-conv-btn"
+                        onClick={(e) => e.stopPropagation()}
+                        title="Delete conversation"
+                      >
+                        &times;
+                      </button>
+                    </AlertDialogTrigger>
+                    <AlertDialogContent>
+                      <AlertDialogHeader>
+                        <AlertDialogTitle>Delete Conversation</AlertDialogTitle>
+                        <AlertDialogDescription>
+                          Are you sure you want to delete "{conv.title}"? This action cannot be undone.
+                        </AlertDialogDescription>
+                      </AlertDialogHeader>
+                      <AlertDialogFooter>
+                        <AlertDialogCancel>Cancel</AlertDialogCancel>
+                        <AlertDialogAction onClick={() => onDeleteConversation(conv.id)}>Delete</AlertDialogAction>
+                      </AlertDialogFooter>
+                    </AlertDialogContent>
+                  </AlertDialog>
+                </div>
+              ))}
+            </div>
+          )}
         </ScrollArea>
         {isOpen && (
           <div
@@ -3,7 +3,7 @@ import remarkGfm from 'remark-gfm';
 import { Tabs, TabsList, TabsTrigger, TabsContent } from './ui/Tabs';
 import './Stage1.css';
 
-export default function Stage1({ responses }) {
+export default function Stage1({ responses, onRegenerate }) {
 
 
   if (!responses || responses.length === 0) {
@@ -26,7 +26,18 @@ export default function Stage1({ responses }) {
         {responses.map((resp, index) => (
           <TabsContent key={index} value={String(index)}>
             <div className="tab-content">
-              <div className="model-name">{resp.model}</div>
+              <div className="model-name-row">
+                <div className="model-name">{resp.model}</div>
+                {onRegenerate && (
+                  <button
+                    className="regenerate-btn"
+                    onClick={() => onRegenerate('stage1', resp.persona_name)}
+                    title="Ask this member again; rankings and the final answer are redone"
+                  >
+                    ↻ Regenerate
+                  </button>
+                )}
+              </div>
               <div className="response-text markdown-content">
                 <ReactMarkdown remarkPlugins={[remarkGfm]}>{resp.response}</ReactMarkdown>
               </div>
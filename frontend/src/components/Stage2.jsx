@@ -3,20 +3,56 @@ import remarkGfm from 'remark-gfm';
 import { Tabs, TabsList, TabsTrigger, TabsContent } from './ui/Tabs';
 import './Stage2.css';
 
-function deAnonymizeText(text, labelToModel) {
+function shortName(model) {
+  return model.split('/')[1] || model;
+}
+
+// Name(s) behind a label; near-duplicate answers share one label
+function labelName(label, labelToModel, labelToMembers) {
+  if (labelToMembers && labelToMembers[label]) {
+    return labelToMembers[label].map(shortName).join(' + ');
+  }
+  return labelToModel && labelToModel[label] ? shortName(labelToModel[label]) : label;
+}
+
+function deAnonymizeText(text, labelToModel, labelToMembers) {
   if (!labelToModel) return text;
 
   let result = text;
   // Replace each "Response X" with the actual model name
-  Object.entries(labelToModel).forEach(([label, model]) => {
-    const modelShortName = model.split('/')[1] || model;
-    result = result.replace(new RegExp(label, 'g'), `**${modelShortName}**`);
+  Object.keys(labelToModel).forEach((label) => {
+    result = result.replace(new RegExp(label, 'g'), `**${labelName(label, labelToModel, labelToMembers)}**`);
   });
   return result;
 }
 
-export default function Stage2({ rankings, labelToModel, aggregateRankings }) {
+export default function Stage2({ rankings, labelToModel, labelToMembers, aggregateRankings, consensus, onRegenerate }) {
 
+  const regenerateAll = onRegenerate && (
+    <button
+      className="regenerate-btn"
+      onClick={() => onRegenerate('stage2')}
+      title="Run the peer review again, then the final answer"
+    >
+      ↻ Regenerate
+    </button>
+  );
+
+  if (consensus?.action === 'skip') {
+    return (
+      <div className="stage stage2">
+        <div className="stage-header">
+          <h3 className="stage-title">Stage 2: Peer Rankings</h3>
+          {regenerateAll}
+        </div>
+        <p className="stage-description">
+          Skipped: the council's answers already agreed
+          (similarity {consensus.similarity.toFixed(2)}, threshold {consensus.threshold}),
+          so the Chairman synthesized directly from Stage 1.
+        </p>
+      </div>
+    );
+  }
 
   if (!rankings || rankings.length === 0) {
     return null;
@@ -24,12 +60,16 @@ export default function Stage2({ rankings, labelToModel, aggregateRankings }) {
 
   return (
     <div className="stage stage2">
-      <h3 className="stage-title">Stage 2: Peer Rankings</h3>
+      <div className="stage-header">
+        <h3 className="stage-title">Stage 2: Peer Rankings</h3>
+        {regenerateAll}
+      </div>
 
       <h4>Raw Evaluations</h4>
       <p className="stage-description">
         Each model evaluated all responses (anonymized as Response A, B, C, etc.) and provided rankings.
         Below, model names are shown in <strong>bold</strong> for readability, but the original evaluation used anonymous labels.
+        {labelToMembers && ' Near-identical answers were shown to the judges once and share a rank.'}
       </p>
 
       <Tabs defaultValue="0">
@@ -44,14 +84,31 @@ export default function Stage2({ rankings, labelToModel, aggregateRankings }) {
         {rankings.map((rank, index) => (
           <TabsContent key={index} value={String(index)}>
             <div className="tab-content">
-              <div className="ranking-model">
-                {rank.model}
-              </div>
-              <div className="ranking-content markdown-content">
-                <ReactMarkdown remarkPlugins={[remarkGfm]}>
-                  {deAnonymizeText(rank.ranking, labelToModel)}
-                </ReactMarkdown>
+              <div className="model-name-row">
+                <div className="ranking-model">
+                  {rank.model}
+                </div>
+                {onRegenerate && (
+                  <button
+                    className="regenerate-btn"
+                    onClick={() => onRegenerate('stage2', rank.persona_name)}
+                    title="Ask this judge to rank again; the other rankings are kept"
+                  >
+                    ↻ Re-rank
+                  </button>
+                )}
               </div>
+              {rank.rationale_dropped ? (
+                <p className="stage-description">
+                  The full evaluation was removed by the storage retention policy; the extracted ranking is kept.
+                </p>
+              ) : (
+                <div className="ranking-content markdown-content">
+                  <ReactMarkdown remarkPlugins={[remarkGfm]}>
+                    {deAnonymizeText(rank.ranking, labelToModel, labelToMembers)}
+                  </ReactMarkdown>
+                </div>
+              )}
 
               {rank.parsed_ranking &&
                 rank.parsed_ranking.length > 0 && (
@@ -60,9 +117,7 @@ export default function Stage2({ rankings, labelToModel, aggregateRankings }) {
                     <ol>
                       {rank.parsed_ranking.map((label, i) => (
                         <li key={i}>
-                          {labelToModel && labelToModel[label]
-                            ? labelToModel[label].split('/')[1] || labelToModel[label]
-                            : label}
+                          {labelName(label, labelToModel, labelToMembers)}
                         </li>
                       ))}
                     </ol>
@@ -2,14 +2,25 @@ import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import './Stage3.css';
 
-export default function Stage3({ finalResponse }) {
+export default function Stage3({ finalResponse, onRegenerate }) {
   if (!finalResponse) {
     return null;
   }
 
   return (
     <div className="stage stage3">
-      <h3 className="stage-title">Stage 3: Final Council Answer</h3>
+      <div className="stage-header">
+        <h3 className="stage-title">Stage 3: Final Council Answer</h3>
+        {onRegenerate && (
+          <button
+            className="regenerate-btn"
+            onClick={() => onRegenerate('stage3')}
+            title="Ask the Chairman to synthesize again"
+          >
+            ↻ Regenerate
+          </button>
+        )}
+      </div>
       <div className="final-response">
         <div className="chairman-label">
           Chairman: {finalResponse.model.split('/')[1] || finalResponse.model}
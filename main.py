@@ -1,5 +1,135 @@
+"""Command-line entry point for headless Quorum runs."""
+
+import argparse
+import asyncio
+import sys
+
+
+def run_batch_command(args: argparse.Namespace):
+    """Create (or resume) a batch and run it to completion, printing progress."""
+    from backend import batch, personas, selection
+
+    selection.ensure_stats()
+    if args.resume:
+        batch_id = args.resume
+        if batch.get_batch(batch_id) is None:
+            sys.exit(f"Batch {batch_id} not found")
+    else:
+        if not args.questions:
+            sys.exit("A questions file is required unless --resume is given")
+        if args.concurrency is not None and args.concurrency < 1:
+            sys.exit("--concurrency must be at least 1")
+        with open(args.questions) as f:
+            questions = batch.parse_questions(f.readlines())
+        members = args.members.split(",") if args.members else None
+        council_config = personas.resolve_council_config(members, args.chairman)
+        if args.member_budget:
+            council_config["member_budget"] = args.member_budget
+        batch_id = batch.create_batch(questions, council_config, args.concurrency)["id"]
+
+    print(f"Batch {batch_id}")
+
+    def on_result(result, status):
+        done = status["completed"] + status["failed"]
+        outcome = f"error: {result['error']}" if result.get("error") else f"{result['duration_seconds']}s"
+        print(f"[{done}/{status['total']}] {result['id']} ({outcome})", flush=True)
+
+    final = asyncio.run(batch.run_batch(batch_id, on_result=on_result))
+
+    print(f"\n{final['status']}: {final['completed']} completed, {final['failed']} failed")
+    print(f"Results: {batch.get_results_path(batch_id)}")
+    summary = final.get("summary") or {}
+    if summary.get("members"):
+        print(f"\nAggregate rankings over {summary['questions']} questions:")
+        for position, member in enumerate(summary["members"], start=1):
+            print(f"  {position}. {member['model']}  avg rank {member['average_rank']}  "
+                  f"first place {member['first_place']}x")
+
+
+def run_compact_command(args: argparse.Namespace):
+    """Run one storage compaction pass and print what it did."""
+    from backend import compaction
+
+    counts = compaction.compact_storage()
+    print(f"Scanned {counts['scanned']} conversations: {counts['cold']} compressed, "
+          f"{counts['retained']} trimmed by retention, {counts['errors']} errors")
+
+
+def run_export_command(args: argparse.Namespace):
+    """Write conversations as NDJSON to a file or stdout."""
+    from backend import archive
+
+    try:
+        filters = {
+            "since": archive.parse_date(args.since),
+            "until": archive.parse_date(args.until),
+            "conversation_type": args.type,
+            "pinned_only": args.pinned_only,
+        }
+    except ValueError as e:
+        sys.exit(f"Invalid date: {e}")
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    count = 0
+    try:
+        for line in archive.export_lines(**filters):
+            out.write(line)
+            count += 1
+    finally:
+        if args.output:
+            out.close()
+    print(f"Exported {count} conversations", file=sys.stderr)
+
+
+def run_import_command(args: argparse.Namespace):
+    """Import conversations from an NDJSON file or stdin."""
+    from backend import archive
+
+    source = open(args.file) if args.file != "-" else sys.stdin
+    try:
+        result = archive.import_lines(source, args.on_conflict)
+    finally:
+        if args.file != "-":
+            source.close()
+    print(f"Imported {result['imported']}, skipped {result['skipped']}, failed {result['failed']}")
+    for error in result["errors"]:
+        print(f"  {error}")
+
+
 def main():
-    print("Hello from llm-council!")
+    parser = argparse.ArgumentParser(description="Quorum command-line tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subcommands.add_parser("batch", help="Run the council over a JSONL file of questions")
+    batch_parser.add_argument("questions", nargs="?", help='JSONL file, one {"id", "question"} object per line')
+    batch_parser.add_argument("--members", help="Comma-separated model IDs or persona IDs (default: config)")
+    batch_parser.add_argument("--chairman", help="Chairman model ID or persona ID (default: config)")
+    batch_parser.add_argument("--member-budget", type=int,
+                              help="Query only this many members per question, picked from past performance")
+    batch_parser.add_argument("--concurrency", type=int, help="Questions in flight at once")
+    batch_parser.add_argument("--resume", metavar="BATCH_ID", help="Resume an interrupted batch")
+    batch_parser.set_defaults(func=run_batch_command)
+
+    compact_parser = subcommands.add_parser("compact", help="Compress idle conversations and apply retention")
+    compact_parser.set_defaults(func=run_compact_command)
+
+    export_parser = subcommands.add_parser("export", help="Export conversations as NDJSON")
+    export_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    export_parser.add_argument("--since", help="Only conversations created on or after this ISO date/datetime")
+    export_parser.add_argument("--until", help="Only conversations created before this ISO date/datetime")
+    export_parser.add_argument("--type", choices=["standard", "agentic"], help="Only this conversation type")
+    export_parser.add_argument("--pinned-only", action="store_true",
+                               help="Only conversations with at least one pinned message")
+    export_parser.set_defaults(func=run_export_command)
+
+    import_parser = subcommands.add_parser("import", help="Import conversations from an NDJSON export")
+    import_parser.add_argument("file", help="NDJSON file, or - for stdin")
+    import_parser.add_argument("--on-conflict", choices=["skip", "overwrite", "new_id"], default="skip",
+                               help="What to do with conversations whose ID already exists (default: skip)")
+    import_parser.set_defaults(func=run_import_command)
+
+    args = parser.parse_args()
+    args.func(args)
 
 
 if __name__ == "__main__":